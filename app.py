@@ -20,7 +20,11 @@ from callbacks.alisa_lof_callbacks import init_alisa_lof_callbacks
 
 # Importer la nouvelle sidebar pour Isolation Forest
 from components.isolation_forest_sidebar import create_isolation_forest_sidebar, init_isolation_forest_sidebar_callbacks
-from styles.theme import main_content_style, custom_css
+from styles.theme import main_content_style, custom_css, PLOTLY_TEMPLATE_NAME
+import plotly.io as pio
+
+# Thème Plotly SFR appliqué par défaut à toutes les figures
+pio.templates.default = PLOTLY_TEMPLATE_NAME
 
 from callbacks.alisa_lof_callbacks import init_alisa_lof_callbacks
 # Initialiser l'application
@@ -227,26 +231,22 @@ init_isolation_forest_callbacks(app)
 init_alisa_lof_sidebar_callbacks(app)
 init_alisa_lof_callbacks(app)
 
-# Auto-scroll callback
-from dash import clientside_callback
-
-# Cette fonction crée un callback côté client pour faire défiler automatiquement la conversation vers le bas
-clientside_callback(
-    """
-    function(children) {
-        const chatContainer = document.getElementById('chat-messages');
-        if (chatContainer) {
-            setTimeout(function() {
-                chatContainer.scrollTop = chatContainer.scrollHeight;
-            }, 100);
-        }
-        return window.dash_clientside.no_update;
-    }
-    """,
-    Output("chat-messages", "data-scroll", allow_duplicate=True),
-    Input("chat-messages", "children"),
-    prevent_initial_call=True
-)
+# Rechargement en pleine résolution de la fenêtre zoomée des séries réduites
+from utils.downsampling import init_downsampling_callbacks
+init_downsampling_callbacks(app)
+
+# Défilement automatique de la conversation (callback exécuté dans le navigateur)
+from utils.auto_scroll import auto_scroll_callback
+auto_scroll_callback()
+
+# Index construits au démarrage plutôt qu'à la première question du chat
+from utils.query_engine import QueryEngine
+QueryEngine.get_instance().build_index()
+
+# Vérifier que les callbacks de pure mise en forme restent dans le navigateur
+# et que ceux qui dépendent des données restent côté serveur
+from utils.clientside import check_callback_placement
+check_callback_placement(app)
 
 # Lancer l'application
 if __name__ == '__main__':
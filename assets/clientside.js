@@ -0,0 +1,56 @@
+// assets/clientside.js
+// Callbacks de pure mise en forme exécutés dans le navigateur, sans aller-retour serveur
+// (enregistrés par utils/clientside.py, espace de noms 'clientside')
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    clientside: {
+        // Libellé de la plage horaire sélectionnée (barre latérale Isolation Forest)
+        formatHourRange: function(value) {
+            if (!value || value.length < 2) {
+                return "";
+            }
+            return "Plage sélectionnée : " + value[0] + "h - " + value[1] + "h";
+        },
+
+        // Libellé de la période sélectionnée avec son nombre de jours
+        formatDateRange: function(startDate, endDate) {
+            if (!startDate || !endDate) {
+                return "";
+            }
+            const parse = function(date) {
+                const parts = date.split('T')[0].split('-').map(Number);
+                return Date.UTC(parts[0], parts[1] - 1, parts[2]);
+            };
+            const format = function(date) {
+                const parts = date.split('T')[0].split('-');
+                return parts[2] + "/" + parts[1] + "/" + parts[0];
+            };
+            const days = Math.round((parse(endDate) - parse(startDate)) / 86400000) + 1;
+            const dayText = days === 1 ? "jour" : "jours";
+            return "Période: " + format(startDate) + " à " + format(endDate) + " (" + days + " " + dayText + ")";
+        },
+
+        // Affiche la barre de navigation de l'assistant ou la barre simplifiée selon la page
+        toggleNavbar: function(pathname) {
+            const isAssistant = pathname === '/assistant';
+            return [
+                {display: isAssistant ? 'block' : 'none'},
+                {display: isAssistant ? 'none' : 'block'}
+            ];
+        },
+
+        // Fait défiler la conversation vers le bas lorsque de nouveaux messages sont ajoutés
+        scrollChat: function(children, loaderClicks) {
+            const chatContainer = document.getElementById('chat-scroll-area');
+            // Après le rechargement de messages précédents, la position de lecture est conservée
+            const loadedOlder = (loaderClicks || 0) > (window.chatLoaderClicks || 0);
+            window.chatLoaderClicks = loaderClicks || 0;
+            if (chatContainer && !loadedOlder) {
+                setTimeout(function() {
+                    chatContainer.scrollTop = chatContainer.scrollHeight;
+                }, 100);
+            }
+            return window.dash_clientside.no_update;
+        }
+    }
+});
@@ -7,6 +7,11 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 import os
+from utils.figure_payload import finalize_figure, scatter_trace
+from utils.session_state import read_state, LOF_FILTER_STATE
+
+# Infobulle des points LOF, mise en forme côté navigateur (chaîne transmise en customdata)
+LOF_HOVER_TEMPLATE = "%{x}<br>Valeur: %{y:.2f}<br>Chaîne: %{customdata}<extra></extra>"
 
 def init_alisa_lof_callbacks(app):
     @app.callback(
@@ -14,10 +19,13 @@ def init_alisa_lof_callbacks(app):
         [Input('lof-filter-values', 'data')],
         prevent_initial_call=True
     )
-    def update_lof_visualization(filter_values):
+    def update_lof_visualization(filter_token):
         """
         Met à jour la visualisation des anomalies LOF
         """
+        # Le Store ne contient qu'un jeton : les filtres sont relus côté serveur
+        filter_values = read_state(filter_token, LOF_FILTER_STATE)
+        
         # Vérifier si des filtres ont été sélectionnés
         if not filter_values:
             return [
@@ -166,7 +174,7 @@ def init_alisa_lof_callbacks(app):
             html.Div([
                 dcc.Graph(
                     id='lof-metrics-graph', 
-                    figure=fig_lof
+                    figure=finalize_figure(fig_lof, "LOF")
                 )
             ], className="mt-4 mb-4")
         ]
@@ -178,6 +186,22 @@ def init_alisa_lof_callbacks(app):
         # Assembler tous les composants
         return [stats_component] + visualization_components
     
+    def _lof_points_trace(points, ind_config, name, marker):
+        """
+        Crée la trace des points d'un indicateur LOF (WebGL pour les gros volumes).
+        L'identifiant de chaîne est transmis en customdata et mis en forme
+        par le navigateur via le hovertemplate.
+        """
+        return scatter_trace(
+            points['timestamp'],
+            points[ind_config['column']],
+            mode='markers',
+            marker=marker,
+            name=name,
+            customdata=points['chaine_id'],
+            hovertemplate=LOF_HOVER_TEMPLATE
+        )
+    
     def _create_lof_figure(filtered_df, indicator_filter, lof_threshold):
         """
         Crée la figure principale pour les métriques LOF
@@ -226,35 +250,24 @@ def init_alisa_lof_callbacks(app):
             # Ajouter les traces pour chaque indicateur
             for i, (ind_key, ind_config) in enumerate(valid_indicators.items(), 1):
                 # Points normaux
+                normal_points = filtered_df[~filtered_df[ind_config['anomaly_column']]]
                 fig.add_trace(
-                        go.Scatter(
-                            x=filtered_df[~filtered_df[ind_config['anomaly_column']]]['timestamp'],
-                            y=filtered_df[~filtered_df[ind_config['anomaly_column']]][ind_config['column']],
-                            mode='markers',
-                            marker=dict(color='blue', size=5),
+                        _lof_points_trace(
+                            normal_points, ind_config,
                             name=f'{ind_config["title"]} (Normal)',
-                            text=[f'Valeur: {val:.2f}<br>Chaîne: {chain}' for val, chain in 
-                                zip(filtered_df[~filtered_df[ind_config['anomaly_column']]][ind_config['column']], 
-                                    filtered_df[~filtered_df[ind_config['anomaly_column']]]['chaine_id'])],
-                            hoverinfo='text+x+y'
+                            marker=dict(color='blue', size=5)
                         ),
                         row=i, col=1
                     )
                 
                 # Points d'anomalies
-                # Dans la partie où vous créez les traces d'anomalies
                 anomalies = filtered_df[filtered_df[ind_config['anomaly_column']]]
                 if len(anomalies) > 0:
                     fig.add_trace(
-                        go.Scatter(
-                            x=anomalies['timestamp'],
-                            y=anomalies[ind_config['column']],
-                            mode='markers',
-                            marker=dict(color='red', size=10, symbol='x'),
+                        _lof_points_trace(
+                            anomalies, ind_config,
                             name=f'{ind_config["title"]} (Anomalie)',
-                            text=[f'Valeur: {val:.2f}<br>Chaîne: {chain}' for val, chain in 
-                                zip(anomalies[ind_config['column']], anomalies['chaine_id'])],
-                            hoverinfo='text+x+y'
+                            marker=dict(color='red', size=10, symbol='x')
                         ),
                         row=i, col=1
                     )
@@ -286,17 +299,12 @@ def init_alisa_lof_callbacks(app):
             fig = go.Figure()
             
             # Points normaux
+            normal_points = filtered_df[~filtered_df[ind_config['anomaly_column']]]
             fig.add_trace(
-                    go.Scatter(
-                        x=filtered_df[~filtered_df[ind_config['anomaly_column']]]['timestamp'],
-                        y=filtered_df[~filtered_df[ind_config['anomaly_column']]][ind_config['column']],
-                        mode='markers',
-                        marker=dict(color='blue', size=5),
+                    _lof_points_trace(
+                        normal_points, ind_config,
                         name='Normal',
-                        text=[f'Valeur: {val:.2f}<br>Chaîne: {chain}' for val, chain in 
-                            zip(filtered_df[~filtered_df[ind_config['anomaly_column']]][ind_config['column']], 
-                                filtered_df[~filtered_df[ind_config['anomaly_column']]]['chaine_id'])],
-                        hoverinfo='text+x+y'
+                        marker=dict(color='blue', size=5)
                     )
                 )
             
@@ -304,15 +312,10 @@ def init_alisa_lof_callbacks(app):
             anomalies = filtered_df[filtered_df[ind_config['anomaly_column']]]
             if len(anomalies) > 0:
                 fig.add_trace(
-                    go.Scatter(
-                        x=anomalies['timestamp'],
-                        y=anomalies[ind_config['column']],
-                        mode='markers',
-                        marker=dict(color='red', size=10, symbol='x'),
+                    _lof_points_trace(
+                        anomalies, ind_config,
                         name='Anomalie',
-                        text=[f'Valeur: {val:.2f}<br>Chaîne: {chain}' for val, chain in 
-                            zip(anomalies[ind_config['column']], anomalies['chaine_id'])],
-                        hoverinfo='text+x+y'
+                        marker=dict(color='red', size=10, symbol='x')
                     )
                 )
                         
@@ -350,22 +353,29 @@ def init_alisa_lof_callbacks(app):
                 filtered_df['latency_lof_anomaly'])
             ]
             
-            def count_simultaneous_anomalies(group):
-                # Compter le nombre d'anomalies détectées simultanément
-                return group[['dns_lof_anomaly', 'score_lof_anomaly', 'latency_lof_anomaly']].sum(axis=1).max()
+            anomaly_cols = ['dns_lof_anomaly', 'score_lof_anomaly', 'latency_lof_anomaly']
+            # Nombre d'anomalies détectées simultanément sur chaque ligne
+            anomaly_df = anomaly_df.assign(
+                lof_anomaly_count=anomaly_df[anomaly_cols].astype('int64').sum(axis=1)
+            )
+            
+            aggregations = {
+                'code_departement': ('code_departement', 'first'),
+                'peag_nro': ('peag_nro', 'first'),
+                'boucle_simplifiée': ('boucle_simplifiée', 'first'),
+                'olt_name': ('olt_name', 'first'),
+                'dns_lof_anomaly': ('dns_lof_anomaly', 'mean'),
+                'score_lof_anomaly': ('score_lof_anomaly', 'mean'),
+                'latency_lof_anomaly': ('latency_lof_anomaly', 'mean'),
+                'nb_repetitions': ('chaine_id', 'size'),
+                'lof_anomaly_count': ('lof_anomaly_count', 'max')
+            }
+            if 'total_clients' in anomaly_df.columns:
+                aggregations['total_clients'] = ('total_clients', 'sum')
             
-            critical_chains = anomaly_df.groupby('chaine_id').apply(lambda x: pd.Series({
-                'code_departement': x['code_departement'].iloc[0],
-                'peag_nro': x['peag_nro'].iloc[0],
-                'boucle_simplifiée': x['boucle_simplifiée'].iloc[0],
-                'olt_name': x['olt_name'].iloc[0],
-                'dns_lof_anomaly': x['dns_lof_anomaly'].mean(),
-                'score_lof_anomaly': x['score_lof_anomaly'].mean(),
-                'latency_lof_anomaly': x['latency_lof_anomaly'].mean(),
-                'nb_repetitions': len(x),
-                'lof_anomaly_count': count_simultaneous_anomalies(x),
-                'total_clients': x.get('total_clients', 0).sum() if 'total_clients' in x.columns else 0
-            })).reset_index()
+            critical_chains = anomaly_df.groupby('chaine_id').agg(**aggregations).reset_index()
+            if 'total_clients' not in critical_chains.columns:
+                critical_chains['total_clients'] = 0
             
             # Conversion en pourcentage pour les anomalies par indicateur
             for col in ['dns_lof_anomaly', 'score_lof_anomaly', 'latency_lof_anomaly']:
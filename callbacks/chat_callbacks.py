@@ -1,6 +1,31 @@
 # callbacks/chat_callbacks.py - Simplifié pour ne gérer que les messages texte
-from dash import Input, Output, State, callback, html, ctx
-from datetime import datetime
+from dash import Input, Output, State, callback, html, ctx, no_update
+from utils.chat_transcript import append_chat_messages, ChatTranscriptStore
+from components.chat_messages import create_user_message, create_assistant_message
+from utils.query_engine import QueryEngine, METRIC_COUNT, describe_filters
+import uuid
+
+def format_query_answer(result):
+    """
+    Met en forme la réponse du moteur de requêtes (utils/query_engine.py)
+    """
+    if result['metric'] == METRIC_COUNT:
+        answer = f"Nombre d'observations : {result['value']:,}".replace(',', ' ')
+    elif result['value'] is None:
+        answer = "Aucun test DNS ne correspond à ces critères."
+    else:
+        answer = (f"Temps DNS moyen : {result['value']:.2f} ms "
+                  f"(sur {result['total_tests_dns']:,.0f} tests)").replace(',', ' ')
+    
+    criteria = describe_filters(result['filters'])
+    return [
+        html.P(answer, style={'fontWeight': 'bold', 'marginBottom': '8px'}),
+        html.Div("Critères interprétés :" if criteria else "Sur l'ensemble des données.",
+                 style={'marginBottom': '4px'}),
+        html.Ul([html.Li(criterion) for criterion in criteria]) if criteria else None,
+        html.Small("Pour une analyse détaillée, appliquez ces filtres dans la barre latérale.",
+                   style={'color': '#888'})
+    ]
 
 @callback(
     [Output("chat-messages", "children"),
@@ -8,69 +33,56 @@ from datetime import datetime
      Output("filter-mode-active", "data")],
     [Input("chat-send-button", "n_clicks")],
     [State("chat-input-field", "value"),
-     State("chat-messages", "children")],
+     State("chat-session-id", "data")],
     prevent_initial_call=True
 )
-def update_chat(send_clicks, message_text, chat_messages):
+def update_chat(send_clicks, message_text, session_id):
     """Gère les interactions du chat"""
-    # Style uniforme pour les bulles de chat
-    chat_bubble_style = {
-        'backgroundColor': '#f0f0f0',  # Gris léger uniforme
-        'padding': '12px 16px',
-        'borderRadius': '12px',
-        'display': 'inline-block',
-        'maxWidth': '80%',
-        'marginBottom': '8px',
-        'fontSize': '14px',
-        'lineHeight': '1.5',
-        'color': '#404040',
-        'boxShadow': '0 1px 2px rgba(0,0,0,0.07)',
-    }
-    
-    # Style pour la bulle de l'utilisateur
-    user_bubble_style = chat_bubble_style.copy()
-    user_bubble_style.update({
-        'float': 'right',
-        'clear': 'both',
-        'marginLeft': 'auto',
-        'marginRight': '0',
-    })
-    
-    # Style pour la bulle de l'assistant
-    assistant_bubble_style = chat_bubble_style.copy()
-    assistant_bubble_style.update({
-        'float': 'left',
-        'clear': 'both',
-    })
-
-    current_time = datetime.now().strftime("%H:%M")
-    
     # Message texte envoyé par l'utilisateur
     if message_text:
         # Message utilisateur
-        user_message = html.Div([
-            html.Div(message_text,
-                    style=user_bubble_style),
-            html.Small(current_time, style={
-                "fontSize": "10px", 
-                "color": "#888", 
-                "display": "block",
-                "textAlign": "right",
-                "clear": "both"
-            })
-        ])
+        user_message = create_user_message(message_text)
         
-        # Réponse de l'assistant
-        assistant_message = html.Div([
-            html.Div("Pour explorer les données en détail, utilisez les filtres disponibles dans la barre latérale à gauche.",
-                    style=assistant_bubble_style),
-            html.Small(current_time, style={"fontSize": "10px", "color": "#888", "clear": "both", "display": "block"})
-        ])
+        # Réponse de l'assistant : calculée directement si la question est reconnue,
+        # sinon renvoi vers les filtres de la barre latérale
+        result = QueryEngine.get_instance().answer(message_text)
+        if result is None:
+            assistant_message = create_assistant_message("Pour explorer les données en détail, utilisez les filtres disponibles dans la barre latérale à gauche.")
+        else:
+            assistant_message = create_assistant_message(format_query_answer(result))
         
         # Mettre à jour le chat
-        updated_chat = chat_messages + [user_message, assistant_message]
+        updated_chat = append_chat_messages(session_id, user_message, assistant_message)
         
         return updated_chat, "", False
     
     # Cas par défaut
-    return chat_messages, "", False
\ No newline at end of file
+    return no_update, "", False
+
+@callback(
+    [Output("chat-session-id", "data"),
+     Output("chat-messages", "children", allow_duplicate=True)],
+    [Input("chat-session-id", "data")],
+    prevent_initial_call='initial_duplicate'
+)
+def init_chat_session(session_id):
+    """
+    Attribue un identifiant à la session de conversation, ou réaffiche
+    la dernière fenêtre de son historique lorsque la page est rechargée
+    """
+    if not ChatTranscriptStore.is_valid_session(session_id):
+        return str(uuid.uuid4()), no_update
+    return no_update, ChatTranscriptStore.get_instance().render_window(session_id)
+
+@callback(
+    Output("chat-messages", "children", allow_duplicate=True),
+    [Input("chat-load-older", "n_clicks")],
+    [State("chat-session-id", "data")],
+    prevent_initial_call=True
+)
+def load_older_messages(n_clicks, session_id):
+    """Réaffiche la page de messages précédant la fenêtre affichée"""
+    if not n_clicks:
+        return no_update
+    chat_update = ChatTranscriptStore.get_instance().load_older(session_id)
+    return chat_update if chat_update is not None else no_update
@@ -10,9 +10,15 @@ import numpy as np
 import os
 from datetime import datetime, timedelta
 import dash
+from dash.exceptions import PreventUpdate
+from utils.downsampling import downsample_frame, attach_full_series, create_downsampled_graph
+from utils.figure_payload import finalize_figure, scatter_trace
+from utils.request_coalescer import RequestCoalescer, ANOMALY_FILTER_CHANNEL, SEQUENCE_KEY
+from utils.session_state import read_state, ANOMALY_FILTER_STATE
+from utils.anomaly_files import anomaly_file_path, DEFAULT_CONTAMINATION
 
 # Fonction pour charger les données d'anomalies à partir des fichiers CSV
-def load_anomaly_data(contamination=0.005, olt_name=None, date_range=None, hour_range=None):
+def load_anomaly_data(contamination=DEFAULT_CONTAMINATION, olt_name=None, date_range=None, hour_range=None):
     """
     Charge les données d'anomalies à partir des fichiers CSV selon le niveau de contamination
     
@@ -26,7 +32,7 @@ def load_anomaly_data(contamination=0.005, olt_name=None, date_range=None, hour_
         DataFrame contenant les données d'anomalies
     """
     # Construire le chemin du fichier en fonction du niveau de contamination
-    file_path = f"output/df_agg_with_anomalies_contam_{contamination}.csv"
+    file_path = anomaly_file_path(contamination)
     
     try:
         # Vérifier si le fichier existe
@@ -105,7 +111,12 @@ def init_isolation_forest_callbacks(app):
         Output("anomaly-visualization-container", "children"),
         Input("isolation-forest-filter-values", "data")
     )
-    def update_anomaly_visualization(filter_values):
+    def update_anomaly_visualization(filter_token):
+        # Le Store ne contient qu'un jeton : les filtres de sa version sont relus côté serveur
+        # (et non les plus récents, qu'une demande dépassée recalculerait en double)
+        filter_values = read_state(filter_token, ANOMALY_FILTER_STATE, exact=True) if filter_token else {}
+        if filter_values is None:
+            raise PreventUpdate
         if not filter_values:
             # Afficher un message par défaut si aucun filtre n'est appliqué
             return html.Div([
@@ -113,11 +124,18 @@ def init_isolation_forest_callbacks(app):
                         className="text-center text-muted my-5")
             ])
         
+        # Abandonner la demande si un autre filtre ou une autre contamination a été choisi entre-temps
+        coalescer = RequestCoalescer.get_instance()
+        session = filter_token.get('session')
+        sequence = filter_values.get(SEQUENCE_KEY)
+        if sequence is not None:
+            coalescer.check(session, ANOMALY_FILTER_CHANNEL, sequence)
+        
         # Extraire les valeurs des filtres
         olt_value = filter_values.get("olt_name")
         date_range = filter_values.get("date_range", [])
         hour_range = filter_values.get("hour", [0, 23])
-        contamination = filter_values.get("contamination", 0.005)  # Valeur par défaut si non spécifiée
+        contamination = filter_values.get("contamination", DEFAULT_CONTAMINATION)  # Valeur par défaut si non spécifiée
         
         # Afficher les informations de filtrage
         start_date = filter_values.get("start_date")
@@ -128,6 +146,8 @@ def init_isolation_forest_callbacks(app):
         
         # Charger les données selon le niveau de contamination et les filtres
         df = load_anomaly_data(contamination, olt_value, date_range, hour_range)
+        if sequence is not None:
+            coalescer.check(session, ANOMALY_FILTER_CHANNEL, sequence)
         
         # Vérifier si le DataFrame est vide
         if df.empty:
@@ -139,121 +159,6 @@ def init_isolation_forest_callbacks(app):
         # Extraire les anomalies
         anomalies_df = df[df['is_anomaly']] if 'is_anomaly' in df.columns else pd.DataFrame()
         
-        # Créer la figure du graphique principal en fonction des colonnes disponibles
-        fig_main = go.Figure()
-        
-        # Utiliser dns_flag comme valeur principale par défaut si disponible
-        value_column = 'dns_flag' if 'dns_flag' in df.columns else 'grave_anomalies'
-        
-        # Si plusieurs jours sont sélectionnés, regrouper par date et heure
-        if len(date_range) > 1:
-            # Créer une colonne date_hour pour l'axe X
-            if 'date' in df.columns and 'hour' in df.columns:
-                df['date_hour_str'] = df['date'].dt.strftime('%Y-%m-%d') + ' ' + df['hour'].astype(str) + 'h'
-                
-                # Regrouper les données par date et heure
-                grouped_df = df.groupby(['date_str', 'hour']).agg({
-                    value_column: 'mean',
-                    'is_anomaly': 'sum'
-                }).reset_index()
-                
-                # Trier par date et heure
-                grouped_df['date_hour'] = pd.to_datetime(grouped_df['date_str']) + pd.to_timedelta(grouped_df['hour'], unit='h')
-                grouped_df = grouped_df.sort_values('date_hour')
-                
-                # Créer des étiquettes pour l'axe X
-                x_labels = [f"{d} {h}h" for d, h in zip(grouped_df['date_str'], grouped_df['hour'])]
-                
-                # Ajouter la ligne des valeurs normales
-                fig_main.add_trace(go.Scatter(
-                    x=x_labels,
-                    y=grouped_df[value_column],
-                    mode='lines+markers',
-                    name='Valeurs',
-                    line=dict(color='blue', width=2),
-                    marker=dict(size=8)
-                ))
-                
-                # Ajouter les points d'anomalies
-                anomaly_points = grouped_df[grouped_df['is_anomaly'] > 0]
-                if not anomaly_points.empty:
-                    anomaly_labels = [f"{d} {h}h" for d, h in zip(anomaly_points['date_str'], anomaly_points['hour'])]
-                    fig_main.add_trace(go.Scatter(
-                        x=anomaly_labels,
-                        y=anomaly_points[value_column],
-                        mode='markers',
-                        name='Anomalies',
-                        marker=dict(color='red', size=12, symbol='circle-open')
-                    ))
-            else:
-                # Fallback si les colonnes nécessaires ne sont pas disponibles
-                fig_main.add_trace(go.Scatter(
-                    x=df.index,
-                    y=df[value_column],
-                    mode='lines+markers',
-                    name='Valeurs'
-                ))
-        else:
-            # Pour un seul jour, regrouper simplement par heure
-            hour_groups = df.groupby('hour')
-            hour_data = hour_groups.agg({
-                value_column: 'mean',
-                'is_anomaly': 'sum'
-            }).reset_index()
-            
-            # Ajouter la ligne des valeurs normales
-            fig_main.add_trace(go.Scatter(
-                x=hour_data['hour'],
-                y=hour_data[value_column],
-                mode='lines+markers',
-                name='Valeurs',
-                line=dict(color='blue', width=2),
-                marker=dict(size=8)
-            ))
-            
-            # Ajouter les points d'anomalies
-            anomaly_hours = hour_data[hour_data['is_anomaly'] > 0]
-            if not anomaly_hours.empty:
-                fig_main.add_trace(go.Scatter(
-                    x=anomaly_hours['hour'],
-                    y=anomaly_hours[value_column],
-                    mode='markers',
-                    name='Anomalies',
-                    marker=dict(color='red', size=12, symbol='circle-open')
-                ))
-        
-        # Mise en page du graphique principal
-        title = "Détection d'anomalies avec Isolation Forest"
-        if olt_value:
-            title += f" - OLT: {olt_value}"
-        if start_date and end_date:
-            if start_date == end_date:
-                title += f" - Date: {start_date}"
-            else:
-                title += f" - Période: {start_date} à {end_date}"
-        title += f" - Contamination: {contamination}"
-            
-        fig_main.update_layout(
-            title=title,
-            xaxis_title="Période" if len(date_range) > 1 else "Heure",
-            yaxis_title=value_column,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            hovermode="closest",
-            plot_bgcolor="white",
-            height=400
-        )
-        
-        # Si plusieurs jours sont sélectionnés, ajuster l'axe X
-        if len(date_range) > 1:
-            fig_main.update_layout(
-                xaxis=dict(
-                    tickangle=45,
-                    tickmode='array',
-                    tickvals=list(range(len(x_labels))),
-                    ticktext=x_labels
-                )
-            )
-        
         # Créer un graphique pour la distribution des anomalies
         if len(date_range) > 1:
             # Distribution des anomalies par jour
@@ -320,7 +225,7 @@ def init_isolation_forest_callbacks(app):
                     html.Hr(),
                     dcc.Graph(
                         id="anomaly-dist-graph",
-                        figure=fig_anomaly_dist,
+                        figure=finalize_figure(fig_anomaly_dist, "distribution des anomalies"),
                         config={'displayModeBar': False}
                     )
                 ])
@@ -332,9 +237,8 @@ def init_isolation_forest_callbacks(app):
                 dbc.Col([
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Graph(
-                                id="dns-flag-graph",
-                                figure=create_flag_figure(df, 'dns_flag', 'DNS Flag', 'green', date_range),
+                            create_downsampled_graph(
+                                create_flag_figure(df, 'dns_flag', 'DNS Flag', 'green', date_range),
                                 config={'displayModeBar': False}
                             )
                         ])
@@ -343,9 +247,8 @@ def init_isolation_forest_callbacks(app):
                 dbc.Col([
                     dbc.Card([
                         dbc.CardBody([
-                            dcc.Graph(
-                                id="scoring-flag-graph",
-                                figure=create_flag_figure(df, 'scoring_flag', 'Scoring Flag', 'purple', date_range),
+                            create_downsampled_graph(
+                                create_flag_figure(df, 'scoring_flag', 'Scoring Flag', 'purple', date_range),
                                 config={'displayModeBar': False}
                             )
                         ])
@@ -424,24 +327,27 @@ def create_flag_figure(df, flag_column, title, color, date_range=None):
         grouped_df['date_hour'] = pd.to_datetime(grouped_df['date_str']) + pd.to_timedelta(grouped_df['hour'], unit='h')
         grouped_df = grouped_df.sort_values('date_hour')
         
-        # Créer des étiquettes pour l'axe X
-        x_labels = [f"{d} {h}h" for d, h in zip(grouped_df['date_str'], grouped_df['hour'])]
+        # Réduire la série (LTTB) : l'axe X est temporel pour permettre le zoom
+        plot_df = downsample_frame(grouped_df, 'date_hour', flag_column)
         
         # Ajouter la ligne du flag
-        fig.add_trace(go.Scatter(
-            x=x_labels,
-            y=grouped_df[flag_column],
+        fig.add_trace(scatter_trace(
+            x=plot_df['date_hour'],
+            y=plot_df[flag_column],
             mode='lines',
             name=title,
             line=dict(color=color, width=2)
         ))
         
+        # Conserver la série complète pour recharger la fenêtre zoomée
+        if len(plot_df) < len(grouped_df):
+            attach_full_series(fig, {0: (grouped_df['date_hour'], grouped_df[flag_column])})
+        
         # Ajouter les points d'anomalies
         anomaly_points = grouped_df[grouped_df['is_anomaly'] > 0]
         if not anomaly_points.empty:
-            anomaly_labels = [f"{d} {h}h" for d, h in zip(anomaly_points['date_str'], anomaly_points['hour'])]
-            fig.add_trace(go.Scatter(
-                x=anomaly_labels,
+            fig.add_trace(scatter_trace(
+                x=anomaly_points['date_hour'],
                 y=anomaly_points[flag_column],
                 mode='markers',
                 name='Anomalies',
@@ -454,9 +360,7 @@ def create_flag_figure(df, flag_column, title, color, date_range=None):
             yaxis_title="Valeur",
             xaxis=dict(
                 tickangle=45,
-                tickmode='array',
-                tickvals=list(range(len(x_labels))),
-                ticktext=x_labels
+                tickformat='%Y-%m-%d %Hh'
             ),
             plot_bgcolor="white",
             height=250
@@ -470,7 +374,7 @@ def create_flag_figure(df, flag_column, title, color, date_range=None):
         }).reset_index()
         
         # Ajouter la ligne du flag
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter_trace(
             x=hour_data['hour'],
             y=hour_data[flag_column],
             mode='lines',
@@ -481,7 +385,7 @@ def create_flag_figure(df, flag_column, title, color, date_range=None):
         # Ajouter les points d'anomalies
         anomaly_hours = hour_data[hour_data['is_anomaly'] > 0]
         if not anomaly_hours.empty:
-            fig.add_trace(go.Scatter(
+            fig.add_trace(scatter_trace(
                 x=anomaly_hours['hour'],
                 y=anomaly_hours[flag_column],
                 mode='markers',
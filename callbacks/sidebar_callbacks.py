@@ -2,9 +2,10 @@
 # Callbacks pour les interactions de la barre latérale
 
 from dash import Input, Output, State, callback, html, dcc, ALL, MATCH, ctx, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import pandas as pd
-from datetime import datetime
+import uuid
 from styles.theme import sfr_colors
 from utils.data_loader import DataManager
 import numpy as np
@@ -14,63 +15,46 @@ from utils.graph_utils import (
     create_structure_stats_graphs, 
     create_attributes_stats_graphs,
     create_temporal_stats_graphs,
-    create_france_map_with_department
+    describe_structure_stats,
+    describe_temporal_stats,
+    create_lazy_stats_sections,
+    create_stats_section,
+    create_france_map_with_department,
+    create_dns_small_multiples,
+    create_france_metric_figure,
+    create_geometries_unavailable_message,
+    build_weekly_datetime,
+    build_combination_labels,
+    MAP_GRAPH_STYLE,
+    NO_DATA_STYLE
 )
 # Importer le callback de défilement automatique
 from utils.auto_scroll import auto_scroll_callback
+# Réduction des longues séries temporelles avant la construction des figures
+from utils.downsampling import downsample_frame, attach_full_series, create_downsampled_graph
+from utils.figure_payload import finalize_figure
+# Agrégats DNS réutilisés d'une génération à l'autre (roll-up)
+from utils.dns_rollup import DnsRollupStore
+from utils.dns_regression import detect_dns_regressions
+from utils.map_metrics import NATIONAL_MAP_METRICS
+from utils.anomaly_files import CONTAMINATION_LEVELS, DEFAULT_CONTAMINATION
+from utils.geo_loader import DepartementGeoStore
+# Cache des graphiques sérialisés (mémoire et disque)
+from utils.figure_cache import FigureCache
+# Ajout des messages à la conversation sans renvoyer l'historique
+from utils.chat_transcript import append_chat_messages
+# Gabarits des messages du chat et barre d'actions statistiques
+from components.chat_messages import create_user_message, create_assistant_message, FILTERED_STATS_ACTIONS
+# Abandon des applications de filtres dépassées par un clic plus récent
+from utils.request_coalescer import RequestCoalescer, FILTER_CHANNEL, SEQUENCE_KEY, strip_request_metadata
+# Filtres conservés côté serveur : 'filter-values' ne contient qu'un jeton de session
+from utils.session_state import read_state, write_state, update_state, latest_state_token, FILTER_STATE
+# Nombre d'éléments distincts par niveau du réseau (esquisses HyperLogLog)
+from utils.distinct_counts import DistinctCountStore, DISTINCT_COUNT_LABELS
 
 # Obtenir l'instance du gestionnaire de données
 data_manager = DataManager.get_instance()
 
-# Style uniforme pour les bulles de chat (côté utilisateur et assistant)
-chat_bubble_style = {
-    'backgroundColor': '#f0f0f0',  # Gris léger uniforme
-    'padding': '12px 16px',
-    'borderRadius': '12px',
-    'display': 'inline-block',
-    'maxWidth': '80%',
-    'marginBottom': '8px',
-    'fontSize': '14px',
-    'lineHeight': '1.5',
-    'color': sfr_colors['dark_grey'],
-    'boxShadow': '0 1px 2px rgba(0,0,0,0.07)',
-}
-
-# Style pour la bulle de l'utilisateur (différence sur la position)
-user_bubble_style = chat_bubble_style.copy()
-user_bubble_style.update({
-    'float': 'right',
-    'clear': 'both',
-    'marginLeft': 'auto',
-    'marginRight': '0',
-})
-
-# Style pour la bulle de l'assistant (différence sur la position)
-# Style pour la bulle de l'assistant (différence sur la position)
-assistant_bubble_style = chat_bubble_style.copy()
-assistant_bubble_style.update({
-    'float': 'left',
-    'clear': 'both',
-    'maxWidth': '95%',  # Augmenter la largeur maximale
-    'minWidth': '800px', # Largeur minimale pour contenir les graphiques
-    'width': 'auto'      # Largeur automatique
-})
-# Style pour les boutons de statistiques
-stats_button_style = {
-    "backgroundColor": "#f0f0f0",
-    "border": "1px solid #ddd",
-    "borderRadius": "20px",
-    "padding": "10px 15px",
-    "margin": "5px 0",
-    "width": "100%",
-    "textAlign": "center",
-    "cursor": "pointer",
-    "transition": "all 0.2s ease",
-    "boxShadow": "0 2px 4px rgba(0,0,0,0.05)",
-    "color": "#404040",
-    "fontSize": "14px"
-}
-
 def format_filter_selection(structure_filters, attributs_filters, temporels_filters):
     """
     Formate les filtres sélectionnés en une liste claire
@@ -112,11 +96,11 @@ def format_filter_selection(structure_filters, attributs_filters, temporels_filt
      State('filtres-attributs', 'value'),
      State('filtres-temporels', 'value'),
      State('selected-filter-categories', 'data'),
-     State('chat-messages', 'children')],
+     State('chat-session-id', 'data')],
     prevent_initial_call=True
 )
 def toggle_filter_panels(select_clicks, back_clicks, structure_filters, attributs_filters, 
-                         temporels_filters, selected_filters, chat_messages):
+                         temporels_filters, selected_filters, session_id):
     """
     Gère la transition entre la phase de sélection et la phase de configuration
     """
@@ -135,7 +119,7 @@ def toggle_filter_panels(select_clicks, back_clicks, structure_filters, attribut
         
         # Si aucun filtre n'est sélectionné, ne rien faire
         if not all_filters:
-            return {'display': 'block'}, {'display': 'none'}, [], [], chat_messages
+            return {'display': 'block'}, {'display': 'none'}, [], [], no_update
         
         # Créer les composants de filtres
         filter_components = []
@@ -164,50 +148,28 @@ def toggle_filter_panels(select_clicks, back_clicks, structure_filters, attribut
             filter_options = data_manager.get_filter_options(filter_name)
             filter_components.append(create_filter_component(filter_name, filter_options))
         
-        # Ajouter message au chat
-        current_time = datetime.now().strftime("%H:%M")
-        
         # Message utilisateur dans le chat
-        user_message = html.Div([
-            html.Div([
-                html.P("J'ai sélectionné les filtres suivants :"),
-                format_filter_selection(structure_filters, attributs_filters, temporels_filters)
-            ],
-            style=user_bubble_style),
-            html.Small(current_time, 
-                       style={'fontSize': '10px', 
-                              'color': '#888', 
-                              'marginTop': '5px', 
-                              'display': 'block',
-                              'textAlign': 'right',
-                              'clear': 'both'})
+        user_message = create_user_message([
+            html.P("J'ai sélectionné les filtres suivants :"),
+            format_filter_selection(structure_filters, attributs_filters, temporels_filters)
         ])
         
         # Réponse de l'assistant dans le chat
-        assistant_message = html.Div([
-            html.Div([
-                "Ces filtres sont bien pris en compte. Vous pouvez maintenant les configurer dans la section \"Configuration des filtres\".",
-            ],
-                    style=assistant_bubble_style),
-            html.Small(current_time, 
-                      style={'fontSize': '10px', 
-                            'color': '#888', 
-                            'marginTop': '5px', 
-                            'display': 'block',
-                            'clear': 'both'})
-        ])
+        assistant_message = create_assistant_message(
+            "Ces filtres sont bien pris en compte. Vous pouvez maintenant les configurer dans la section \"Configuration des filtres\"."
+        )
         
         # Mettre à jour le chat
-        updated_chat = chat_messages + [user_message, assistant_message]
+        updated_chat = append_chat_messages(session_id, user_message, assistant_message)
         
         return {'display': 'none'}, {'display': 'block'}, all_filters, filter_components, updated_chat
     
     # Cas 2: Retour à la sélection
     elif trigger_id == 'back-to-selection':
-        return {'display': 'block'}, {'display': 'none'}, selected_filters, [], chat_messages
+        return {'display': 'block'}, {'display': 'none'}, selected_filters, [], no_update
     
     # Par défaut, ne rien changer
-    return {'display': 'block'}, {'display': 'none'}, [], [], chat_messages
+    return {'display': 'block'}, {'display': 'none'}, [], [], no_update
 
 @callback(
     [Output('filter-values', 'data'),
@@ -218,17 +180,17 @@ def toggle_filter_panels(select_clicks, back_clicks, structure_filters, attribut
     [State({'type': 'filter-component', 'name': ALL}, 'value'),
      State({'type': 'filter-component', 'name': ALL}, 'id'),
      State('filter-values', 'data'),
-     State('chat-messages', 'children')],
+     State('chat-session-id', 'data')],
     prevent_initial_call=True
 )
-def apply_filter(apply_clicks, filter_values, filter_ids, current_filters, chat_messages):
+def apply_filter(apply_clicks, filter_values, filter_ids, filter_token, session_id):
     """
     Applique un filtre spécifique uniquement lorsque le bouton Appliquer est cliqué
     """
     # Vérifier si le callback a bien été déclenché par un clic sur Appliquer
     trigger = ctx.triggered_id
     if not trigger or not any(apply_clicks):
-        return current_filters, no_update, no_update, chat_messages
+        return filter_token, no_update, no_update, no_update
     
     filter_name = trigger['name']
     
@@ -240,26 +202,23 @@ def apply_filter(apply_clicks, filter_values, filter_ids, current_filters, chat_
             break
     
     if filter_index is None:
-        return current_filters, no_update, no_update, chat_messages
+        return filter_token, no_update, no_update, no_update
     
     # Récupérer la valeur du filtre
     filter_value = filter_values[filter_index]
     
-    # Mettre à jour les filtres
-    updated_filters = current_filters.copy() if current_filters else {}
-    updated_filters[filter_name] = filter_value
-    
-    # Obtenir le nombre de lignes après filtrage
-    row_count = data_manager.get_filtered_row_count(updated_filters)
+    # Numéroter la demande : une demande dépassée par un clic plus récent abandonne ses calculs
+    coalescer = RequestCoalescer.get_instance()
+    sequence = coalescer.begin(session_id, FILTER_CHANNEL)
     
-    # Créer le message de statistiques (uniquement nombre d'observations)
-    stats_message = html.Div([
-        html.I(className="fas fa-info-circle", style={'marginRight': '8px', 'color': sfr_colors['red']}),
-        f"Nombre d'observations : {row_count:,}".replace(',', ' ')
-    ], style={'backgroundColor': '#f0f0f0', 'padding': '10px', 'borderRadius': '5px', 'fontSize': '14px'})
+    # Enregistrer immédiatement le filtre dans les filtres de la session (sous verrou : les clics
+    # rapprochés sur d'autres filtres partent tous de la dernière version et aucun n'est perdu)
+    def merge_filter(filters):
+        filters[filter_name] = filter_value
+        filters[SEQUENCE_KEY] = max(filters.get(SEQUENCE_KEY, 0), sequence)
+        return filters
     
-    # État des filtres vide (pour compatibilité avec les callbacks)
-    filter_status = html.Div(style={'display': 'none'})
+    filter_token, updated_filters = update_state(filter_token, FILTER_STATE, merge_filter, session_id)
     
     # Formater la valeur du filtre pour l'affichage
     display_value = filter_value
@@ -278,21 +237,8 @@ def apply_filter(apply_clicks, filter_values, filter_ids, current_filters, chat_
                          "Nouvelle boucle", "DSP 1", "DEP_PEAG_OLT_match"]:
         display_value = filter_value
     
-    # Ajouter message au chat
-    current_time = datetime.now().strftime("%H:%M")
-    
     # Message utilisateur dans le chat
-    user_message = html.Div([
-        html.Div(f"J'ai configuré le filtre {filter_name} : {display_value}",
-                style=user_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'textAlign': 'right',
-                        'clear': 'both'})
-    ])
+    user_message = create_user_message(f"J'ai configuré le filtre {filter_name} : {display_value}")
     
     # Réponse de l'assistant dans le chat avec potentiellement la carte
     assistant_message_content = []
@@ -303,80 +249,70 @@ def apply_filter(apply_clicks, filter_values, filter_ids, current_filters, chat_
                 style={'marginBottom': '10px'})
     )
     
-    # Si le filtre est sur le département ET qu'une valeur spécifique est sélectionnée
-    if filter_name == "Département" and filter_value:
-        # S'assurer que filter_value est une chaîne (code département)
-        department_code = str(filter_value)
-        # Ajouter la carte seulement si un département spécifique est sélectionné
-        assistant_message_content.append(
-            html.Div([
-                html.P("Carte du département sélectionné :", 
-                    style={
-                        'fontWeight': 'bold', 
-                        'marginTop': '15px', 
-                        'marginBottom': '10px',
-                        'fontSize': '14px'
-                    }),
-                create_france_map_with_department(department_code)
-            ], style={
-                'width': '100%',
-                'display': 'flex',
-                'flexDirection': 'column',
-                'alignItems': 'center'
-            })
-        )
+    # Calculs coûteux (statistiques, carte) abandonnés dès qu'un clic plus récent arrive ;
+    # les messages d'une demande abandonnée sont transmis par la demande qui aboutit
+    try:
+        coalescer.check(session_id, FILTER_CHANNEL, sequence)
+        
+        # Obtenir le nombre de lignes après filtrage
+        row_count = data_manager.get_filtered_row_count(updated_filters)
+        coalescer.check(session_id, FILTER_CHANNEL, sequence)
+        
+        # Nombre d'éléments distincts de chaque niveau (estimé sauf filtre hors partitions)
+        distinct = DistinctCountStore.get_instance().distinct_counts(updated_filters)
+        coalescer.check(session_id, FILTER_CHANNEL, sequence)
+        
+        # Si le filtre est sur le département ET qu'une valeur spécifique est sélectionnée
+        if filter_name == "Département" and filter_value:
+            # S'assurer que filter_value est une chaîne (code département)
+            department_code = str(filter_value)
+            # Ajouter la carte seulement si un département spécifique est sélectionné
+            assistant_message_content.append(
+                html.Div([
+                    html.P("Carte du département sélectionné :", 
+                        style={
+                            'fontWeight': 'bold', 
+                            'marginTop': '15px', 
+                            'marginBottom': '10px',
+                            'fontSize': '14px'
+                        }),
+                    create_france_map_with_department(department_code)
+                ], style={
+                    'width': '100%',
+                    'display': 'flex',
+                    'flexDirection': 'column',
+                    'alignItems': 'center'
+                })
+            )
+    except PreventUpdate:
+        coalescer.defer(session_id, FILTER_CHANNEL, sequence,
+                        [user_message, create_assistant_message(assistant_message_content)])
+        raise
+    
+    prefix = "≈ " if distinct['estimated'] else ""
+    distinct_text = " · ".join(
+        f"{DISTINCT_COUNT_LABELS[col]} : {prefix}{count:,}".replace(',', ' ')
+        for col, count in distinct['counts'].items()
+    )
     
-    # Ajouter les quatre boutons de statistiques
-    assistant_message_content.append(html.Div([
-        html.Button(
-            [
-                html.I(className="fas fa-network-wired", style={"marginRight": "8px"}),
-                "Statistiques sur la structure du réseau"
-            ],
-            id="btn-structure-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-cog", style={"marginRight": "8px"}),
-                "Statistiques sur les attributs techniques"
-            ],
-            id="btn-attributes-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-clock", style={"marginRight": "8px"}),
-                "Statistiques temporelles"
-            ],
-            id="btn-temporal-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-tachometer-alt", style={"marginRight": "8px"}),
-                "Agrégation et statistiques sur le temps DNS"
-            ],
-            id="btn-dns-stats",
-            style=stats_button_style
-        )
-    ], style={'display': 'flex', 'flexDirection': 'column', 'gap': '10px', 'marginTop': '10px'}))
-    
-    assistant_message = html.Div([
-        html.Div(assistant_message_content,
-                style=assistant_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
+    # Créer le message de statistiques (nombre d'observations et éléments distincts)
+    stats_message = html.Div([
+        html.Div([
+            html.I(className="fas fa-info-circle", style={'marginRight': '8px', 'color': sfr_colors['red']}),
+            f"Nombre d'observations : {row_count:,}".replace(',', ' ')
+        ]),
+        html.Div(distinct_text, style={'fontSize': '12px', 'color': '#666', 'marginTop': '4px'})
+    ], style={'backgroundColor': '#f0f0f0', 'padding': '10px', 'borderRadius': '5px', 'fontSize': '14px'})
     
-    # Mettre à jour le chat
-    updated_chat = chat_messages + [user_message, assistant_message]
+    # État des filtres vide (pour compatibilité avec les callbacks)
+    filter_status = html.Div(style={'display': 'none'})
+    
+    # Mettre à jour le chat avec les messages des demandes abandonnées puis de celle-ci
+    pending_messages = coalescer.drain(session_id, FILTER_CHANNEL, sequence)
+    updated_chat = append_chat_messages(session_id, *pending_messages, user_message,
+                                        create_assistant_message(assistant_message_content))
     
-    return updated_filters, stats_message, filter_status, updated_chat
+    return filter_token, stats_message, filter_status, updated_chat
 
 # Callback pour réinitialiser tous les filtres
 @callback(
@@ -385,15 +321,22 @@ def apply_filter(apply_clicks, filter_values, filter_ids, current_filters, chat_
      Output('filter-status', 'children', allow_duplicate=True),
      Output('chat-messages', 'children', allow_duplicate=True)],
     Input('reset-all-filters', 'n_clicks'),
-    [State('chat-messages', 'children')],
+    State('chat-session-id', 'data'),
     prevent_initial_call=True
 )
-def reset_all_filters(n_clicks, chat_messages):
+def reset_all_filters(n_clicks, session_id):
     """
     Réinitialise tous les filtres appliqués
     """
     if not n_clicks:
-        return {}, no_update, no_update, chat_messages
+        return {}, no_update, no_update, no_update
+    
+    # Les demandes d'application de filtres encore en cours sont dépassées
+    coalescer = RequestCoalescer.get_instance()
+    sequence = coalescer.begin(session_id, FILTER_CHANNEL)
+    
+    # Vider les filtres conservés côté serveur (les prochains clics repartent de zéro)
+    write_state(None, FILTER_STATE, {}, session_id)
     
     # Réinitialiser les filtres
     empty_filters = {}
@@ -407,55 +350,58 @@ def reset_all_filters(n_clicks, chat_messages):
     # Réinitialiser l'état des filtres (vide)
     filter_status = html.Div(style={'display': 'none'})
     
-    # Ajouter message au chat
-    current_time = datetime.now().strftime("%H:%M")
-    
     # Message utilisateur dans le chat
-    user_message = html.Div([
-        html.Div("Je souhaite réinitialiser tous les filtres",
-                style=user_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'textAlign': 'right',
-                        'clear': 'both'})
-    ])
+    user_message = create_user_message("Je souhaite réinitialiser tous les filtres")
     
     # Réponse de l'assistant dans le chat
-    assistant_message = html.Div([
-        html.Div("Tous les filtres ont été réinitialisés.",
-                style=assistant_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
+    assistant_message = create_assistant_message("Tous les filtres ont été réinitialisés.")
     
     # Mettre à jour le chat
-    updated_chat = chat_messages + [user_message, assistant_message]
+    # Messages des clics abandonnés transmis avant celui de la réinitialisation
+    # (ceux des clics abandonnés après elle sont ignorés)
+    pending_messages = coalescer.drain(session_id, FILTER_CHANNEL, sequence)
+    updated_chat = append_chat_messages(session_id, *pending_messages, user_message, assistant_message)
     
     return empty_filters, stats_message, filter_status, updated_chat
 
+# Callback pour activer les boutons de statistiques de la barre d'actions lorsque des filtres sont appliqués
+@callback(
+    [Output(button_id, 'disabled') for button_id in FILTERED_STATS_ACTIONS],
+    Input('filter-values', 'data')
+)
+def update_stats_action_bar(filter_values):
+    """
+    Les statistiques portent sur les données filtrées : leurs boutons
+    restent désactivés tant qu'aucun filtre n'est appliqué
+    """
+    return [not filter_values] * len(FILTERED_STATS_ACTIONS)
+
 # Callback pour mettre à jour dynamiquement les options des filtres
 @callback(
     [Output({'type': 'filter-component', 'name': ALL}, 'options'),
      Output({'type': 'filter-component', 'name': ALL}, 'value')],
     [Input('filter-values', 'data')],
     [State({'type': 'filter-component', 'name': ALL}, 'id'),
-     State({'type': 'filter-component', 'name': ALL}, 'value')]
+     State({'type': 'filter-component', 'name': ALL}, 'value'),
+     State('chat-session-id', 'data')]
 )
-def update_filter_options(filter_values, filter_ids, current_values):
+def update_filter_options(filter_token, filter_ids, current_values, session_id):
     """
     Met à jour les options disponibles pour tous les filtres
     en fonction des filtres déjà appliqués
     """
+    filter_values = read_state(filter_token, FILTER_STATE)
     if not filter_values:
         return [no_update] * len(filter_ids), [no_update] * len(filter_ids)
     
+    # Numéro de la demande ayant produit ces filtres : le calcul est abandonné
+    # dès qu'une application de filtre plus récente arrive
+    coalescer = RequestCoalescer.get_instance()
+    sequence = filter_values.get(SEQUENCE_KEY)
+    if sequence is not None:
+        coalescer.begin(session_id, FILTER_CHANNEL, sequence)
+    filter_values = strip_request_metadata(filter_values)
+    
     # Préparation des listes pour les outputs
     updated_options = []
     updated_values = []
@@ -469,6 +415,8 @@ def update_filter_options(filter_values, filter_ids, current_values):
         current_filters = {k: v for k, v in filter_values.items() if k != filter_name}
         
         # Obtenir les nouvelles options pour ce filtre
+        if sequence is not None:
+            coalescer.check(session_id, FILTER_CHANNEL, sequence)
         new_options = data_manager.get_filter_options(filter_name, current_filters)
         
         # Préparer les options pour différents types de composants
@@ -584,43 +532,39 @@ from utils.graph_utils import (
 # Obtenir l'instance du gestionnaire de données
 data_manager = DataManager.get_instance()
 
+# Cache partagé des graphiques statistiques
+figure_cache = FigureCache.get_instance()
+
 # Callback pour gérer le clic sur le bouton de statistiques de structure
 @callback(
     Output('chat-messages', 'children', allow_duplicate=True),
     Input('btn-structure-stats', 'n_clicks'),
     [State('filter-values', 'data'),
-     State('chat-messages', 'children')],
+     State('chat-session-id', 'data')],
     prevent_initial_call=True
 )
-def display_structure_stats(n_clicks, current_filters, chat_messages):
+def display_structure_stats(n_clicks, filter_token, session_id):
     """
     Affiche les graphiques statistiques de structure lorsque le bouton est cliqué
     et ajoute les boutons de statistiques après les graphiques
     """
-    if not n_clicks or not current_filters:
-        return chat_messages
-    
-    # Obtenir les données filtrées
-    filtered_df = data_manager.filter_dataframe(current_filters)
-    
-    # Créer les graphiques (en passant les filtres actuels)
-    stats_graphs = create_structure_stats_graphs(filtered_df, current_filters)
-    
-    # Date et heure actuelles
-    current_time = datetime.now().strftime("%H:%M")
+    if not n_clicks:
+        return no_update
+    # Version des filtres du plan, relue telle quelle par les sections à leur ouverture
+    section_token = latest_state_token(filter_token, FILTER_STATE)
+    current_filters = read_state(section_token, FILTER_STATE, exact=True)
+    if not current_filters:
+        return no_update
+    
+    # Plan des sections (en-têtes seuls) : chaque graphique est construit à l'ouverture de sa section
+    outline = figure_cache.get_or_build(
+        'structure_stats_outline', current_filters,
+        lambda: describe_structure_stats(data_manager.filter_dataframe(current_filters), current_filters)
+    )
+    stats_graphs = create_lazy_stats_sections('structure', outline, section_token, "Statistiques de structure")
     
     # Message utilisateur dans le chat
-    user_message = html.Div([
-        html.Div("Je souhaite voir les statistiques de structure du réseau",
-                style=user_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'textAlign': 'right',
-                        'clear': 'both'})
-    ])
+    user_message = create_user_message("Je souhaite voir les statistiques de structure du réseau")
     
     # Message de l'assistant avec les graphiques
     assistant_content = [
@@ -631,59 +575,11 @@ def display_structure_stats(n_clicks, current_filters, chat_messages):
     # Ajouter les graphiques au contenu de l'assistant
     assistant_content.extend(stats_graphs)
     
-    # Ajouter les quatre boutons de statistiques après les graphiques
-    assistant_content.append(html.Div([
-        html.Div("Souhaitez-vous explorer d'autres statistiques ?", 
-                style={'marginTop': '25px', 'marginBottom': '15px', 'fontWeight': 'bold'}),
-        html.Button(
-            [
-                html.I(className="fas fa-network-wired", style={"marginRight": "8px"}),
-                "Statistiques sur la structure du réseau"
-            ],
-            id="btn-structure-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-cog", style={"marginRight": "8px"}),
-                "Statistiques sur les attributs techniques"
-            ],
-            id="btn-attributes-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-clock", style={"marginRight": "8px"}),
-                "Statistiques temporelles"
-            ],
-            id="btn-temporal-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-tachometer-alt", style={"marginRight": "8px"}),
-                "Agrégation et statistiques sur le temps DNS"
-            ],
-            id="btn-dns-stats",
-            style=stats_button_style
-        )
-    ], style={'display': 'flex', 'flexDirection': 'column', 'gap': '10px', 'marginTop': '15px', 'marginBottom': '10px',
-              'backgroundColor': '#f9f9f9', 'padding': '15px', 'borderRadius': '8px'}))
-    
     # Message de l'assistant
-    assistant_message = html.Div([
-        html.Div(assistant_content,
-                style=assistant_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
+    assistant_message = create_assistant_message(assistant_content)
     
     # Mettre à jour le chat
-    updated_chat = chat_messages + [user_message, assistant_message]
+    updated_chat = append_chat_messages(session_id, user_message, assistant_message)
     
     return updated_chat
 
@@ -692,38 +588,28 @@ def display_structure_stats(n_clicks, current_filters, chat_messages):
     Output('chat-messages', 'children', allow_duplicate=True),
     Input('btn-attributes-stats', 'n_clicks'),
     [State('filter-values', 'data'),
-     State('chat-messages', 'children')],
+     State('chat-session-id', 'data')],
     prevent_initial_call=True
 )
-def display_attributes_stats(n_clicks, current_filters, chat_messages):
+def display_attributes_stats(n_clicks, filter_token, session_id):
     """
     Affiche les graphiques statistiques d'attributs lorsque le bouton est cliqué
     et ajoute les boutons de statistiques après les graphiques
     """
-    if not n_clicks or not current_filters:
-        return chat_messages
-    
-    # Obtenir les données filtrées
-    filtered_df = data_manager.filter_dataframe(current_filters)
-    
-    # Créer les graphiques
-    stats_graphs = create_attributes_stats_graphs(filtered_df)
-    
-    # Date et heure actuelles
-    current_time = datetime.now().strftime("%H:%M")
+    if not n_clicks:
+        return no_update
+    current_filters = read_state(filter_token, FILTER_STATE)
+    if not current_filters:
+        return no_update
+    
+    # Créer les graphiques, ou les relire du cache
+    stats_graphs = figure_cache.get_or_build(
+        'attributes_stats', current_filters,
+        lambda: create_attributes_stats_graphs(data_manager.filter_dataframe(current_filters))
+    )
     
     # Message utilisateur dans le chat
-    user_message = html.Div([
-        html.Div("Je souhaite voir les statistiques des attributs techniques",
-                style=user_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'textAlign': 'right',
-                        'clear': 'both'})
-    ])
+    user_message = create_user_message("Je souhaite voir les statistiques des attributs techniques")
     
     # Message de l'assistant avec les graphiques
     assistant_content = [
@@ -734,59 +620,11 @@ def display_attributes_stats(n_clicks, current_filters, chat_messages):
     # Ajouter les graphiques au contenu de l'assistant
     assistant_content.extend(stats_graphs)
     
-    # Ajouter les quatre boutons de statistiques après les graphiques
-    assistant_content.append(html.Div([
-        html.Div("Souhaitez-vous explorer d'autres statistiques ?", 
-                style={'marginTop': '25px', 'marginBottom': '15px', 'fontWeight': 'bold'}),
-        html.Button(
-            [
-                html.I(className="fas fa-network-wired", style={"marginRight": "8px"}),
-                "Statistiques sur la structure du réseau"
-            ],
-            id="btn-structure-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-cog", style={"marginRight": "8px"}),
-                "Statistiques sur les attributs techniques"
-            ],
-            id="btn-attributes-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-clock", style={"marginRight": "8px"}),
-                "Statistiques temporelles"
-            ],
-            id="btn-temporal-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-tachometer-alt", style={"marginRight": "8px"}),
-                "Agrégation et statistiques sur le temps DNS"
-            ],
-            id="btn-dns-stats",
-            style=stats_button_style
-        )
-    ], style={'display': 'flex', 'flexDirection': 'column', 'gap': '10px', 'marginTop': '15px', 'marginBottom': '10px',
-              'backgroundColor': '#f9f9f9', 'padding': '15px', 'borderRadius': '8px'}))
-    
     # Message de l'assistant
-    assistant_message = html.Div([
-        html.Div(assistant_content,
-                style=assistant_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
+    assistant_message = create_assistant_message(assistant_content)
     
     # Mettre à jour le chat
-    updated_chat = chat_messages + [user_message, assistant_message]
+    updated_chat = append_chat_messages(session_id, user_message, assistant_message)
     
     return updated_chat
 
@@ -795,38 +633,31 @@ def display_attributes_stats(n_clicks, current_filters, chat_messages):
     Output('chat-messages', 'children', allow_duplicate=True),
     Input('btn-temporal-stats', 'n_clicks'),
     [State('filter-values', 'data'),
-     State('chat-messages', 'children')],
+     State('chat-session-id', 'data')],
     prevent_initial_call=True
 )
-def display_temporal_stats(n_clicks, current_filters, chat_messages):
+def display_temporal_stats(n_clicks, filter_token, session_id):
     """
     Affiche les graphiques statistiques temporels lorsque le bouton est cliqué
     et ajoute les boutons de statistiques après les graphiques
     """
-    if not n_clicks or not current_filters:
-        return chat_messages
-    
-    # Obtenir les données filtrées
-    filtered_df = data_manager.filter_dataframe(current_filters)
-    
-    # Créer les graphiques
-    stats_graphs = create_temporal_stats_graphs(filtered_df)
-    
-    # Date et heure actuelles
-    current_time = datetime.now().strftime("%H:%M")
+    if not n_clicks:
+        return no_update
+    # Version des filtres du plan, relue telle quelle par les sections à leur ouverture
+    section_token = latest_state_token(filter_token, FILTER_STATE)
+    current_filters = read_state(section_token, FILTER_STATE, exact=True)
+    if not current_filters:
+        return no_update
+    
+    # Plan des sections (en-têtes seuls) : chaque graphique est construit à l'ouverture de sa section
+    outline = figure_cache.get_or_build(
+        'temporal_stats_outline', current_filters,
+        lambda: describe_temporal_stats(data_manager.filter_dataframe(current_filters))
+    )
+    stats_graphs = create_lazy_stats_sections('temporal', outline, section_token, "Statistiques temporelles")
     
     # Message utilisateur dans le chat
-    user_message = html.Div([
-        html.Div("Je souhaite voir les statistiques temporelles",
-                style=user_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'textAlign': 'right',
-                        'clear': 'both'})
-    ])
+    user_message = create_user_message("Je souhaite voir les statistiques temporelles")
     
     # Message de l'assistant avec les graphiques
     assistant_content = [
@@ -837,92 +668,61 @@ def display_temporal_stats(n_clicks, current_filters, chat_messages):
     # Ajouter les graphiques au contenu de l'assistant
     assistant_content.extend(stats_graphs)
     
-    # Ajouter les quatre boutons de statistiques après les graphiques
-    assistant_content.append(html.Div([
-        html.Div("Souhaitez-vous explorer d'autres statistiques ?", 
-                style={'marginTop': '25px', 'marginBottom': '15px', 'fontWeight': 'bold'}),
-        html.Button(
-            [
-                html.I(className="fas fa-network-wired", style={"marginRight": "8px"}),
-                "Statistiques sur la structure du réseau"
-            ],
-            id="btn-structure-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-cog", style={"marginRight": "8px"}),
-                "Statistiques sur les attributs techniques"
-            ],
-            id="btn-attributes-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-clock", style={"marginRight": "8px"}),
-                "Statistiques temporelles"
-            ],
-            id="btn-temporal-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-tachometer-alt", style={"marginRight": "8px"}),
-                "Agrégation et statistiques sur le temps DNS"
-            ],
-            id="btn-dns-stats",
-            style=stats_button_style
-        )
-    ], style={'display': 'flex', 'flexDirection': 'column', 'gap': '10px', 'marginTop': '15px', 'marginBottom': '10px',
-              'backgroundColor': '#f9f9f9', 'padding': '15px', 'borderRadius': '8px'}))
-    
     # Message de l'assistant
-    assistant_message = html.Div([
-        html.Div(assistant_content,
-                style=assistant_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
+    assistant_message = create_assistant_message(assistant_content)
     
     # Mettre à jour le chat
-    updated_chat = chat_messages + [user_message, assistant_message]
+    updated_chat = append_chat_messages(session_id, user_message, assistant_message)
     
     return updated_chat
 
+# Callback de chargement à la demande d'une section de statistiques (structure, temporelles)
+@callback(
+    Output({'type': 'lazy-section-body', 'index': MATCH}, 'children'),
+    Input({'type': 'lazy-section', 'index': MATCH}, 'active_item'),
+    [State({'type': 'lazy-section-spec', 'index': MATCH}, 'data'),
+     State({'type': 'lazy-section-body', 'index': MATCH}, 'children')]
+)
+def load_lazy_stats_section(active_item, spec, loaded_children):
+    """
+    Construit les graphiques d'une section à sa première ouverture
+    (les sections jamais ouvertes ne sont pas calculées)
+    """
+    if not active_item or not spec or loaded_children:
+        return no_update
+    
+    view, section = spec['view'], spec['section']
+    section_filters = read_state(spec.get('filter_token'), FILTER_STATE, exact=True)
+    if section_filters is None:
+        return html.Div(
+            "Ces statistiques ne sont plus disponibles : relancez l'affichage avec les filtres courants.",
+            style=NO_DATA_STYLE
+        )
+    section_filters = strip_request_metadata(section_filters)
+    
+    # Graphiques de la section, ou relus du cache
+    return figure_cache.get_or_build(
+        f'{view}_stats:{section}', section_filters,
+        lambda: create_stats_section(view, data_manager.filter_dataframe(section_filters), section_filters, section)
+    )
+
 # Callback pour gérer le clic sur le bouton de statistiques DNS
 @callback(
     Output('chat-messages', 'children', allow_duplicate=True),
     Input('btn-dns-stats', 'n_clicks'),
     [State('filter-values', 'data'),
-     State('chat-messages', 'children')],
+     State('chat-session-id', 'data')],
     prevent_initial_call=True
 )
-def display_dns_aggregation_options(n_clicks, current_filters, chat_messages):
+def display_dns_aggregation_options(n_clicks, filter_token, session_id):
     """
     Affiche les options d'agrégation pour les statistiques DNS
     """
-    if not n_clicks or not current_filters:
-        return chat_messages
-    
-    # Date et heure actuelles
-    current_time = datetime.now().strftime("%H:%M")
+    if not n_clicks or not filter_token:
+        return no_update
     
     # Message utilisateur dans le chat
-    user_message = html.Div([
-        html.Div("Je souhaite voir les statistiques sur le temps moyen des tests DNS",
-                style=user_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'textAlign': 'right',
-                        'clear': 'both'})
-    ])
+    user_message = create_user_message("Je souhaite voir les statistiques sur le temps moyen des tests DNS")
     
     # Contenu de l'assistant avec les options d'agrégation
     assistant_content = [
@@ -949,38 +749,77 @@ def display_dns_aggregation_options(n_clicks, current_filters, chat_messages):
             )
         ], style={'marginBottom': '15px'}),
         
-        # Bouton pour lancer l'analyse
-        html.Button(
-            "Générer les statistiques DNS",
-            id='generate-dns-stats',
-            style={
-                'backgroundColor': sfr_colors['red'],
-                'color': 'white',
-                'border': 'none',
-                'padding': '10px 15px',
-                'borderRadius': '5px',
-                'cursor': 'pointer',
-                'fontWeight': 'bold'
-            }
-        )
+        # Mode d'affichage des 20 combinaisons
+        html.Div([
+            html.Label("Affichage :", 
+                     style={'fontWeight': 'bold', 'marginBottom': '10px'}),
+            dcc.RadioItems(
+                id='dns-display-mode',
+                options=[
+                    {'label': 'Détaillé (un graphique par combinaison)', 'value': 'detailed'},
+                    {'label': 'Compact (grille unique)', 'value': 'compact'}
+                ],
+                value='detailed',
+                style={'marginBottom': '15px'}
+            )
+        ], style={'marginBottom': '15px'}),
+        
+        # Fenêtre de comparaison pour la détection des dégradations
+        html.Div([
+            html.Label("Fenêtre de comparaison (dégradations) :", 
+                     style={'fontWeight': 'bold', 'marginBottom': '10px'}),
+            dcc.Dropdown(
+                id='dns-regression-window',
+                options=[
+                    {'label': '1 jour', 'value': 1},
+                    {'label': '3 jours', 'value': 3},
+                    {'label': '7 jours', 'value': 7},
+                    {'label': '14 jours', 'value': 14}
+                ],
+                value=7,
+                clearable=False,
+                style={'marginBottom': '15px'}
+            )
+        ], style={'marginBottom': '15px'}),
+        
+        # Boutons pour lancer l'analyse
+        html.Div([
+            html.Button(
+                "Générer les statistiques DNS",
+                id='generate-dns-stats',
+                style={
+                    'backgroundColor': sfr_colors['red'],
+                    'color': 'white',
+                    'border': 'none',
+                    'padding': '10px 15px',
+                    'borderRadius': '5px',
+                    'cursor': 'pointer',
+                    'fontWeight': 'bold'
+                }
+            ),
+            html.Button(
+                "Détecter les dégradations DNS",
+                id='detect-dns-regressions',
+                style={
+                    'backgroundColor': sfr_colors['dark_grey'],
+                    'color': 'white',
+                    'border': 'none',
+                    'padding': '10px 15px',
+                    'borderRadius': '5px',
+                    'cursor': 'pointer',
+                    'fontWeight': 'bold'
+                }
+            )
+        ], style={'display': 'flex', 'gap': '10px', 'flexWrap': 'wrap'})
     ], style={'backgroundColor': '#f9f9f9', 'padding': '15px', 'borderRadius': '8px'})
     
     assistant_content.append(aggregation_options)
     
     # Message de l'assistant
-    assistant_message = html.Div([
-        html.Div(assistant_content,
-                style=assistant_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
+    assistant_message = create_assistant_message(assistant_content)
     
     # Mettre à jour le chat
-    updated_chat = chat_messages + [user_message, assistant_message]
+    updated_chat = append_chat_messages(session_id, user_message, assistant_message)
     
     return updated_chat
 
@@ -988,36 +827,27 @@ def display_dns_aggregation_options(n_clicks, current_filters, chat_messages):
     Output('chat-messages', 'children', allow_duplicate=True),
     Input('generate-dns-stats', 'n_clicks'),
     [State('dns-aggregation-dims', 'value'),
+     State('dns-display-mode', 'value'),
      State('filter-values', 'data'),
-     State('chat-messages', 'children')],
+     State('chat-session-id', 'data')],
     prevent_initial_call=True
 )
-def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_messages):
+def generate_dns_stats(n_clicks, aggregation_dims, display_mode, filter_token, session_id):
     """
     Génère les statistiques DNS en fonction des dimensions d'agrégation sélectionnées
-    Affiche les 20 combinaisons avec le temps DNS moyen le plus élevé
+    Affiche les 20 combinaisons avec le temps DNS moyen le plus élevé,
+    soit un graphique par combinaison, soit une grille compacte unique
     """
     if not n_clicks or not aggregation_dims:
-        return chat_messages
-    
-    # Obtenir les données filtrées
-    filtered_df = data_manager.filter_dataframe(current_filters)
+        return no_update
+    current_filters = read_state(filter_token, FILTER_STATE)
     
-    # Date et heure actuelles
-    current_time = datetime.now().strftime("%H:%M")
+    # Agrégats DNS partagés : un changement de dimensions ne repasse par
+    # filter_dataframe que si les dimensions demandées sont plus fines
+    rollup_store = DnsRollupStore.get_instance()
     
     # Message utilisateur
-    user_message = html.Div([
-        html.Div(f"Je souhaite générer les statistiques DNS avec agrégation par : {', '.join(aggregation_dims)}",
-                style=user_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'textAlign': 'right',
-                        'clear': 'both'})
-    ])
+    user_message = create_user_message(f"Je souhaite générer les statistiques DNS avec agrégation par : {', '.join(aggregation_dims)}")
     
     # Styles uniformisés pour les titres et textes
     SECTION_TITLE_STYLE = {
@@ -1036,18 +866,6 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
         'color': '#000000'  # Noir pour tous les sous-titres
     }
     
-    GRAPH_TITLE_FONT = dict(
-        size=15,
-        color='#000000',  # Noir pour les titres de graphiques
-        family='Arial, sans-serif'
-    )
-    
-    GRAPH_FONT = dict(
-        size=13,
-        color='#000000',
-        family='Arial, sans-serif'
-    )
-    
     GRAPH_CONTAINER_STYLE = {
         'marginBottom': '25px', 
         'border': '1px solid #ddd', 
@@ -1060,62 +878,23 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
     
     # Préparation et calcul des statistiques
     try:
-        # Vérifier les colonnes disponibles
-        print("Colonnes disponibles:", filtered_df.columns.tolist())
-        
         # Identifier les colonnes pour jour, heure et date
-        jour_col = "day_of_week" if "day_of_week" in filtered_df.columns else "jour"
-        heure_col = "heure" if "heure" in filtered_df.columns else "hour"
-        date_col = "date" if "date" in filtered_df.columns else "date_hour"
-        
-        # Colonnes requises adaptées aux noms réels
-        required_cols = [jour_col, heure_col, "avg_dns_time", "nb_test_dns"]
-        if date_col in filtered_df.columns:
-            required_cols.append(date_col)
+        jour_col, heure_col, date_col = rollup_store.time_columns()
         
-        # Nettoyer les données avec les noms de colonnes corrects
-        df_cleaned = filtered_df.dropna(subset=required_cols + aggregation_dims).copy()
+        # Agrégation avec moyenne pondérée par le nombre de tests
+        # (dates ou jour/heure + dimensions choisies)
+        df_grouped = rollup_store.get_dns_aggregate(current_filters, aggregation_dims)
         
-        if len(df_cleaned) == 0:
+        if df_grouped.empty:
             assistant_content = [
                 html.Div("Aucune donnée disponible après filtrage pour l'analyse DNS", 
                          style={'color': '#000000', 'fontWeight': 'bold', 'margin': '20px 0'})
             ]
         else:
-            # Si nous avons une colonne de date, nous l'utiliserons pour l'axe X
-            # Sinon, nous créerons une série temporelle à partir de jour et heure
-            if date_col in df_cleaned.columns:
-                # S'assurer que la colonne date est au format datetime
-                df_cleaned[date_col] = pd.to_datetime(df_cleaned[date_col])
-                
-                # Dimensions d'agrégation avec la date
-                all_dims = [date_col] + aggregation_dims
-            else:
-                # Dimensions d'agrégation avec jour et heure
-                all_dims = [jour_col, heure_col] + aggregation_dims
-            
-            # Agrégation avec moyenne pondérée
-            df_grouped = df_cleaned.groupby(all_dims).agg(
-                moy_avg_dns_time=(
-                    "avg_dns_time",
-                    lambda x: (
-                        (x * df_cleaned.loc[x.index, "nb_test_dns"]).sum()
-                        / df_cleaned.loc[x.index, "nb_test_dns"].sum()
-                    ) if df_cleaned.loc[x.index, "nb_test_dns"].sum() > 0 else None
-                ),
-                total_tests_dns=("nb_test_dns", "sum")
-            ).reset_index()
-            
             # Si nous utilisons jour et heure, créons une colonne datetime
             if date_col not in df_grouped.columns:
-                # Créer une date de référence (pour combiner avec jour et heure)
-                base_date = pd.Timestamp('2023-01-01')  # Date arbitraire (un dimanche)
-                
-                # Créer une colonne datetime en combinant la date de référence, le jour de la semaine et l'heure
-                df_grouped['datetime'] = df_grouped.apply(
-                    lambda row: base_date + pd.Timedelta(days=int(row[jour_col])) + pd.Timedelta(hours=int(row[heure_col])),
-                    axis=1
-                )
+                # Créer une colonne datetime en combinant une date de référence, le jour de la semaine et l'heure
+                df_grouped['datetime'] = build_weekly_datetime(df_grouped[jour_col], df_grouped[heure_col])
                 x_col = 'datetime'
             else:
                 x_col = date_col
@@ -1165,10 +944,7 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
             assistant_content.append(stats_summary)
             
             # Créer un identifiant de combinaison unique pour chaque ensemble de dimensions d'agrégation
-            df_grouped['combination'] = df_grouped.apply(
-                lambda row: "-".join([str(row[dim]) for dim in aggregation_dims]),
-                axis=1
-            )
+            df_grouped['combination'] = build_combination_labels(df_grouped, aggregation_dims)
             
             # Trouver les 20 combinaisons avec le temps DNS moyen le plus élevé
             combo_avg_dns = df_grouped.groupby('combination')['moy_avg_dns_time'].mean().reset_index()
@@ -1180,8 +956,19 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
                 style=SECTION_TITLE_STYLE
             ))
             
-            # Créer un graphique pour chaque combinaison problématique
-            for combination in top_combinations:
+            # Mode compact : une seule figure en grille pour les 20 combinaisons
+            if display_mode == 'compact':
+                assistant_content.extend(create_dns_small_multiples(
+                    df_grouped,
+                    top_combinations,
+                    x_col,
+                    {combination: combination for combination in top_combinations},
+                    dns_avg
+                ))
+            
+            # Mode détaillé : créer un graphique pour chaque combinaison problématique
+            detailed_combinations = top_combinations if display_mode != 'compact' else []
+            for combination in detailed_combinations:
                 # Filtrer les données pour cette combinaison
                 combo_data = df_grouped[df_grouped['combination'] == combination]
                 
@@ -1228,8 +1015,11 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
                 # Créer un graphique d'évolution temporelle pour cette combinaison
                 combo_data_sorted = combo_data.sort_values(by=x_col)
                 
+                # Réduire la série (LTTB) avant de construire la figure
+                plot_data = downsample_frame(combo_data_sorted, x_col, 'moy_avg_dns_time')
+                
                 fig = px.line(
-                    combo_data_sorted,
+                    plot_data,
                     x=x_col,
                     y='moy_avg_dns_time',
                     title=f"Évolution temporelle du temps DNS",
@@ -1250,9 +1040,6 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
                 fig.update_layout(
                     height=350,
                     margin={"r": 20, "t": 50, "l": 20, "b": 50},
-                    font=GRAPH_FONT,
-                    title_font=GRAPH_TITLE_FONT,
-                    plot_bgcolor='white',
                     showlegend=False
                 )
                 
@@ -1265,10 +1052,16 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
                     annotation_position="bottom right"
                 )
                 
+                # Conserver la série complète pour recharger la fenêtre zoomée
+                if len(plot_data) < len(combo_data_sorted):
+                    attach_full_series(fig, {
+                        0: (combo_data_sorted[x_col], combo_data_sorted['moy_avg_dns_time'])
+                    })
+                
                 # Ajouter les statistiques et le graphique pour cette combinaison
                 combo_container = html.Div([
                     stats_container,
-                    dcc.Graph(figure=fig, config={'displayModeBar': False})
+                    create_downsampled_graph(fig, config={'displayModeBar': False})
                 ], style=GRAPH_CONTAINER_STYLE)
                 
                 assistant_content.append(combo_container)
@@ -1283,77 +1076,226 @@ def generate_dns_stats(n_clicks, aggregation_dims, current_filters, chat_message
         ]
     
     # Message de l'assistant
-    assistant_message = html.Div([
-        html.Div(assistant_content,
-                style=assistant_bubble_style),
-        html.Small(current_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
-    
-    # Mettre à jour le chat avec le premier message
-    updated_chat = chat_messages + [user_message, assistant_message]
-    
-    # Créer une nouvelle réponse de l'assistant avec les 4 boutons
-    buttons_time = datetime.now().strftime("%H:%M")
-    
-    # Boutons de statistiques
-    buttons_content = [
-        html.Div("Souhaitez-vous explorer d'autres statistiques ?",
-                style={'marginBottom': '10px', 'fontWeight': 'bold', 'color': '#000000'})
+    assistant_message = create_assistant_message(assistant_content)
+    
+    # Mettre à jour le chat
+    return append_chat_messages(session_id, user_message, assistant_message)
+
+@callback(
+    Output('chat-messages', 'children', allow_duplicate=True),
+    Input('detect-dns-regressions', 'n_clicks'),
+    [State('dns-aggregation-dims', 'value'),
+     State('dns-regression-window', 'value'),
+     State('filter-values', 'data'),
+     State('chat-session-id', 'data')],
+    prevent_initial_call=True
+)
+def generate_dns_regressions(n_clicks, aggregation_dims, window_days, filter_token, session_id):
+    """
+    Classe les combinaisons dont le temps DNS s'est significativement dégradé
+    entre la fenêtre de référence et la fenêtre courante
+    """
+    if not n_clicks or not aggregation_dims:
+        return no_update
+    current_filters = read_state(filter_token, FILTER_STATE)
+    
+    window_days = window_days or 7
+    
+    # Message utilisateur
+    user_message = create_user_message(f"Je souhaite détecter les dégradations DNS par : {', '.join(aggregation_dims)} "
+                 f"(fenêtre de {window_days} jour{'s' if window_days > 1 else ''})")
+    
+    SECTION_TITLE_STYLE = {
+        'fontSize': '16px',
+        'fontWeight': 'bold',
+        'marginTop': '20px',
+        'marginBottom': '15px',
+        'color': '#000000'
+    }
+    
+    try:
+        ranking, windows = detect_dns_regressions(current_filters, aggregation_dims, window_days=window_days)
+        
+        assistant_content = [
+            html.Div(f"Dégradations DNS par {', '.join(aggregation_dims)}", style=SECTION_TITLE_STYLE)
+        ]
+        
+        if windows['current'] is None or windows['baseline'] is None:
+            assistant_content.append(html.Div(
+                "Pas assez d'historique pour comparer deux fenêtres avec les filtres actuels",
+                style={'color': '#000000', 'fontWeight': 'bold', 'margin': '20px 0'}
+            ))
+        else:
+            def format_window(bounds):
+                return f"du {bounds[0]:%d/%m/%Y} au {bounds[1]:%d/%m/%Y}"
+            
+            assistant_content.append(html.Div(
+                f"Fenêtre de référence {format_window(windows['baseline'])}, "
+                f"fenêtre courante {format_window(windows['current'])}. "
+                f"{windows['evaluated']} combinaisons évaluées, "
+                f"{len(ranking)} dégradation{'s' if len(ranking) > 1 else ''} significative{'s' if len(ranking) > 1 else ''}.",
+                style={'marginBottom': '15px', 'color': '#000000'}
+            ))
+            
+            if not ranking.empty:
+                # Les 20 dégradations les plus significatives
+                top_ranking = ranking.head(20).copy()
+                top_ranking['combination'] = build_combination_labels(top_ranking, aggregation_dims)
+                
+                fig = px.bar(
+                    top_ranking.iloc[::-1],
+                    x='delta_ms',
+                    y='combination',
+                    orientation='h',
+                    color='z_score',
+                    color_continuous_scale=[[0, "#f5b5bd"], [1, "#e2001a"]],
+                    title="Hausse du temps DNS moyen (fenêtre courante vs référence)",
+                    labels={
+                        'delta_ms': "Hausse (ms)",
+                        'combination': "",
+                        'z_score': "Score z"
+                    }
+                )
+                fig.update_layout(
+                    height=max(300, 28 * len(top_ranking) + 120),
+                    margin={"r": 20, "t": 50, "l": 20, "b": 40}
+                )
+                assistant_content.append(dcc.Graph(figure=finalize_figure(fig, "dégradations DNS"), config={'displayModeBar': False}))
+                
+                table_rows = [
+                    html.Tr([
+                        html.Td(row.combination),
+                        html.Td(f"{row.baseline_dns_time:.2f} ms"),
+                        html.Td(f"{row.current_dns_time:.2f} ms"),
+                        html.Td(f"+{row.delta_ms:.2f} ms ({row.delta_pct:+.1f} %)"),
+                        html.Td(f"{row.z_score:.1f}"),
+                        html.Td(f"{int(row.current_tests):,}".replace(',', ' '))
+                    ])
+                    for row in top_ranking.itertuples(index=False)
+                ]
+                assistant_content.append(dbc.Table(
+                    [
+                        html.Thead(html.Tr([
+                            html.Th("Combinaison"),
+                            html.Th("Référence"),
+                            html.Th("Courant"),
+                            html.Th("Hausse"),
+                            html.Th("Score z"),
+                            html.Th("Tests (courant)")
+                        ], style={'backgroundColor': '#f0f0f0'})),
+                        html.Tbody(table_rows)
+                    ],
+                    bordered=True,
+                    hover=True,
+                    striped=True,
+                    size="sm",
+                    style={'marginTop': '10px'}
+                ))
+    
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        print(f"Erreur lors de la détection des dégradations DNS: {e}")
+        assistant_content = [
+            html.Div(f"Erreur lors de la détection des dégradations DNS: {str(e)}", 
+                     style={'color': '#000000', 'fontWeight': 'bold', 'margin': '20px 0'})
+        ]
+    
+    # Message de l'assistant
+    assistant_message = create_assistant_message(assistant_content)
+    
+    return append_chat_messages(session_id, user_message, assistant_message)
+# Callback pour gérer le clic sur le bouton de la carte nationale
+@callback(
+    Output('chat-messages', 'children', allow_duplicate=True),
+    Input('btn-national-map', 'n_clicks'),
+    State('chat-session-id', 'data'),
+    prevent_initial_call=True
+)
+def display_national_map(n_clicks, session_id):
+    """
+    Affiche la carte de France colorée par un indicateur agrégé par département
+    (calculé sur l'ensemble du réseau, indépendamment des filtres)
+    """
+    if not n_clicks:
+        return no_update
+    
+    # Message utilisateur dans le chat
+    user_message = create_user_message("Je souhaite voir la carte nationale des indicateurs")
+    
+    # Identifiant propre à ce message pour relier le choix d'indicateur à sa carte
+    map_index = uuid.uuid4().hex
+    
+    try:
+        if not DepartementGeoStore.get_instance().available:
+            map_content = [create_geometries_unavailable_message()]
+        else:
+            map_content = [
+                dcc.RadioItems(
+                    id={'type': 'national-map-metric', 'index': map_index},
+                    options=[
+                        {'label': config['label'], 'value': metric}
+                        for metric, config in NATIONAL_MAP_METRICS.items()
+                    ],
+                    value='observations',
+                    inline=True,
+                    inputStyle={'marginRight': '5px', 'marginLeft': '10px'},
+                    style={'marginBottom': '10px'}
+                ),
+                # Niveau de contamination du fichier d'anomalies (indicateur 'anomalies')
+                dcc.RadioItems(
+                    id={'type': 'national-map-contamination', 'index': map_index},
+                    options=[
+                        {'label': f"Contamination {level}", 'value': level}
+                        for level in CONTAMINATION_LEVELS
+                    ],
+                    value=DEFAULT_CONTAMINATION,
+                    inline=True,
+                    inputStyle={'marginRight': '5px', 'marginLeft': '10px'},
+                    style={'marginBottom': '10px', 'fontSize': '12px'}
+                ),
+                dcc.Graph(
+                    id={'type': 'national-map-graph', 'index': map_index},
+                    figure=create_france_metric_figure('observations'),
+                    style=MAP_GRAPH_STYLE,
+                    config={'displayModeBar': False}
+                )
+            ]
+    except Exception as e:
+        print(f"Erreur lors de la création de la carte nationale: {e}")
+        map_content = [
+            html.P(f"Aucune graphe disponible pour la carte nationale. Erreur: {str(e)}", 
+                   style=NO_DATA_STYLE)
+        ]
+    
+    assistant_content = [
+        html.Div("Indicateurs agrégés par département sur l'ensemble du réseau :",
+                style={'marginBottom': '10px'}),
+        html.Div(map_content, style={
+            'width': '100%',
+            'display': 'flex',
+            'flexDirection': 'column',
+            'alignItems': 'center'
+        })
     ]
     
-    # Ajouter les quatre boutons de statistiques
-    buttons_content.append(html.Div([
-        html.Button(
-            [
-                html.I(className="fas fa-network-wired", style={"marginRight": "8px"}),
-                "Statistiques sur la structure du réseau"
-            ],
-            id="btn-structure-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-cog", style={"marginRight": "8px"}),
-                "Statistiques sur les attributs techniques"
-            ],
-            id="btn-attributes-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-clock", style={"marginRight": "8px"}),
-                "Statistiques temporelles"
-            ],
-            id="btn-temporal-stats",
-            style=stats_button_style
-        ),
-        html.Button(
-            [
-                html.I(className="fas fa-tachometer-alt", style={"marginRight": "8px"}),
-                "Agrégation et statistiques sur le temps DNS"
-            ],
-            id="btn-dns-stats",
-            style=stats_button_style
-        )
-    ], style={'display': 'flex', 'flexDirection': 'column', 'gap': '10px', 'marginTop': '10px'}))
-    
-    buttons_message = html.Div([
-        html.Div(buttons_content,
-                style=assistant_bubble_style),
-        html.Small(buttons_time, 
-                  style={'fontSize': '10px', 
-                        'color': '#888', 
-                        'marginTop': '5px', 
-                        'display': 'block',
-                        'clear': 'both'})
-    ])
-    
-    # Ajouter cette réponse supplémentaire à la conversation
-    updated_chat = updated_chat + [buttons_message]
-    
-    return updated_chat
\ No newline at end of file
+    assistant_message = create_assistant_message(assistant_content)
+    
+    return append_chat_messages(session_id, user_message, assistant_message)
+
+@callback(
+    Output({'type': 'national-map-graph', 'index': MATCH}, 'figure'),
+    [Input({'type': 'national-map-metric', 'index': MATCH}, 'value'),
+     Input({'type': 'national-map-contamination', 'index': MATCH}, 'value')],
+    prevent_initial_call=True
+)
+def update_national_map_metric(metric, contamination):
+    """
+    Change l'indicateur ou le niveau de contamination affiché sur la carte nationale
+    (figures mémorisées)
+    """
+    if metric not in NATIONAL_MAP_METRICS:
+        return no_update
+    if contamination not in CONTAMINATION_LEVELS:
+        contamination = DEFAULT_CONTAMINATION
+    return create_france_metric_figure(metric, contamination)
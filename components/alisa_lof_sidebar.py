@@ -6,6 +6,11 @@ from styles.theme import sidebar_styles, sfr_colors
 from datetime import datetime, timedelta
 import pandas as pd
 import os
+from utils.search_index import SearchIndexRegistry, search_options
+from utils.session_state import write_state, LOF_FILTER_STATE
+
+# Nom de l'index de recherche des chaînes du fichier LOF
+LOF_CHAIN_INDEX = 'lof-chain'
 
 def create_alisa_lof_sidebar():
     """
@@ -19,7 +24,7 @@ def create_alisa_lof_sidebar():
     min_date = datetime.now().date()
     max_date = datetime.now().date()
     default_date = datetime.now().date()
-    unique_chains = ['Toutes']
+    unique_chains = []
     
     # Essayer de charger le fichier CSV
     try:
@@ -56,11 +61,14 @@ def create_alisa_lof_sidebar():
         default_date = max_date
         
         # Récupérer les chaînes uniques
-        unique_chains = ['Toutes'] + sorted(df_detected['chaine_id'].unique().tolist())
+        unique_chains = df_detected['chaine_id'].dropna().unique()
     
     except Exception as e:
         print(f"Erreur lors du chargement du fichier CSV: {e}")
     
+    # Index de recherche des chaînes : la liste déroulante ne reçoit que les meilleures correspondances
+    chain_index = SearchIndexRegistry.get_instance().register(LOF_CHAIN_INDEX, unique_chains)
+    
     # Options pour les seuils LOF
     lof_thresholds = [
         {'label': '0.01 (stricte)', 'value': '001'},
@@ -140,7 +148,7 @@ def create_alisa_lof_sidebar():
                 html.Label("Filtrer par chaîne", style=sidebar_styles['label']),
                 dcc.Dropdown(
                     id='lof-chain-filter',
-                    options=[{'label': chain, 'value': chain} for chain in unique_chains],
+                    options=search_options(chain_index, None, fixed_options=['Toutes']),
                     value='Toutes',
                     clearable=False
                 )
@@ -184,6 +192,17 @@ def create_alisa_lof_sidebar():
 
 # Callbacks pour la sidebar
 def init_alisa_lof_sidebar_callbacks(app):
+    # Options de chaîne correspondant au texte saisi dans la liste déroulante
+    @app.callback(
+        Output('lof-chain-filter', 'options'),
+        Input('lof-chain-filter', 'search_value'),
+        State('lof-chain-filter', 'value'),
+        prevent_initial_call=True
+    )
+    def search_lof_chains(search_value, selected_chain):
+        chain_index = SearchIndexRegistry.get_instance().get(LOF_CHAIN_INDEX)
+        return search_options(chain_index, search_value, selected=selected_chain, fixed_options=['Toutes'])
+    
     @app.callback(
         Output('lof-filter-values', 'data'),
         [Input('apply-lof-filters', 'n_clicks')],
@@ -192,20 +211,22 @@ def init_alisa_lof_sidebar_callbacks(app):
          State('lof-timeframe-selection', 'value'),
          State('lof-threshold-selection', 'value'),
          State('lof-chain-filter', 'value'),
-         State('lof-indicator-filter', 'value')]
+         State('lof-indicator-filter', 'value'),
+         State('lof-filter-values', 'data')]
     )
-    def update_lof_filters(n_clicks, date, hour, timeframe, lof_threshold, chain_filter, indicator_filter):
+    def update_lof_filters(n_clicks, date, hour, timeframe, lof_threshold, chain_filter, indicator_filter, filter_token):
         if n_clicks is None:
             return {}
         
-        return {
+        # Filtres conservés côté serveur : le Store ne reçoit que le jeton de la nouvelle version
+        return write_state(filter_token, LOF_FILTER_STATE, {
             'date': date,
             'hour': hour,
             'timeframe': timeframe,
             'lof_threshold': lof_threshold,
             'chain_filter': chain_filter,
             'indicator_filter': indicator_filter
-        }
+        })
     
     @app.callback(
         [Output('lof-date-picker', 'date'),
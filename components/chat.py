@@ -3,8 +3,9 @@ from dash import html, dcc
 from datetime import datetime
 import base64
 import os
-import pandas as pd
 from utils.data_loader import DataManager
+from utils.chat_transcript import create_history_loader
+from components.chat_messages import create_stats_action_bar
 
 def create_chat_component():
     """Crée le composant de chat complet"""
@@ -52,36 +53,28 @@ def create_chat_component():
         print(f"Erreur lors du chargement du logo: {e}")
         img_src = ""  # Image vide en cas d'erreur
     
-    # Préparer les statistiques générales
-    try:
-        nb_observations = len(data_manager.df)
-        nb_olts = data_manager.df['olt_name'].nunique()
-        nb_peags = data_manager.df['peag_nro'].nunique()
-        nb_departements = data_manager.df['code_departement'].nunique()
-        nb_pop_dns = data_manager.df['pop_dns'].nunique()
-        nb_boucles = data_manager.df['boucle'].nunique()
-        nb_pebibs = data_manager.df['pebib'].nunique()
-        
-        # Formatage des dates min et max
-        dates = pd.to_datetime(data_manager.df['date'])
-        min_date = dates.min().strftime('%d/%m/%Y')
-        max_date = dates.max().strftime('%d/%m/%Y')
+    # Statistiques générales, précalculées au chargement des données (DataManager.summary)
+    summary = data_manager.summary
+    nb_observations = summary['nb_observations']
+    nb_olts = summary['nb_olts']
+    nb_peags = summary['nb_peags']
+    nb_departements = summary['nb_departements']
+    nb_pop_dns = summary['nb_pop_dns']
+    nb_boucles = summary['nb_boucles']
+    nb_pebibs = summary['nb_pebibs']
+    
+    # Formatage des dates min et max
+    if summary['date_min'] and summary['date_max']:
+        min_date = datetime.strptime(summary['date_min'], '%Y-%m-%d').strftime('%d/%m/%Y')
+        max_date = datetime.strptime(summary['date_max'], '%Y-%m-%d').strftime('%d/%m/%Y')
         periode = f"{min_date} - {max_date}"
-    except Exception as e:
-        print(f"Erreur lors du calcul des statistiques: {e}")
-        # Valeurs par défaut en cas d'erreur
-        nb_observations = "-"
-        nb_olts = "-"
-        nb_peags = "-" 
-        nb_departements = "-"
-        nb_pop_dns = "-"
-        nb_boucles = "-"
-        nb_pebibs = "-"
+    else:
         periode = "-"
-        
     
     # Formater les nombres avec espace comme séparateur de milliers
     def format_number(num):
+        if num is None:
+            return "-"
         if isinstance(num, (int, float)):
             return f"{num:,}".replace(',', ' ')
         return str(num)
@@ -200,17 +193,24 @@ def create_chat_component():
                           style={"marginTop": "15px"})
                 ], style=chat_bubble_style),
                 html.Small(current_time, style={"color": "#888", "fontSize": "10px"})
-            ], style={"marginBottom": "20px"})
+            ], style={"marginBottom": "20px"}),
             
             # Le bouton "Analyser avec filtres personnalisés" a été supprimé
             
-        ], id="chat-messages",**{"data-scroll": ""},  style={
+            # Messages de la conversation : seule une fenêtre des derniers messages est affichée,
+            # l'historique complet est conservé côté serveur (utils/chat_transcript.py)
+            html.Div([create_history_loader()], id="chat-messages", **{"data-scroll": ""})
+            
+        ], id="chat-scroll-area", style={
             "flex": "1",
             "overflowY": "auto",
             "padding": "20px",
             "backgroundColor": colors['beige']
         }),
         
+        # Barre d'actions statistiques (rendue une seule fois, hors des messages)
+        create_stats_action_bar(),
+        
         # Saisie de texte
         html.Div([
             dcc.Input(
@@ -245,7 +245,10 @@ def create_chat_component():
         }),
         
         # Store pour mode filtre
-        dcc.Store(id="filter-mode-active", data=False)
+        dcc.Store(id="filter-mode-active", data=False),
+        
+        # Identifiant de la session de conversation (historique conservé côté serveur)
+        dcc.Store(id="chat-session-id", storage_type="session")
     ], style={
         "border": "1px solid #ddd",
         "borderRadius": "10px",
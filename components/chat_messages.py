@@ -0,0 +1,70 @@
+# components/chat_messages.py
+# Gabarits des messages du chat (bulles mises en forme par les classes CSS de styles/theme.py,
+# sans styles en ligne) et barre d'actions statistiques affichée une seule fois sous la conversation.
+# Les messages restent construits côté serveur : leur contenu (graphiques, sections chargées à la
+# demande, choix d'indicateur) est alimenté par des callbacks, et un rendu côté navigateur à partir
+# de données reconstruirait ces composants à chaque nouveau message en perdant leur état.
+
+from datetime import datetime
+from dash import html
+
+# Actions statistiques de la barre : (icône, libellé, identifiant du bouton)
+STATS_ACTIONS = [
+    ("fas fa-network-wired", "Statistiques sur la structure du réseau", "btn-structure-stats"),
+    ("fas fa-cog", "Statistiques sur les attributs techniques", "btn-attributes-stats"),
+    ("fas fa-clock", "Statistiques temporelles", "btn-temporal-stats"),
+    ("fas fa-tachometer-alt", "Agrégation et statistiques sur le temps DNS", "btn-dns-stats"),
+    ("fas fa-map", "Carte nationale des indicateurs", "btn-national-map")
+]
+
+# Actions qui portent sur les données filtrées (désactivées tant qu'aucun filtre n'est appliqué)
+FILTERED_STATS_ACTIONS = ["btn-structure-stats", "btn-attributes-stats", "btn-temporal-stats", "btn-dns-stats"]
+
+
+def _create_message(content, bubble_class, time_class):
+    """Bulle de message suivie de son heure d'envoi"""
+    current_time = datetime.now().strftime("%H:%M")
+    return html.Div([
+        html.Div(content, className=f"chat-bubble {bubble_class}"),
+        html.Small(current_time, className=f"chat-time {time_class}")
+    ])
+
+
+def create_user_message(content):
+    """
+    Message de l'utilisateur (bulle alignée à droite)
+
+    Args:
+        content: Texte ou composants du message
+    """
+    return _create_message(content, "chat-bubble-user", "chat-time-user")
+
+
+def create_assistant_message(content):
+    """
+    Message de l'assistant (bulle alignée à gauche, assez large pour les graphiques)
+
+    Args:
+        content: Texte ou composants du message
+    """
+    return _create_message(content, "chat-bubble-assistant", "chat-time-assistant")
+
+
+def create_stats_action_bar():
+    """
+    Barre des boutons de statistiques, présente en permanence entre la conversation
+    et la saisie : les réponses de l'assistant n'ont plus à renvoyer ces boutons
+    """
+    return html.Div([
+        html.Button(
+            [
+                html.I(className=icon, style={"marginRight": "8px"}),
+                label
+            ],
+            id=button_id,
+            n_clicks=0,
+            disabled=button_id in FILTERED_STATS_ACTIONS,
+            className="stats-action-button"
+        )
+        for icon, label, button_id in STATS_ACTIONS
+    ], id="stats-action-bar", className="stats-action-bar")
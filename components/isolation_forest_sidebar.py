@@ -7,6 +7,11 @@ import dash_bootstrap_components as dbc
 from styles.theme import sidebar_styles, sfr_colors
 from utils.data_loader import DataManager
 from datetime import datetime, timedelta
+import uuid
+from utils.clientside import register_clientside_callback
+from utils.request_coalescer import RequestCoalescer, ANOMALY_FILTER_CHANNEL, SEQUENCE_KEY
+from utils.session_state import SessionStateStore, read_state, write_state, ANOMALY_FILTER_STATE
+from utils.search_index import SearchIndexRegistry, search_options
 
 def create_isolation_forest_sidebar():
     """
@@ -34,6 +39,9 @@ def create_isolation_forest_sidebar():
         # Store pour les valeurs des filtres configurés
         dcc.Store(id='isolation-forest-filter-values', data={}),
         
+        # Identifiant de session stable dès le premier clic (avant le retour du premier jeton)
+        dcc.Store(id='isolation-forest-session-id', data=str(uuid.uuid4()), storage_type='session'),
+        
         # Contenu de la barre latérale
         html.Div([
             html.Div([
@@ -154,56 +162,30 @@ def init_isolation_forest_sidebar_callbacks(app):
         app: Instance de l'application Dash
     """
     
-    # Callback pour mettre à jour l'affichage de la plage horaire sélectionnée
-    @app.callback(
+    # Affichage de la plage horaire sélectionnée (calculé dans le navigateur)
+    register_clientside_callback(
+        'formatHourRange',
         Output("hour-filter-output", "children"),
         Input("hour-filter", "value")
     )
-    def update_hour_output(value):
-        if not value:
-            return ""
-        return f"Plage sélectionnée : {value[0]}h - {value[1]}h"
     
-    # Callback pour l'affichage de la plage de dates sélectionnée
-    @app.callback(
+    # Affichage de la plage de dates sélectionnée (calculé dans le navigateur)
+    register_clientside_callback(
+        'formatDateRange',
         Output("date-range-output", "children"),
         [Input("date-range-filter", "start_date"),
          Input("date-range-filter", "end_date")]
     )
-    def update_date_range_output(start_date, end_date):
-        if not start_date or not end_date:
-            return ""
-            
-        # Convertir les dates en objets datetime
-        start = datetime.strptime(start_date.split('T')[0], "%Y-%m-%d")
-        end = datetime.strptime(end_date.split('T')[0], "%Y-%m-%d")
-        
-        # Formater les dates pour l'affichage
-        start_str = start.strftime("%d/%m/%Y")
-        end_str = end.strftime("%d/%m/%Y")
-        
-        # Calculer le nombre de jours
-        days = (end - start).days + 1
-        day_text = "jour" if days == 1 else "jours"
-        
-        return f"Période: {start_str} à {end_str} ({days} {day_text})"
     
-    # Callback pour filtrer les options de l'OLT en fonction de la recherche
+    # Options de l'OLT correspondant à la recherche (meilleures correspondances de l'index)
     @app.callback(
         Output("olt-filter", "options"),
-        Input("olt-search", "value")
+        Input("olt-search", "value"),
+        State("olt-filter", "value")
     )
-    def filter_olts(search_term):
-        # Ici, vous devriez charger la liste complète des OLTs depuis votre source de données
-        data_manager = DataManager.get_instance()
-        all_olts = data_manager.get_filter_options("Identifiant d'OLT")  # Adapter selon votre implémentation
-        
-        if not search_term:
-            return [{"label": olt, "value": olt} for olt in all_olts]
-        
-        # Filtrer les OLTs qui contiennent le terme de recherche
-        filtered_olts = [olt for olt in all_olts if search_term and search_term.lower() in olt.lower()]
-        return [{"label": olt, "value": olt} for olt in filtered_olts]
+    def filter_olts(search_term, selected_olt):
+        olt_index = SearchIndexRegistry.get_instance().column_index('olt_name')
+        return search_options(olt_index, search_term, selected=selected_olt)
     
     # Callbacks pour gérer les boutons de contamination et mettre à jour les filtres automatiquement
     @app.callback(
@@ -219,10 +201,11 @@ def init_isolation_forest_sidebar_callbacks(app):
          State("date-range-filter", "start_date"),
          State("date-range-filter", "end_date"),
          State("hour-filter", "value"),
-         State("isolation-forest-filter-values", "data")]  # Nouveaux états
+         State("isolation-forest-filter-values", "data"),
+         State("isolation-forest-session-id", "data")]  # Nouveaux états
     )
     def update_contamination_selection(clicks_0001, clicks_0005, clicks_001, 
-                                      olt_value, start_date, end_date, hour_value, current_filters):
+                                      olt_value, start_date, end_date, hour_value, filter_token, session_id):
         ctx = dash.callback_context
         if not ctx.triggered:
             # Par défaut, 0.005 est sélectionné
@@ -244,9 +227,8 @@ def init_isolation_forest_sidebar_callbacks(app):
             new_contamination = 0.005
             active_states = (False, True, False)
         
-        # Mettre à jour les filtres comme dans apply_filters
-        if current_filters is None:
-            current_filters = {}
+        # Mettre à jour les filtres comme dans apply_filters (conservés côté serveur)
+        current_filters = read_state(filter_token, ANOMALY_FILTER_STATE)
         
         # Convertir les dates au format approprié
         date_range = []
@@ -260,6 +242,10 @@ def init_isolation_forest_sidebar_callbacks(app):
                 date_range.append(current_date.strftime("%Y-%m-%d"))
                 current_date += timedelta(days=1)
         
+        # Numéroter la demande : les changements de contamination rapprochés ne lancent que le dernier calcul
+        session = SessionStateStore.session_for(filter_token, session_id)
+        sequence = RequestCoalescer.get_instance().begin(session, ANOMALY_FILTER_CHANNEL)
+        
         # Préserver les valeurs actuelles des filtres et mettre à jour la contamination
         current_filters.update({
             "olt_name": olt_value,
@@ -267,10 +253,12 @@ def init_isolation_forest_sidebar_callbacks(app):
             "end_date": end_date.split('T')[0] if end_date else None,
             "date_range": date_range,
             "hour": hour_value,
-            "contamination": new_contamination
+            "contamination": new_contamination,
+            SEQUENCE_KEY: sequence
         })
         
-        return (*active_states, new_contamination, current_filters)
+        # Le Store ne reçoit que le jeton de la nouvelle version (date_range reste sur le serveur)
+        return (*active_states, new_contamination, write_state({'session': session}, ANOMALY_FILTER_STATE, current_filters))
     
     # Callback pour appliquer les filtres
     @app.callback(
@@ -281,10 +269,11 @@ def init_isolation_forest_sidebar_callbacks(app):
          State("date-range-filter", "end_date"),
          State("hour-filter", "value"),
          State("current-contamination", "data"),
-         State("isolation-forest-filter-values", "data")],
+         State("isolation-forest-filter-values", "data"),
+         State("isolation-forest-session-id", "data")],
         prevent_initial_call=True
     )
-    def apply_filters(n_clicks, olt_value, start_date, end_date, hour_value, contamination, current_filters):
+    def apply_filters(n_clicks, olt_value, start_date, end_date, hour_value, contamination, filter_token, session_id):
         if n_clicks is None:
             return dash.no_update
         
@@ -300,9 +289,12 @@ def init_isolation_forest_sidebar_callbacks(app):
                 date_range.append(current_date.strftime("%Y-%m-%d"))
                 current_date += timedelta(days=1)
         
-        # Mettre à jour les filtres
-        if current_filters is None:
-            current_filters = {}
+        # Mettre à jour les filtres (conservés côté serveur)
+        current_filters = read_state(filter_token, ANOMALY_FILTER_STATE)
+        
+        # Numéroter la demande : seule la plus récente de la session est calculée
+        session = SessionStateStore.session_for(filter_token, session_id)
+        sequence = RequestCoalescer.get_instance().begin(session, ANOMALY_FILTER_CHANNEL)
             
         current_filters.update({
             "olt_name": olt_value,
@@ -310,10 +302,11 @@ def init_isolation_forest_sidebar_callbacks(app):
             "end_date": end_date.split('T')[0] if end_date else None,
             "date_range": date_range,
             "hour": hour_value,
-            "contamination": contamination
+            "contamination": contamination,
+            SEQUENCE_KEY: sequence
         })
         
-        return current_filters
+        return write_state({'session': session}, ANOMALY_FILTER_STATE, current_filters)
     
     # Callback pour réinitialiser les filtres
     @app.callback(
@@ -6,14 +6,19 @@ import dash_bootstrap_components as dbc
 from styles.theme import navbar_styles
 from utils.asset_loader import load_sfr_logo
 from dash.dependencies import Input, Output
+from utils.clientside import register_clientside_callback
 
 def create_navbar():
     """
-    Crée la barre de navigation qui sera mise à jour dynamiquement
+    Crée la barre de navigation : les deux versions sont rendues une seule fois
+    et le navigateur affiche celle qui correspond à la page courante
     Returns:
         Composant html.Div contenant la barre de navigation dynamique
     """
-    return html.Div(id='navbar-content')
+    return html.Div([
+        html.Div(create_navbar_content('/assistant'), id='navbar-assistant', style={'display': 'none'}),
+        html.Div(create_navbar_content('/accueil'), id='navbar-default')
+    ], id='navbar-content')
 
 def create_navbar_content(pathname):
     """
@@ -93,9 +98,10 @@ def init_navbar_callbacks(app):
     Args:
         app: L'application Dash
     """
-    @app.callback(
-        Output('navbar-content', 'children'),
+    # Choix de la version affichée selon la page (calculé dans le navigateur)
+    register_clientside_callback(
+        'toggleNavbar',
+        [Output('navbar-assistant', 'style'),
+         Output('navbar-default', 'style')],
         [Input('url', 'pathname')]
-    )
-    def update_navbar(pathname):
-        return create_navbar_content(pathname)
\ No newline at end of file
+    )
\ No newline at end of file
@@ -1,6 +1,9 @@
 # styles/theme.py
 # Définition des couleurs et styles de l'application
 
+import plotly.graph_objects as go
+import plotly.io as pio
+
 # Couleurs SFR avec un fond doux
 sfr_colors = {
     'red': '#e2001a',
@@ -434,6 +437,74 @@ custom_css = '''
     .chat-column {
         padding-left: 15px;
     }
+    /* Messages du chat : rendu différé tant qu'ils sont hors de la zone visible */
+    .chat-message {
+        content-visibility: auto;
+        contain-intrinsic-size: auto 400px;
+    }
+    /* Bulles du chat (components/chat_messages.py) */
+    .chat-bubble {
+        background-color: #f0f0f0;
+        padding: 12px 16px;
+        border-radius: 12px;
+        display: inline-block;
+        max-width: 80%;
+        margin-bottom: 8px;
+        font-size: 14px;
+        line-height: 1.5;
+        color: #404040;
+        box-shadow: 0 1px 2px rgba(0,0,0,0.07);
+    }
+    .chat-bubble-user {
+        float: right;
+        clear: both;
+        margin-left: auto;
+        margin-right: 0;
+    }
+    .chat-bubble-assistant {
+        float: left;
+        clear: both;
+        max-width: 95%;
+        min-width: 800px;
+        width: auto;
+    }
+    .chat-time {
+        font-size: 10px;
+        color: #888;
+        margin-top: 5px;
+        display: block;
+        clear: both;
+    }
+    .chat-time-user {
+        text-align: right;
+    }
+    /* Barre d'actions statistiques sous la conversation */
+    .stats-action-bar {
+        display: flex;
+        flex-wrap: wrap;
+        gap: 8px;
+        padding: 10px 15px;
+        border-top: 1px solid #ddd;
+        background-color: white;
+    }
+    .stats-action-button {
+        background-color: #f0f0f0;
+        border: 1px solid #ddd;
+        border-radius: 20px;
+        padding: 6px 12px;
+        cursor: pointer;
+        transition: all 0.2s ease;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+        color: #404040;
+        font-size: 13px;
+    }
+    .stats-action-button:disabled {
+        opacity: 0.5;
+        cursor: not-allowed;
+    }
+    .stats-action-button:disabled:hover {
+        background-color: #f0f0f0 !important;
+    }
     /* Styles pour les dropdowns et les datepickers */
     .Select-control:hover {
         border-color: rgba(226, 0, 26, 0.5) !important;
@@ -564,3 +635,54 @@ modelisation_styles = {
     }
 }
 
+# Polices des graphiques Plotly
+GRAPH_FONT = dict(
+    size=13,
+    color='#000000',
+    family='Arial, sans-serif'
+)
+
+GRAPH_TITLE_FONT = dict(
+    size=15,
+    color='#000000',  # Noir pour les titres de graphiques
+    family='Arial, sans-serif'
+)
+
+# Propriétés du thème Plotly par défaut conservées dans le thème SFR
+# (les scènes 3D, axes polaires, ternaires et fonds mapbox ne sont pas utilisés)
+PLOTLY_BASE_LAYOUT_KEYS = [
+    'annotationdefaults', 'autotypenumbers', 'coloraxis', 'colorway', 'geo',
+    'hoverlabel', 'hovermode', 'paper_bgcolor', 'shapedefaults', 'title', 'xaxis', 'yaxis'
+]
+
+# Nom sous lequel le thème est enregistré dans plotly.io.templates
+PLOTLY_TEMPLATE_NAME = 'sfr'
+
+
+def create_plotly_template():
+    """
+    Crée le thème Plotly de l'application : base du thème 'plotly' réduite aux
+    propriétés utilisées, complétée des polices et du fond SFR
+
+    Returns:
+        go.layout.Template
+    """
+    base = pio.templates['plotly']
+    base_layout = base.layout.to_plotly_json()
+    layout = {key: base_layout[key] for key in PLOTLY_BASE_LAYOUT_KEYS if key in base_layout}
+
+    # Seule l'échelle séquentielle sert de valeur par défaut aux graphiques colorés
+    layout['colorscale'] = {'sequential': base_layout['colorscale']['sequential']}
+
+    template = go.layout.Template(layout=layout, data=base.data)
+    template.layout.update(
+        font=GRAPH_FONT,
+        title_font=GRAPH_TITLE_FONT,
+        plot_bgcolor=sfr_colors['white']
+    )
+    return template
+
+
+# Enregistrement du thème (choisi comme thème par défaut dans app.py). plotly.js n'a pas
+# de registre de thèmes nommés : chaque figure en transporte une copie dans layout.template
+pio.templates[PLOTLY_TEMPLATE_NAME] = create_plotly_template()
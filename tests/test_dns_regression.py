@@ -0,0 +1,79 @@
+# tests/test_dns_regression.py
+# Détection des dégradations DNS sur des moments additifs synthétiques
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dns_regression import detect_dns_regressions
+
+
+class FakeRollupStore:
+    """Magasin d'agrégats minimal : moments journaliers calculés à partir de mesures horaires"""
+
+    def __init__(self, hourly, time_dims=('date',)):
+        self.hourly = hourly
+        self._time_dims = list(time_dims)
+
+    def time_dims(self):
+        return self._time_dims
+
+    def get_dns_moments(self, filters, aggregation_dims):
+        hourly = self.hourly.assign(
+            dns_weighted_sum=self.hourly['dns'] * self.hourly['tests'],
+            dns_weighted_sq_sum=self.hourly['dns'] ** 2 * self.hourly['tests'],
+            tests_sq_sum=self.hourly['tests'] ** 2,
+            total_tests_dns=self.hourly['tests']
+        )
+        columns = ['dns_weighted_sum', 'dns_weighted_sq_sum', 'tests_sq_sum', 'total_tests_dns']
+        return hourly.groupby(['date'] + list(aggregation_dims))[columns].sum().reset_index()
+
+
+def _hourly_measures(shifts, days=14, seed=0):
+    """Mesures horaires par OLT ; shifts donne la hausse (ms) appliquée aux 7 derniers jours"""
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range('2024-12-01', periods=days * 24, freq='h')
+    frames = []
+    for olt, shift in shifts.items():
+        dns = rng.normal(20.0, 1.0, len(hours))
+        dns[hours >= hours[0] + pd.Timedelta(days=days - 7)] += shift
+        frames.append(pd.DataFrame({
+            'date': hours.normalize(),
+            'olt_name': olt,
+            'dns': dns,
+            'tests': rng.integers(5, 15, len(hours)).astype('float64')
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_detects_only_the_degraded_combination():
+    store = FakeRollupStore(_hourly_measures({'OLT-A': 5.0, 'OLT-B': 0.0, 'OLT-C': -5.0}))
+    ranking, windows = detect_dns_regressions({}, ['olt_name'], rollup_store=store)
+
+    assert list(ranking['olt_name']) == ['OLT-A']
+    assert ranking.loc[0, 'delta_ms'] == pytest.approx(5.0, abs=0.5)
+    assert ranking.loc[0, 'z_score'] >= 3.0
+    assert windows['evaluated'] == 3
+    assert windows['current'][0] > windows['baseline'][1]
+
+
+def test_combinations_below_min_tests_are_not_evaluated():
+    store = FakeRollupStore(_hourly_measures({'OLT-A': 5.0}))
+    ranking, windows = detect_dns_regressions({}, ['olt_name'], min_tests=10**9, rollup_store=store)
+
+    assert ranking.empty
+    assert windows['evaluated'] == 0
+
+
+def test_single_window_returns_no_result():
+    store = FakeRollupStore(_hourly_measures({'OLT-A': 5.0}, days=5))
+    ranking, windows = detect_dns_regressions({}, ['olt_name'], rollup_store=store)
+
+    assert ranking.empty
+    assert windows == {'current': None, 'baseline': None, 'evaluated': 0}
+
+
+def test_requires_a_date_column():
+    store = FakeRollupStore(_hourly_measures({'OLT-A': 0.0}), time_dims=('day_of_week', 'hour'))
+    with pytest.raises(ValueError):
+        detect_dns_regressions({}, ['olt_name'], rollup_store=store)
@@ -0,0 +1,50 @@
+# tests/test_downsampling.py
+# Réduction LTTB des séries longues : extrémités conservées, nombre de points borné
+
+import numpy as np
+import pandas as pd
+
+from utils.downsampling import lttb_indices, downsample_frame
+
+
+def test_lttb_keeps_endpoints_and_point_count():
+    x = np.arange(10_000, dtype='float64')
+    y = np.sin(x / 50)
+    indices = lttb_indices(x, y, 400)
+
+    assert len(indices) == 400
+    assert indices[0] == 0
+    assert indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_returns_all_points_when_series_is_short():
+    x = np.arange(50, dtype='float64')
+    assert np.array_equal(lttb_indices(x, x, 400), np.arange(50))
+
+
+def test_lttb_keeps_isolated_spike():
+    x = np.arange(5_000, dtype='float64')
+    y = np.zeros_like(x)
+    y[2_345] = 100.0
+    assert 2_345 in lttb_indices(x, y, 100)
+
+
+def test_downsample_frame_ignores_missing_values():
+    df = pd.DataFrame({
+        'date': pd.date_range('2024-12-01', periods=2_000, freq='h'),
+        'value': np.random.default_rng(0).normal(20, 2, 2_000)
+    })
+    df.loc[::7, 'value'] = np.nan
+    reduced = downsample_frame(df, 'date', 'value', n_out=300)
+
+    assert len(reduced) == 300
+    assert reduced['value'].notna().all()
+    assert reduced['date'].is_monotonic_increasing
+    assert reduced.index[0] == df['value'].first_valid_index()
+    assert reduced.index[-1] == df['value'].last_valid_index()
+
+
+def test_downsample_frame_returns_short_frames_unchanged():
+    df = pd.DataFrame({'x': range(10), 'y': range(10)})
+    assert downsample_frame(df, 'x', 'y', n_out=300) is df
@@ -0,0 +1,44 @@
+# tests/test_graph_utils.py
+# Axes et libellés vectorisés des graphiques DNS
+
+import numpy as np
+import pandas as pd
+
+from utils.graph_utils import build_weekly_datetime, build_combination_labels, WEEKLY_BASE_DATE
+
+
+def test_build_weekly_datetime_offsets_from_base_date():
+    jours = pd.Series([0, 1, 6], index=[10, 11, 12])
+    heures = pd.Series([0, 3, 23], index=[10, 11, 12])
+    result = build_weekly_datetime(jours, heures)
+
+    assert list(result.index) == [10, 11, 12]
+    assert list(result) == [
+        WEEKLY_BASE_DATE,
+        WEEKLY_BASE_DATE + pd.Timedelta(days=1, hours=3),
+        WEEKLY_BASE_DATE + pd.Timedelta(days=6, hours=23)
+    ]
+
+
+def test_build_weekly_datetime_keeps_nat_for_missing_values():
+    result = build_weekly_datetime([1, np.nan, 'x', 2], [3, 4, 5, np.nan])
+
+    assert result.iloc[0] == WEEKLY_BASE_DATE + pd.Timedelta(days=1, hours=3)
+    assert result.iloc[1:].isna().all()
+
+
+def test_build_combination_labels_concatenates_columns():
+    df = pd.DataFrame({
+        'olt': ['A', 'B', 'A', 'B'],
+        'peag': [1, 2, 1, np.nan]
+    }, index=[5, 6, 7, 8])
+    labels = build_combination_labels(df, ['olt', 'peag'], sep='|')
+
+    assert list(labels.index) == [5, 6, 7, 8]
+    assert list(labels) == ['A|1.0', 'B|2.0', 'A|1.0', 'B|nan']
+
+
+def test_build_combination_labels_handles_categories_and_empty_frames():
+    df = pd.DataFrame({'olt': pd.Categorical(['X', 'Y', 'X']), 'pop': ['p1', 'p1', 'p2']})
+    assert list(build_combination_labels(df, ['olt', 'pop'])) == ['X-p1', 'Y-p1', 'X-p2']
+    assert build_combination_labels(df.iloc[:0], ['olt', 'pop']).empty
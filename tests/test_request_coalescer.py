@@ -0,0 +1,87 @@
+# tests/test_request_coalescer.py
+# Regroupement des demandes successives d'une session
+
+import pytest
+from dash.exceptions import PreventUpdate
+
+from utils.request_coalescer import RequestCoalescer, strip_request_metadata, SEQUENCE_KEY
+
+SESSION, CHANNEL = 'session', 'filters'
+
+
+def test_newer_request_supersedes_older_ones():
+    coalescer = RequestCoalescer()
+    first = coalescer.begin(SESSION, CHANNEL)
+    second = coalescer.begin(SESSION, CHANNEL)
+
+    assert second == first + 1
+    assert not coalescer.is_current(SESSION, CHANNEL, first)
+    assert coalescer.is_current(SESSION, CHANNEL, second)
+    with pytest.raises(PreventUpdate):
+        coalescer.check(SESSION, CHANNEL, first)
+    coalescer.check(SESSION, CHANNEL, second)
+
+
+def test_sessions_and_channels_are_independent():
+    coalescer = RequestCoalescer()
+    sequence = coalescer.begin(SESSION, CHANNEL)
+    coalescer.begin('other-session', CHANNEL)
+    coalescer.begin(SESSION, 'anomaly-filters')
+
+    assert coalescer.is_current(SESSION, CHANNEL, sequence)
+
+
+def test_store_sequence_never_moves_backwards():
+    coalescer = RequestCoalescer()
+    coalescer.begin(SESSION, CHANNEL, 5)
+    coalescer.begin(SESSION, CHANNEL, 3)
+
+    assert coalescer.begin(SESSION, CHANNEL) == 6
+
+
+def test_superseded_messages_are_delivered_by_the_next_request():
+    coalescer = RequestCoalescer()
+    first = coalescer.begin(SESSION, CHANNEL)
+    second = coalescer.begin(SESSION, CHANNEL)
+    coalescer.defer(SESSION, CHANNEL, first, ['question 1', 'réponse 1'])
+
+    assert coalescer.drain(SESSION, CHANNEL, second) == ['question 1', 'réponse 1']
+    assert coalescer.drain(SESSION, CHANNEL, second) == []
+
+
+def test_messages_deferred_after_a_later_delivery_are_dropped():
+    coalescer = RequestCoalescer()
+    aborted = coalescer.begin(SESSION, CHANNEL)
+    reset = coalescer.begin(SESSION, CHANNEL)
+    assert coalescer.drain(SESSION, CHANNEL, reset) == []
+
+    # La demande dépassée n'abandonne qu'après la réinitialisation
+    coalescer.defer(SESSION, CHANNEL, aborted, ['périmé'])
+    assert coalescer.drain(SESSION, CHANNEL, coalescer.begin(SESSION, CHANNEL)) == []
+
+
+def test_drain_keeps_messages_of_newer_requests():
+    coalescer = RequestCoalescer()
+    winner = coalescer.begin(SESSION, CHANNEL)
+    newer = coalescer.begin(SESSION, CHANNEL)
+    coalescer.begin(SESSION, CHANNEL)
+    coalescer.defer(SESSION, CHANNEL, newer, ['plus récent'])
+
+    assert coalescer.drain(SESSION, CHANNEL, winner) == []
+    assert coalescer.drain(SESSION, CHANNEL, newer + 1) == ['plus récent']
+
+
+def test_least_recent_sessions_are_evicted():
+    coalescer = RequestCoalescer(max_keys=2)
+    coalescer.begin('a', CHANNEL)
+    coalescer.defer('a', CHANNEL, 1, ['message'])
+    coalescer.begin('b', CHANNEL)
+    coalescer.begin('c', CHANNEL)
+
+    assert coalescer.begin('a', CHANNEL) == 1
+    assert coalescer.drain('a', CHANNEL, 1) == []
+
+
+def test_strip_request_metadata():
+    assert strip_request_metadata({'Département': '75', SEQUENCE_KEY: 4}) == {'Département': '75'}
+    assert strip_request_metadata(None) == {}
@@ -0,0 +1,34 @@
+# tests/test_search_index.py
+# Index de recherche des identifiants des listes déroulantes
+
+from utils.search_index import SearchIndex, search_options
+
+OLTS = ['OLT-PARIS-01', 'olt-paris-02', 'OLT-LYON-01', 'OLT-MARSEILLE-07', 'NRO-PARIS-99', None]
+
+
+def test_prefix_matches_come_first_then_substrings():
+    index = SearchIndex(OLTS)
+    assert index.search('olt-paris') == ['OLT-PARIS-01', 'olt-paris-02']
+    assert index.search('paris') == ['NRO-PARIS-99', 'OLT-PARIS-01', 'olt-paris-02']
+
+
+def test_long_terms_require_the_full_substring():
+    index = SearchIndex(['abcxbcd', 'abcd'])
+    # Tous les trigrammes de 'abcd' figurent dans 'abcxbcd', sans la sous-chaîne complète
+    assert index.search('bcd') == ['abcd', 'abcxbcd']
+    assert index.search('abcd') == ['abcd']
+
+
+def test_search_is_case_insensitive_and_limited():
+    index = SearchIndex([f'OLT-{i:03d}' for i in range(100)])
+    assert index.search('  olt-0 ', limit=5) == ['OLT-000', 'OLT-001', 'OLT-002', 'OLT-003', 'OLT-004']
+    assert len(index.search('', limit=20)) == 20
+    assert index.search('inconnu') == []
+    assert len(index) == 100
+
+
+def test_search_options_keeps_fixed_and_selected_values():
+    index = SearchIndex(OLTS)
+    options = search_options(index, 'lyon', selected='OLT-MARSEILLE-07', fixed_options=('Toutes',))
+    assert [option['value'] for option in options] == ['Toutes', 'OLT-LYON-01', 'OLT-MARSEILLE-07']
+    assert search_options(None, 'x') == []
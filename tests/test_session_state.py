@@ -0,0 +1,112 @@
+# tests/test_session_state.py
+# État des pages conservé côté serveur : versions, éviction de l'historique, copie sur disque
+
+import os
+import threading
+import uuid
+
+from utils.session_state import SessionStateStore, MAX_STATE_VERSIONS, FILTER_STATE, LOF_FILTER_STATE
+
+
+def new_session():
+    return str(uuid.uuid4())
+
+
+def test_put_returns_increasing_versions():
+    store = SessionStateStore(state_dir=None)
+    session_id = new_session()
+    first = store.put(session_id, FILTER_STATE, {'Département': '75'})
+    second = store.put(session_id, FILTER_STATE, {'Département': '13'})
+
+    assert first == {'session': session_id, 'version': 1}
+    assert second['version'] == 2
+    assert store.get(first, FILTER_STATE) == {'Département': '13'}
+    assert store.get(first, FILTER_STATE, exact=True) == {'Département': '75'}
+
+
+def test_values_are_stored_as_json():
+    store = SessionStateStore(state_dir=None)
+    token = store.put(new_session(), FILTER_STATE, {'Période': ('2024-01-01', '2024-02-01')})
+
+    assert store.get(token, FILTER_STATE) == {'Période': ['2024-01-01', '2024-02-01']}
+
+
+def test_old_versions_are_evicted_after_max_state_versions():
+    store = SessionStateStore(state_dir=None)
+    session_id = new_session()
+    tokens = [store.put(session_id, FILTER_STATE, {'n': n}) for n in range(MAX_STATE_VERSIONS + 1)]
+
+    assert store.get(tokens[0], FILTER_STATE, exact=True) is None
+    assert store.get(tokens[1], FILTER_STATE, exact=True) == {'n': 1}
+    assert store.get(tokens[-1], FILTER_STATE, exact=True) == {'n': MAX_STATE_VERSIONS}
+
+
+def test_latest_token():
+    store = SessionStateStore(state_dir=None)
+    session_id = new_session()
+    first = store.put(session_id, FILTER_STATE, {'n': 1})
+    store.put(session_id, FILTER_STATE, {'n': 2})
+
+    assert store.latest_token(first, FILTER_STATE) == {'session': session_id, 'version': 2}
+    assert store.latest_token(first, LOF_FILTER_STATE) is None
+
+
+def test_invalid_tokens():
+    store = SessionStateStore(state_dir=None)
+
+    for token in (None, {}, {'session': '../etc', 'version': 1}):
+        assert store.get(token, FILTER_STATE) == {}
+        assert store.get(token, FILTER_STATE, exact=True) is None
+        assert store.latest_token(token, FILTER_STATE) is None
+
+
+def test_session_for_fallback():
+    session_id = new_session()
+
+    assert SessionStateStore.session_for({'session': session_id}) == session_id
+    assert SessionStateStore.session_for(None, session_id) == session_id
+    assert SessionStateStore.is_valid_session(SessionStateStore.session_for({'session': 'invalide'}))
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    store = SessionStateStore(state_dir=str(tmp_path))
+    session_id = new_session()
+
+    def increment(values):
+        values['count'] = values.get('count', 0) + 1
+        return values
+
+    threads = [threading.Thread(target=store.update, args=(session_id, FILTER_STATE, increment))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    token = {'session': session_id, 'version': 20}
+    assert store.get(token, FILTER_STATE) == {'count': 20}
+    assert SessionStateStore(state_dir=str(tmp_path)).get(token, FILTER_STATE) == {'count': 20}
+
+
+def test_each_namespace_has_its_own_file(tmp_path):
+    store = SessionStateStore(state_dir=str(tmp_path))
+    session_id = new_session()
+    store.put(session_id, FILTER_STATE, {'Département': '75'})
+    token = store.put(session_id, LOF_FILTER_STATE, {'Région': 'Bretagne'})
+
+    assert sorted(os.listdir(tmp_path / session_id)) == [f'{FILTER_STATE}.json', f'{LOF_FILTER_STATE}.json']
+    reloaded = SessionStateStore(state_dir=str(tmp_path))
+    assert reloaded.get(token, LOF_FILTER_STATE) == {'Région': 'Bretagne'}
+    assert reloaded.get(token, FILTER_STATE) == {'Département': '75'}
+
+
+def test_newer_token_rereads_the_namespace_from_disk(tmp_path):
+    worker_a = SessionStateStore(state_dir=str(tmp_path))
+    worker_b = SessionStateStore(state_dir=str(tmp_path))
+    session_id = new_session()
+    first = worker_a.put(session_id, FILTER_STATE, {'n': 1})
+    assert worker_b.get(first, FILTER_STATE) == {'n': 1}
+
+    second = worker_a.put(session_id, FILTER_STATE, {'n': 2})
+    assert worker_b.get(second, FILTER_STATE) == {'n': 2}
+    assert worker_b.get(first, FILTER_STATE, exact=True) == {'n': 1}
@@ -0,0 +1,17 @@
+# utils/anomaly_files.py
+# Fichiers de sortie de l'Isolation Forest : un CSV d'anomalies par niveau de contamination,
+# partagés par la page de détection d'anomalies et la carte nationale
+
+# Niveaux de contamination proposés et niveau par défaut
+CONTAMINATION_LEVELS = [0.001, 0.005, 0.01]
+DEFAULT_CONTAMINATION = 0.005
+
+
+def anomaly_file_path(contamination=DEFAULT_CONTAMINATION):
+    """
+    Chemin du fichier d'anomalies d'un niveau de contamination
+
+    Args:
+        contamination: Le niveau de contamination (0.001, 0.005, 0.01)
+    """
+    return f"output/df_agg_with_anomalies_contam_{contamination}.csv"
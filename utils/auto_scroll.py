@@ -1,29 +1,19 @@
 # utils/auto_scroll.py
-from dash import callback, Input, Output, State, html, ctx
+from dash import Input, Output, State
+from utils.clientside import register_clientside_callback
 
 def auto_scroll_callback():
     """
-    Enregistre un callback pour faire défiler automatiquement la zone de chat 
-    vers le bas lorsque de nouveaux messages sont ajoutés
+    Enregistre un callback exécuté dans le navigateur pour faire défiler
+    automatiquement la zone de chat vers le bas lorsque de nouveaux messages
+    sont ajoutés (fonction scrollChat de assets/clientside.js)
     """
-    @callback(
-        Output("chat-messages", "style", allow_duplicate=True),
+    register_clientside_callback(
+        'scrollChat',
+        Output("chat-messages", "data-scroll", allow_duplicate=True),
         Input("chat-messages", "children"),
-        State("chat-messages", "style"),
+        State("chat-load-older", "n_clicks"),
         prevent_initial_call=True
     )
-    def scroll_to_bottom(children, current_style):
-        if not current_style:
-            current_style = {}
-        
-        # On clone le style actuel et on ajoute scrollBehavior: 'smooth'
-        updated_style = current_style.copy()
-        updated_style.update({
-            'scrollBehavior': 'smooth',
-            'scrollMarginBottom': '100px'  # Ajoute une marge pour éviter que le dernier message ne soit caché
-        })
-        
-        # On utilise javascript pour faire défiler vers le bas
-        return updated_style
-        
-    return None
\ No newline at end of file
+
+    return None
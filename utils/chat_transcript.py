@@ -0,0 +1,265 @@
+# utils/chat_transcript.py
+# Historique de la conversation conservé côté serveur pour chaque session : le navigateur
+# n'affiche qu'une fenêtre des derniers messages, mise à jour par des Patch Dash, et les
+# messages plus anciens sont rechargés à la demande (mémoire, avec débordement sur disque)
+
+from collections import OrderedDict
+import json
+import os
+import threading
+import uuid
+
+import plotly
+from dash import Patch, html
+
+# Nombre de messages affichés dans le navigateur au-delà duquel les plus anciens sont retirés
+CHAT_WINDOW_SIZE = 20
+
+# Nombre de messages plus anciens rechargés à chaque demande
+CHAT_PAGE_SIZE = 10
+
+# Nombre de messages gardés en mémoire par session (les plus anciens débordent sur disque)
+MAX_MEMORY_MESSAGES = 60
+
+# Nombre de sessions conservées (éviction LRU)
+MAX_SESSIONS = 200
+
+# Répertoire de débordement sur disque (variable d'environnement vide pour le désactiver)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SPILL_DIR = os.environ.get('CHAT_TRANSCRIPT_DIR', os.path.join(BASE_DIR, '.cache', 'transcripts'))
+
+# Classe CSS des messages (rendu différé des messages hors écran, voir styles/theme.py)
+CHAT_MESSAGE_CLASS = 'chat-message'
+
+# Styles du bandeau de rechargement des messages précédents (premier enfant de 'chat-messages')
+HISTORY_LOADER_HIDDEN_STYLE = {'display': 'none'}
+HISTORY_LOADER_VISIBLE_STYLE = {'display': 'flex', 'justifyContent': 'center', 'marginBottom': '15px'}
+
+
+def create_history_loader(visible=False):
+    """
+    Bandeau « Afficher les messages précédents », toujours présent en tête de la conversation
+    """
+    return html.Div([
+        html.Button(
+            "Afficher les messages précédents",
+            id='chat-load-older',
+            n_clicks=0,
+            style={
+                'backgroundColor': 'white',
+                'color': '#404040',
+                'border': '1px solid #ddd',
+                'borderRadius': '16px',
+                'padding': '6px 14px',
+                'fontSize': '12px',
+                'cursor': 'pointer'
+            }
+        )
+    ], style=HISTORY_LOADER_VISIBLE_STYLE if visible else HISTORY_LOADER_HIDDEN_STYLE)
+
+
+class _SessionTranscript:
+    """Messages d'une session : les plus anciens sur disque, les suivants en mémoire"""
+
+    def __init__(self):
+        self.memory = []
+        self.spilled_count = 0
+        # Index du premier message affiché dans le navigateur
+        self.window_start = 0
+
+    @property
+    def total(self):
+        return self.spilled_count + len(self.memory)
+
+
+class ChatTranscriptStore:
+    """
+    Conserve les messages de chaque session sérialisés en JSON et calcule les
+    Patch à appliquer à 'chat-messages' pour n'afficher qu'une fenêtre bornée
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager l'historique entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = ChatTranscriptStore()
+        return cls._instance
+
+    def __init__(self, spill_dir=DEFAULT_SPILL_DIR, window_size=CHAT_WINDOW_SIZE,
+                 page_size=CHAT_PAGE_SIZE, max_memory_messages=MAX_MEMORY_MESSAGES,
+                 max_sessions=MAX_SESSIONS):
+        """
+        Args:
+            spill_dir: Répertoire de débordement sur disque (None pour tout garder en mémoire)
+            window_size: Nombre de messages affichés dans le navigateur
+            page_size: Nombre de messages rechargés par demande
+            max_memory_messages: Nombre de messages gardés en mémoire par session
+            max_sessions: Nombre de sessions conservées
+        """
+        self.spill_dir = spill_dir
+        self.window_size = window_size
+        self.page_size = page_size
+        self.max_memory_messages = max_memory_messages
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.spill_dir:
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            except OSError as e:
+                print(f"Débordement sur disque de l'historique désactivé: {e}")
+                self.spill_dir = None
+
+    @staticmethod
+    def is_valid_session(session_id):
+        """Vérifie qu'un identifiant de session est un UUID (utilisé comme nom de fichier)"""
+        try:
+            return str(uuid.UUID(str(session_id))) == session_id
+        except ValueError:
+            return False
+
+    def _spill_path(self, session_id):
+        return os.path.join(self.spill_dir, f"{session_id}.jsonl")
+
+    def _get_session(self, session_id):
+        """Retourne (en la créant si besoin) la session et la marque comme récente"""
+        transcript = self._sessions.get(session_id)
+        if transcript is None:
+            transcript = _SessionTranscript()
+            self._sessions[session_id] = transcript
+            while len(self._sessions) > self.max_sessions:
+                evicted_id, _ = self._sessions.popitem(last=False)
+                self._remove_spill(evicted_id)
+        self._sessions.move_to_end(session_id)
+        return transcript
+
+    def _remove_spill(self, session_id):
+        if not self.spill_dir:
+            return
+        try:
+            os.remove(self._spill_path(session_id))
+        except OSError:
+            pass
+
+    def _spill(self, session_id, transcript):
+        """Déplace sur disque les messages en mémoire au-delà de max_memory_messages"""
+        overflow = len(transcript.memory) - self.max_memory_messages
+        if overflow <= 0 or not self.spill_dir:
+            return
+        try:
+            with open(self._spill_path(session_id), 'a', encoding='utf-8') as f:
+                for payload in transcript.memory[:overflow]:
+                    f.write(payload + '\n')
+        except OSError as e:
+            print(f"Erreur lors de l'écriture de l'historique sur disque: {e}")
+            return
+        del transcript.memory[:overflow]
+        transcript.spilled_count += overflow
+
+    def _read_messages(self, session_id, transcript, start, end):
+        """Relit les messages [start, end[ de la session (disque puis mémoire)"""
+        payloads = []
+        if start < transcript.spilled_count:
+            try:
+                with open(self._spill_path(session_id), encoding='utf-8') as f:
+                    for index, line in enumerate(f):
+                        if index >= min(end, transcript.spilled_count):
+                            break
+                        if index >= start:
+                            payloads.append(line)
+            except OSError as e:
+                print(f"Erreur lors de la lecture de l'historique sur disque: {e}")
+        memory_start = max(start - transcript.spilled_count, 0)
+        memory_end = max(end - transcript.spilled_count, 0)
+        payloads.extend(transcript.memory[memory_start:memory_end])
+        return [json.loads(payload) for payload in payloads]
+
+    def append(self, session_id, messages):
+        """
+        Enregistre de nouveaux messages et retourne le Patch correspondant :
+        ajout en fin de conversation et retrait des plus anciens au-delà de la fenêtre
+
+        Args:
+            session_id: Identifiant de session (None : aucun enregistrement)
+            messages: Composants des messages à ajouter
+
+        Returns:
+            Patch Dash de 'chat-messages.children'
+        """
+        wrapped = [html.Div(message, className=CHAT_MESSAGE_CLASS) for message in messages]
+        chat_update = Patch()
+        chat_update.extend(wrapped)
+
+        if not self.is_valid_session(session_id):
+            return chat_update
+
+        with self._lock:
+            transcript = self._get_session(session_id)
+            transcript.memory.extend(plotly.io.json.to_json_plotly(message) for message in wrapped)
+
+            # Retrait des messages les plus anciens (l'indice 0 est le bandeau de rechargement)
+            overflow = transcript.total - transcript.window_start - self.window_size
+            if overflow > 0:
+                for _ in range(overflow):
+                    del chat_update[1]
+                transcript.window_start += overflow
+                chat_update[0]['props']['style'] = HISTORY_LOADER_VISIBLE_STYLE
+
+            self._spill(session_id, transcript)
+        return chat_update
+
+    def load_older(self, session_id):
+        """
+        Retourne le Patch qui réinsère la page de messages précédant la fenêtre affichée,
+        ou None s'il n'y en a pas
+        """
+        if not self.is_valid_session(session_id):
+            return None
+
+        with self._lock:
+            transcript = self._sessions.get(session_id)
+            if transcript is None or transcript.window_start == 0:
+                return None
+            new_start = max(transcript.window_start - self.page_size, 0)
+            older = self._read_messages(session_id, transcript, new_start, transcript.window_start)
+            transcript.window_start = new_start
+
+        chat_update = Patch()
+        for offset, message in enumerate(older):
+            chat_update.insert(1 + offset, message)
+        if new_start == 0:
+            chat_update[0]['props']['style'] = HISTORY_LOADER_HIDDEN_STYLE
+        return chat_update
+
+    def render_window(self, session_id):
+        """
+        Contenu complet de 'chat-messages' pour une session (dernière fenêtre de messages),
+        utilisé lorsque la page de l'assistant est affichée à nouveau
+        """
+        if not self.is_valid_session(session_id):
+            return [create_history_loader()]
+
+        with self._lock:
+            transcript = self._sessions.get(session_id)
+            if transcript is None:
+                return [create_history_loader()]
+            self._sessions.move_to_end(session_id)
+            transcript.window_start = max(transcript.total - self.window_size, 0)
+            messages = self._read_messages(session_id, transcript, transcript.window_start, transcript.total)
+            return [create_history_loader(visible=transcript.window_start > 0)] + messages
+
+
+def append_chat_messages(session_id, *messages):
+    """
+    Ajoute des messages à la fin de la conversation ('chat-messages', 'children')
+
+    Args:
+        session_id: Identifiant de session ('chat-session-id')
+        *messages: Composants des messages à ajouter
+
+    Returns:
+        Patch Dash à retourner comme valeur de la sortie
+    """
+    return ChatTranscriptStore.get_instance().append(session_id, messages)
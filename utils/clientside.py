@@ -0,0 +1,78 @@
+# utils/clientside.py
+# Callbacks de pure mise en forme exécutés dans le navigateur (fonctions JavaScript de
+# assets/clientside.js) et garde-fou sur la répartition des callbacks client / serveur
+
+from dash import ClientsideFunction, clientside_callback
+from dash import _callback
+
+# Espace de noms des fonctions de assets/clientside.js
+CLIENTSIDE_NAMESPACE = 'clientside'
+
+# Sorties calculées dans le navigateur : aucune ne doit être reprise par un callback Python
+CLIENTSIDE_OUTPUTS = {
+    'hour-filter-output.children': 'formatHourRange',
+    'date-range-output.children': 'formatDateRange',
+    'navbar-assistant.style': 'toggleNavbar',
+    'navbar-default.style': 'toggleNavbar',
+    'chat-messages.data-scroll': 'scrollChat'
+}
+
+# Sorties qui doivent rester côté serveur, avec la raison
+SERVER_SIDE_OUTPUTS = {
+    'page-content.children': "Construction des pages à partir des données chargées",
+    'chat-messages.children': "Historique de la conversation conservé côté serveur (utils/chat_transcript.py)",
+    'filter-values.data': "Jeton des filtres conservés côté serveur (utils/session_state.py)",
+    'filter-stats.children': "Nombre d'observations calculé sur les données filtrées",
+    'isolation-forest-filter-values.data': "Jeton des filtres Isolation Forest conservés côté serveur",
+    'lof-filter-values.data': "Jeton des filtres LOF conservés côté serveur",
+    'olt-filter.options': "Meilleures correspondances de l'index de recherche (utils/search_index.py)",
+    'lof-chain-filter.options': "Meilleures correspondances de l'index de recherche (utils/search_index.py)"
+}
+
+
+def register_clientside_callback(function_name, *args, **kwargs):
+    """
+    Enregistre un callback exécuté dans le navigateur
+
+    Args:
+        function_name: Nom de la fonction dans assets/clientside.js
+        *args, **kwargs: Sorties, entrées et options du callback (comme pour dash.callback)
+    """
+    return clientside_callback(
+        ClientsideFunction(namespace=CLIENTSIDE_NAMESPACE, function_name=function_name),
+        *args,
+        **kwargs
+    )
+
+
+def _callback_outputs(callback_spec):
+    """Sorties 'id.propriété' d'un callback enregistré (sans le suffixe allow_duplicate)"""
+    outputs = callback_spec['output'].strip('.').split('...')
+    return [output.split('@')[0] for output in outputs]
+
+
+def check_callback_placement(app):
+    """
+    Garde-fou exécuté au démarrage : signale les sorties de pure mise en forme
+    réintroduites dans un callback Python et les sorties dépendant des données
+    déplacées dans le navigateur
+
+    Args:
+        app: Instance de l'application Dash (tous les callbacks enregistrés)
+
+    Returns:
+        Liste des anomalies détectées (vide si la répartition est respectée)
+    """
+    problems = []
+    for callback_spec in app._callback_list + _callback.GLOBAL_CALLBACK_LIST:
+        is_clientside = callback_spec.get('clientside_function') is not None
+        for output in _callback_outputs(callback_spec):
+            if not is_clientside and output in CLIENTSIDE_OUTPUTS:
+                problems.append(f"{output} est calculé côté serveur alors qu'il relève du navigateur "
+                                f"(fonction {CLIENTSIDE_OUTPUTS[output]} de assets/clientside.js)")
+            elif is_clientside and output in SERVER_SIDE_OUTPUTS:
+                problems.append(f"{output} doit rester côté serveur : {SERVER_SIDE_OUTPUTS[output]}")
+
+    for problem in problems:
+        print(f"Répartition des callbacks : {problem}")
+    return problems
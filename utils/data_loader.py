@@ -3,8 +3,23 @@
 
 import pandas as pd
 from datetime import datetime
+import hashlib
+import json
 import os
 
+# Suffixe du fichier de métadonnées écrit à côté du jeu de données (résumé par version)
+SUMMARY_SUFFIX = '.summary.json'
+
+# Nombres de valeurs distinctes du résumé (clé, colonne)
+SUMMARY_DISTINCT_COLUMNS = [
+    ('nb_olts', 'olt_name'),
+    ('nb_peags', 'peag_nro'),
+    ('nb_departements', 'code_departement'),
+    ('nb_pop_dns', 'pop_dns'),
+    ('nb_boucles', 'boucle'),
+    ('nb_pebibs', 'pebib')
+]
+
 class DataManager:
     """
     Classe pour charger et filtrer les données
@@ -29,6 +44,16 @@ class DataManager:
         # Conservation d'une copie des données originales
         self.df_original = self.df.copy()
         
+        # Version des données : change dès que le fichier parquet est modifié.
+        # Sert de clé aux caches dérivés (agrégats, index, figures).
+        file_stat = os.stat(parquet_path)
+        self.data_version = hashlib.sha1(
+            f"{os.path.abspath(parquet_path)}:{file_stat.st_mtime_ns}:{file_stat.st_size}:{len(self.df)}".encode()
+        ).hexdigest()[:12]
+        
+        # Résumé du jeu de données (effectifs, période), relu du fichier voisin s'il correspond à cette version
+        self.summary = self._load_summary(parquet_path)
+        
         # Mapping des noms d'affichage aux noms de colonnes selon le format donné
         self.column_mapping = dict([
             ("Département", "code_departement"),
@@ -53,6 +78,46 @@ class DataManager:
             ("Heure de nuit", "is_night_hour"),
         ])
         
+    def _compute_summary(self):
+        """
+        Calcule le résumé du jeu de données : nombre d'observations, nombres de
+        valeurs distinctes des niveaux du réseau et période couverte (None si absente)
+        """
+        df = self.df_original
+        summary = {'data_version': self.data_version, 'nb_observations': len(df)}
+        for key, col_name in SUMMARY_DISTINCT_COLUMNS:
+            summary[key] = int(df[col_name].nunique()) if col_name in df.columns else None
+        
+        summary['date_min'] = summary['date_max'] = None
+        if 'date' in df.columns and len(df):
+            dates = pd.to_datetime(df['date'])
+            summary['date_min'] = dates.min().strftime('%Y-%m-%d')
+            summary['date_max'] = dates.max().strftime('%Y-%m-%d')
+        return summary
+    
+    def _load_summary(self, parquet_path):
+        """
+        Relit le résumé depuis le fichier de métadonnées voisin du jeu de données,
+        ou le calcule et l'y enregistre lorsqu'il est absent ou d'une autre version
+        """
+        summary_path = f"{parquet_path}{SUMMARY_SUFFIX}"
+        try:
+            with open(summary_path, encoding='utf-8') as f:
+                summary = json.load(f)
+            if summary.get('data_version') == self.data_version:
+                return summary
+        except (OSError, ValueError):
+            pass
+        
+        summary = self._compute_summary()
+        try:
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            print(f"Résumé du jeu de données enregistré dans {summary_path}")
+        except OSError as e:
+            print(f"Résumé du jeu de données non enregistré: {e}")
+        return summary
+    
     def get_filter_options(self, filter_name, current_filters=None):
         """
         Récupère les options disponibles pour un filtre donné
@@ -104,10 +169,59 @@ class DataManager:
         filtered_values = [val for val in unique_values.tolist() if val is not None]
         return sorted(filtered_values)
         
+    def filter_condition(self, df, filter_name, col_name, filter_value):
+        """
+        Condition d'un filtre sur un tableau portant la colonne filtrée
+        (données horaires, ou table de partitions des index dérivés)
+        
+        Returns:
+            Série booléenne, ou None si le filtre ne restreint pas les données
+        """
+        condition = None
+        
+        # Filtrage selon le type de filtre
+        if filter_name == "Date" and isinstance(filter_value, tuple) and len(filter_value) == 2:
+            # Convertir en datetime pour le filtrage
+            start_date, end_date = pd.to_datetime(filter_value[0]), pd.to_datetime(filter_value[1])
+            dates = df[col_name]
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates)
+            condition = (dates >= start_date) & (dates <= end_date)
+        
+        elif filter_name == "Heure" and isinstance(filter_value, tuple) and len(filter_value) == 2:
+            min_hour, max_hour = filter_value
+            condition = (df[col_name] >= min_hour) & (df[col_name] <= max_hour)
+        
+        elif filter_name == "Jour de la semaine" and isinstance(filter_value, list):
+            if filter_value:  # Si des jours sont sélectionnés
+                condition = df[col_name].isin(filter_value)
+        
+        elif filter_name in ["Week-end", "Heure de nuit", "Heure ouvrée", "Jour férié", 
+                            "Heure de pointe", "Nouvelle boucle", "DSP 1", "DEP_PEAG_OLT_match"]:
+            if filter_value == 'oui':
+                condition = df[col_name] == 1
+            elif filter_value == 'non':
+                condition = df[col_name] == 0
+            # Si 'all', ne pas filtrer
+        
+        elif filter_name == "Nombre de clients" and isinstance(filter_value, tuple) and len(filter_value) == 2:
+            min_val, max_val = filter_value
+            condition = (df[col_name] >= min_val) & (df[col_name] <= max_val)
+        
+        elif isinstance(filter_value, (str, int, float)) and filter_value:
+            # Filtre simple par égalité
+            condition = df[col_name] == filter_value
+        
+        return condition
+    
     def filter_dataframe(self, filters):
         """
         Filtre le dataframe selon les filtres fournis
         
+        Les conditions sont combinées en un seul masque puis appliquées en une
+        sélection : sans filtre actif, les données d'origine sont retournées
+        telles quelles. Le résultat doit donc être traité en lecture seule.
+        
         Args:
             filters: Dictionnaire {nom_filtre: valeur}
             
@@ -115,7 +229,8 @@ class DataManager:
             DataFrame filtré
         """
         # Partir des données originales
-        filtered_df = self.df_original.copy()
+        df = self.df_original
+        mask = None
         
         # Appliquer chaque filtre
         for filter_name, filter_value in filters.items():
@@ -124,44 +239,28 @@ class DataManager:
                 
             col_name = self.column_mapping[filter_name]
             
-            if col_name not in filtered_df.columns:
+            if col_name not in df.columns:
                 continue
-                
-            # Filtrage selon le type de filtre
-            if filter_name == "Date" and isinstance(filter_value, tuple) and len(filter_value) == 2:
-                # Convertir en datetime pour le filtrage
-                start_date, end_date = pd.to_datetime(filter_value[0]), pd.to_datetime(filter_value[1])
-                filtered_df = filtered_df[(pd.to_datetime(filtered_df[col_name]) >= start_date) & 
-                                         (pd.to_datetime(filtered_df[col_name]) <= end_date)]
             
-            elif filter_name == "Heure" and isinstance(filter_value, tuple) and len(filter_value) == 2:
-                min_hour, max_hour = filter_value
-                filtered_df = filtered_df[(filtered_df[col_name] >= min_hour) & 
-                                         (filtered_df[col_name] <= max_hour)]
+            condition = self.filter_condition(df, filter_name, col_name, filter_value)
             
-            elif filter_name == "Jour de la semaine" and isinstance(filter_value, list):
-                if filter_value:  # Si des jours sont sélectionnés
-                    filtered_df = filtered_df[filtered_df[col_name].isin(filter_value)]
-            
-            elif filter_name in ["Week-end", "Heure de nuit", "Heure ouvrée", "Jour férié", 
-                                "Heure de pointe", "Nouvelle boucle", "DSP 1", "DEP_PEAG_OLT_match"]:
-                if filter_value == 'oui':
-                    filtered_df = filtered_df[filtered_df[col_name] == 1]
-                elif filter_value == 'non':
-                    filtered_df = filtered_df[filtered_df[col_name] == 0]
-                # Si 'all', ne pas filtrer
-            
-            elif filter_name == "Nombre de clients" and isinstance(filter_value, tuple) and len(filter_value) == 2:
-                min_val, max_val = filter_value
-                filtered_df = filtered_df[(filtered_df[col_name] >= min_val) & 
-                                         (filtered_df[col_name] <= max_val)]
-            
-            elif isinstance(filter_value, (str, int, float)) and filter_value:
-                # Filtre simple par égalité
-                filtered_df = filtered_df[filtered_df[col_name] == filter_value]
-                
-        return filtered_df
+            if condition is not None:
+                mask = condition if mask is None else mask & condition
         
+        if mask is None:
+            return df
+        return df[mask.to_numpy()]
+        
+    @staticmethod
+    def filters_key(filters):
+        """
+        Retourne une représentation canonique d'un jeu de filtres,
+        utilisable comme clé de cache (ordre des clés et tuples/listes indifférents).
+        Les clés techniques préfixées par '_' (numéro de séquence...) sont ignorées.
+        """
+        filters = {key: value for key, value in (filters or {}).items() if not str(key).startswith('_')}
+        return json.dumps(filters, sort_keys=True, default=str)
+    
     def get_filtered_row_count(self, filters):
         """
         Retourne le nombre de lignes après application des filtres
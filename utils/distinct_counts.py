@@ -0,0 +1,140 @@
+# utils/distinct_counts.py
+# Nombre d'éléments distincts de chaque niveau du réseau (OLT, PEAG...) sous les filtres courants,
+# estimé en fusionnant des esquisses HyperLogLog précalculées par partition (date × département × indicateurs)
+
+import threading
+import time
+
+import numpy as np
+
+from utils.data_loader import DataManager
+from utils.hll import PartitionedSketches, HLL_PRECISION
+from utils.topology_index import STRUCTURE_HIERARCHY
+
+# Colonnes définissant les partitions : tout filtre portant sur l'une d'elles est résolu
+# sur la table des partitions, sans relire les lignes horaires
+PARTITION_COLUMNS = [
+    'date', 'code_departement', 'day_of_week', 'is_weekend', 'is_holiday',
+    'is_peak_hour', 'is_working_hour', 'is_night_hour', 'new_boucle', 'is_dsp_1', 'code_dep_match'
+]
+
+# Libellés des niveaux affichés dans le panneau des statistiques de filtrage
+DISTINCT_COUNT_LABELS = {
+    'code_departement': 'Départements',
+    'boucle': 'Boucles',
+    'peag_nro': 'PEAG',
+    'olt_name': 'OLT',
+    'pebib': 'PEBIB',
+    'pop_dns': 'POP DNS'
+}
+
+
+class DistinctCountStore:
+    """
+    Esquisses HyperLogLog des colonnes de la hiérarchie pour chaque partition des données,
+    construites une fois par version. Les filtres portant sur les colonnes de partition
+    sélectionnent des partitions dont les esquisses sont fusionnées ; les autres filtres
+    (OLT, heure, nombre de clients...) imposent un comptage exact sur les lignes filtrées.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager les esquisses entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = DistinctCountStore(DataManager.get_instance())
+        return cls._instance
+
+    def __init__(self, data_manager, precision=HLL_PRECISION):
+        """
+        Args:
+            data_manager: Gestionnaire de données source
+            precision: Précision des esquisses HyperLogLog
+        """
+        self.data_manager = data_manager
+        self.precision = precision
+        self._index_version = None
+        self._partitions = None
+        self._sketches = None
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self):
+        """Colonnes de la hiérarchie présentes dans les données"""
+        df_columns = self.data_manager.df_original.columns
+        return [col for _, col in STRUCTURE_HIERARCHY if col in df_columns]
+
+    def _ensure_index(self):
+        """Construit la table des partitions et leurs esquisses, une fois par version des données"""
+        version = self.data_manager.data_version
+        with self._lock:
+            if self._index_version == version:
+                return
+
+            start = time.perf_counter()
+            df = self.data_manager.df_original
+            partition_columns = [col for col in PARTITION_COLUMNS if col in df.columns]
+            partition_ids = (
+                df.groupby(partition_columns, dropna=False, observed=True, sort=False)
+                .ngroup()
+                .to_numpy()
+            )
+            # Une ligne par partition, dans l'ordre des numéros de partition
+            _, first_rows = np.unique(partition_ids, return_index=True)
+            partitions = df[partition_columns].iloc[first_rows].reset_index(drop=True)
+
+            sketches = {
+                col: PartitionedSketches(partition_ids, df[col].to_numpy(), self.precision)
+                for col in self.columns
+            }
+
+            self._partitions = partitions
+            self._sketches = sketches
+            self._index_version = version
+            entries = sum(len(sketch) for sketch in sketches.values())
+            print(f"Esquisses HyperLogLog construites : {len(partitions)} partitions, "
+                  f"{entries} entrées en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _partition_mask(self, filters):
+        """
+        Partitions retenues par les filtres
+
+        Returns:
+            Tableau booléen indexé par numéro de partition, ou None si un filtre actif
+            porte sur une colonne hors partition
+        """
+        data_manager = self.data_manager
+        df = data_manager.df_original
+        mask = np.ones(len(self._partitions), dtype=bool)
+        for filter_name, filter_value in (filters or {}).items():
+            col_name = data_manager.column_mapping.get(filter_name)
+            if col_name is None or col_name not in df.columns:
+                continue
+            if col_name in self._partitions.columns:
+                condition = data_manager.filter_condition(self._partitions, filter_name, col_name, filter_value)
+                if condition is not None:
+                    mask &= condition.to_numpy()
+            elif data_manager.filter_condition(df.iloc[:0], filter_name, col_name, filter_value) is not None:
+                # Mêmes règles que filter_dataframe : le filtre restreint les lignes d'une partition
+                return None
+        return mask
+
+    def distinct_counts(self, filters):
+        """
+        Nombre de valeurs distinctes de chaque colonne de la hiérarchie sous les filtres
+
+        Args:
+            filters: Filtres courants (format DataManager.filter_dataframe)
+
+        Returns:
+            Dictionnaire {'counts': {colonne: nombre}, 'estimated': True si issu des esquisses}
+        """
+        self._ensure_index()
+        mask = self._partition_mask(filters)
+        if mask is None:
+            filtered_df = self.data_manager.filter_dataframe(filters)
+            counts = {col: int(filtered_df[col].nunique()) for col in self.columns}
+            return {'counts': counts, 'estimated': False}
+
+        counts = {col: sketch.union(mask).count() for col, sketch in self._sketches.items()}
+        return {'counts': counts, 'estimated': True}
@@ -0,0 +1,125 @@
+# utils/dns_regression.py
+# Détection des dégradations DNS : comparaison fenêtre courante / fenêtre de référence
+# pour toutes les combinaisons en une seule passe vectorisée
+
+import numpy as np
+import pandas as pd
+
+from utils.dns_rollup import DnsRollupStore, MOMENT_COLUMNS
+
+# Seuil du score z (test de Welch) au-delà duquel une dégradation est jugée significative
+DEFAULT_Z_THRESHOLD = 3.0
+
+# Nombre minimal de tests DNS dans chaque fenêtre pour évaluer une combinaison
+DEFAULT_MIN_TESTS = 50
+
+
+def _window_statistics(sums):
+    """
+    Calcule moyenne pondérée, variance et erreur type à partir des moments additifs
+
+    Args:
+        sums: DataFrame avec les colonnes de MOMENT_COLUMNS
+
+    Returns:
+        tuple (moyenne, erreur type au carré, nombre de tests) en tableaux numpy
+    """
+    tests = sums["total_tests_dns"].to_numpy(dtype='float64')
+    weighted_sum = sums["dns_weighted_sum"].to_numpy(dtype='float64')
+    weighted_sq_sum = sums["dns_weighted_sq_sum"].to_numpy(dtype='float64')
+    tests_sq_sum = sums["tests_sq_sum"].to_numpy(dtype='float64')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = weighted_sum / tests
+        variance = np.maximum(weighted_sq_sum / tests - mean * mean, 0.0)
+        # Effectif efficace des mesures horaires pondérées par le nombre de tests
+        effective_n = tests * tests / tests_sq_sum
+        squared_se = np.where(effective_n > 1, variance / (effective_n - 1), np.nan)
+
+    return mean, squared_se, tests
+
+
+def detect_dns_regressions(filters, aggregation_dims, window_days=7,
+                           z_threshold=DEFAULT_Z_THRESHOLD, min_tests=DEFAULT_MIN_TESTS,
+                           rollup_store=None):
+    """
+    Compare, pour chaque combinaison des dimensions d'agrégation, le temps DNS moyen
+    des window_days derniers jours à celui des window_days jours précédents
+
+    Args:
+        filters: Filtres courants (format DataManager.filter_dataframe)
+        aggregation_dims: Dimensions définissant les combinaisons (OLT, PEAG, ...)
+        window_days: Longueur en jours de chacune des deux fenêtres
+        z_threshold: Score z minimal pour retenir une dégradation
+        min_tests: Nombre minimal de tests DNS dans chaque fenêtre
+        rollup_store: Magasin d'agrégats (singleton par défaut)
+
+    Returns:
+        tuple (DataFrame des dégradations significatives triées par score z décroissant,
+        dictionnaire décrivant les fenêtres et le nombre de combinaisons évaluées)
+
+    Raises:
+        ValueError: si le jeu de données n'a pas de colonne date
+    """
+    rollup_store = rollup_store or DnsRollupStore.get_instance()
+    time_dims = rollup_store.time_dims()
+    if len(time_dims) != 1:
+        raise ValueError("La détection de dégradations nécessite une colonne date")
+    date_col = time_dims[0]
+
+    moments = rollup_store.get_dns_moments(filters, aggregation_dims)
+    empty_windows = {'current': None, 'baseline': None, 'evaluated': 0}
+    if moments.empty:
+        return pd.DataFrame(), empty_windows
+
+    # Fenêtres calées sur la dernière date disponible
+    dates = moments[date_col].to_numpy(dtype='datetime64[ns]')
+    end = dates.max()
+    current_start = end - np.timedelta64(window_days, 'D')
+    baseline_start = current_start - np.timedelta64(window_days, 'D')
+
+    window = np.select(
+        [dates > current_start, dates > baseline_start],
+        ['current', 'baseline'],
+        default=''
+    )
+    moments = moments.assign(window=window)
+    moments = moments[moments['window'] != '']
+    window_bounds = moments.groupby('window')[date_col].agg(['min', 'max'])
+
+    # Une seule agrégation pour toutes les combinaisons et les deux fenêtres
+    sums = moments.groupby(list(aggregation_dims) + ['window'], observed=True)[MOMENT_COLUMNS].sum()
+    per_window = sums.unstack('window')
+    if 'current' not in per_window.columns.get_level_values(1) or 'baseline' not in per_window.columns.get_level_values(1):
+        return pd.DataFrame(), empty_windows
+    per_window = per_window.dropna()
+
+    current_mean, current_se2, current_tests = _window_statistics(per_window.xs('current', axis=1, level=1))
+    baseline_mean, baseline_se2, baseline_tests = _window_statistics(per_window.xs('baseline', axis=1, level=1))
+
+    delta = current_mean - baseline_mean
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Test de Welch sur la différence des moyennes pondérées
+        z_score = delta / np.sqrt(current_se2 + baseline_se2)
+        delta_pct = np.where(baseline_mean > 0, delta / baseline_mean * 100, np.nan)
+
+    result = pd.DataFrame({
+        'baseline_dns_time': baseline_mean,
+        'current_dns_time': current_mean,
+        'delta_ms': delta,
+        'delta_pct': delta_pct,
+        'z_score': z_score,
+        'baseline_tests': baseline_tests,
+        'current_tests': current_tests
+    }, index=per_window.index).reset_index()
+
+    evaluated = (result['baseline_tests'] >= min_tests) & (result['current_tests'] >= min_tests)
+    significant = evaluated & (result['delta_ms'] > 0) & (result['z_score'] >= z_threshold)
+
+    windows = {
+        'current': tuple(window_bounds.loc['current']),
+        'baseline': tuple(window_bounds.loc['baseline']),
+        'evaluated': int(evaluated.sum())
+    }
+    ranking = result[significant].sort_values('z_score', ascending=False).reset_index(drop=True)
+    return ranking, windows
@@ -0,0 +1,166 @@
+# utils/dns_rollup.py
+# Agrégats DNS réutilisables : calcul à la granularité la plus fine demandée
+# puis dérivation des vues plus grossières par roll-up
+
+from collections import OrderedDict
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import DataManager
+
+# Sommes additives conservées pour chaque cellule d'agrégat
+MOMENT_COLUMNS = ["dns_weighted_sum", "dns_weighted_sq_sum", "tests_sq_sum", "total_tests_dns"]
+
+
+class DnsRollupStore:
+    """
+    Conserve, pour chaque jeu de filtres, l'agrégat DNS le plus fin déjà calculé.
+    Les sommes (temps pondéré, nombre de tests) étant additives, toute vue sur
+    un sous-ensemble des dimensions s'obtient par simple regroupement de cet
+    agrégat, sans repasser par filter_dataframe.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager les agrégats entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = DnsRollupStore(DataManager.get_instance())
+        return cls._instance
+
+    def __init__(self, data_manager, max_entries=32):
+        """
+        Args:
+            data_manager: Gestionnaire de données source
+            max_entries: Nombre maximal de jeux de filtres conservés (éviction LRU)
+        """
+        self.data_manager = data_manager
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def time_columns(self):
+        """
+        Identifie les colonnes jour, heure et date du jeu de données
+
+        Returns:
+            tuple (jour_col, heure_col, date_col)
+        """
+        columns = self.data_manager.df_original.columns
+        jour_col = "day_of_week" if "day_of_week" in columns else "jour"
+        heure_col = "heure" if "heure" in columns else "hour"
+        date_col = "date" if "date" in columns else "date_hour"
+        return jour_col, heure_col, date_col
+
+    def time_dims(self):
+        """
+        Dimensions temporelles de l'agrégat : la date si elle existe,
+        sinon le couple jour de la semaine / heure
+        """
+        jour_col, heure_col, date_col = self.time_columns()
+        if date_col in self.data_manager.df_original.columns:
+            return [date_col]
+        return [jour_col, heure_col]
+
+    def _aggregate(self, filters, dims):
+        """
+        Calcule l'agrégat additif depuis les données filtrées.
+        Les valeurs manquantes des dimensions sont conservées comme clés pour
+        que chaque roll-up puisse écarter uniquement celles qu'il utilise.
+        """
+        jour_col, heure_col, date_col = self.time_columns()
+        filtered_df = self.data_manager.filter_dataframe(filters)
+
+        # Colonnes requises adaptées aux noms réels
+        required_cols = [jour_col, heure_col, "avg_dns_time", "nb_test_dns"]
+        if date_col in filtered_df.columns:
+            required_cols.append(date_col)
+
+        df_cleaned = filtered_df.dropna(subset=required_cols)
+        if date_col in df_cleaned.columns:
+            df_cleaned = df_cleaned.assign(**{date_col: pd.to_datetime(df_cleaned[date_col])})
+
+        # Moments pondérés par le nombre de tests (tous additifs) : ils suffisent
+        # à dériver moyenne, variance et effectif efficace de n'importe quel roll-up
+        dns_time = df_cleaned["avg_dns_time"].to_numpy(dtype='float64')
+        tests = df_cleaned["nb_test_dns"].to_numpy(dtype='float64')
+        weighted = dns_time * tests
+        return (
+            df_cleaned.assign(dns_weighted_sum=weighted,
+                              dns_weighted_sq_sum=weighted * dns_time,
+                              tests_sq_sum=tests * tests)
+            .groupby(list(dims), dropna=False, observed=True)
+            .agg(dns_weighted_sum=("dns_weighted_sum", "sum"),
+                 dns_weighted_sq_sum=("dns_weighted_sq_sum", "sum"),
+                 tests_sq_sum=("tests_sq_sum", "sum"),
+                 total_tests_dns=("nb_test_dns", "sum"))
+            .reset_index()
+        )
+
+    def _base_aggregate(self, filters, dims):
+        """
+        Retourne un agrégat contenant au moins les dimensions demandées,
+        en le recalculant seulement si elles sont plus fines que celles en cache
+        """
+        key = (self.data_manager.data_version, DataManager.filters_key(filters))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if set(dims) <= set(entry['dims']):
+                    return entry['frame']
+
+        # Recalcul sur l'union des dimensions pour que les deux vues restent dérivables
+        union_dims = list(entry['dims']) if entry is not None else []
+        union_dims += [dim for dim in dims if dim not in union_dims]
+        frame = self._aggregate(filters, union_dims)
+
+        with self._lock:
+            self._entries[key] = {'dims': tuple(union_dims), 'frame': frame}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return frame
+
+    def get_dns_moments(self, filters, aggregation_dims):
+        """
+        Retourne les sommes additives (moments pondérés) par dimensions temporelles
+        et dimensions d'agrégation, sans calcul de moyenne
+
+        Returns:
+            DataFrame avec les dimensions, 'dns_weighted_sum', 'dns_weighted_sq_sum',
+            'tests_sq_sum' et 'total_tests_dns'
+        """
+        dims = self.time_dims() + [dim for dim in aggregation_dims if dim not in self.time_dims()]
+        base = self._base_aggregate(filters or {}, dims)
+
+        # Roll-up : les lignes dont une dimension demandée est manquante sont écartées
+        return (
+            base.groupby(dims, dropna=True, observed=True)[MOMENT_COLUMNS]
+            .sum()
+            .reset_index()
+        )
+
+    def get_dns_aggregate(self, filters, aggregation_dims):
+        """
+        Agrège le temps DNS moyen pondéré par le nombre de tests
+
+        Args:
+            filters: Filtres courants (format DataManager.filter_dataframe)
+            aggregation_dims: Dimensions d'agrégation choisies par l'utilisateur
+
+        Returns:
+            DataFrame avec les dimensions temporelles, les dimensions d'agrégation,
+            'moy_avg_dns_time' et 'total_tests_dns'
+        """
+        dims = self.time_dims() + [dim for dim in aggregation_dims if dim not in self.time_dims()]
+        rolled = self.get_dns_moments(filters, aggregation_dims)
+
+        tests = rolled["total_tests_dns"].to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rolled["moy_avg_dns_time"] = np.where(tests > 0, rolled["dns_weighted_sum"].to_numpy() / tests, np.nan)
+
+        return rolled[dims + ["moy_avg_dns_time", "total_tests_dns"]]
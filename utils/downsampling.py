@@ -0,0 +1,212 @@
+# utils/downsampling.py
+# Réduction côté serveur des séries temporelles longues (LTTB) avant la construction des figures
+
+from collections import OrderedDict
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+from dash import dcc, ctx, Input, Output, MATCH, Patch, no_update
+
+from utils.figure_payload import finalize_figure
+
+# Nombre maximal de points envoyés au navigateur pour une trace
+MAX_POINTS_PER_TRACE = 400
+
+# Nombre maximal de séries complètes conservées pour le rechargement au zoom
+MAX_CACHED_FIGURES = 256
+
+# Séries complètes indexées par clé de figure (éviction LRU)
+_full_series_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _to_numeric_axis(x):
+    """
+    Convertit un axe X (dates ou nombres) en tableau float64 pour les calculs d'aire
+    """
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype('int64').to_numpy(dtype='float64')
+    return pd.to_numeric(x, errors='coerce').to_numpy(dtype='float64')
+
+
+def lttb_indices(x, y, n_out=MAX_POINTS_PER_TRACE):
+    """
+    Sélectionne les indices des points à conserver avec l'algorithme
+    Largest-Triangle-Three-Buckets
+
+    Args:
+        x: Tableau numérique trié (float64)
+        y: Valeurs associées (float64)
+        n_out: Nombre de points à conserver
+
+    Returns:
+        np.ndarray des indices retenus, triés
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Bornes des seaux intermédiaires (le premier et le dernier point sont fixes)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Moyenne du seau suivant (ou dernier point pour le dernier seau)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Aire du triangle formé avec le point précédent et la moyenne suivante
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[previous] - avg_x) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
+
+
+def downsample_frame(df, x_col, y_col, n_out=MAX_POINTS_PER_TRACE):
+    """
+    Réduit un DataFrame trié par x_col aux lignes retenues par LTTB sur y_col.
+    Les lignes dont la valeur y est manquante sont ignorées lors de la sélection.
+
+    Returns:
+        DataFrame réduit (le DataFrame d'origine s'il est déjà assez court)
+    """
+    if len(df) <= n_out:
+        return df
+
+    x = _to_numeric_axis(df[x_col])
+    y = pd.to_numeric(df[y_col], errors='coerce').to_numpy(dtype='float64')
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    if len(valid) <= n_out:
+        return df.iloc[valid]
+
+    keep = lttb_indices(x[valid], y[valid], n_out)
+    return df.iloc[valid[keep]]
+
+
+def attach_full_series(fig, series):
+    """
+    Mémorise les séries complètes d'une figure réduite pour permettre le
+    rechargement en pleine résolution de la fenêtre visible lors d'un zoom
+
+    Args:
+        fig: Figure Plotly construite à partir des données réduites
+        series: Dictionnaire {indice de trace: (x, y)} des données complètes triées
+
+    Returns:
+        La clé de la figure dans le cache
+    """
+    key = uuid.uuid4().hex
+    stored = {
+        int(trace_index): (pd.Series(x).reset_index(drop=True), pd.Series(y).reset_index(drop=True))
+        for trace_index, (x, y) in series.items()
+    }
+
+    with _cache_lock:
+        _full_series_cache[key] = stored
+        while len(_full_series_cache) > MAX_CACHED_FIGURES:
+            _full_series_cache.popitem(last=False)
+
+    # uirevision conserve le zoom de l'utilisateur lorsque les données sont remplacées
+    fig.update_layout(meta={'series_key': key}, uirevision=key)
+    return key
+
+
+def create_downsampled_graph(fig, **graph_kwargs):
+    """
+    Crée le dcc.Graph d'une figure ; si des séries complètes lui sont attachées,
+    le graphique reçoit un identifiant écouté par le callback de zoom
+    """
+    meta = fig.layout.meta if isinstance(fig.layout.meta, dict) else {}
+    series_key = meta.get('series_key')
+    if series_key:
+        graph_kwargs['id'] = {'type': 'downsampled-graph', 'index': series_key}
+    return dcc.Graph(figure=finalize_figure(fig), **graph_kwargs)
+
+
+def _window_slice(x, y, x_range, n_out):
+    """
+    Extrait la fenêtre visible (avec un point de part et d'autre) puis la réduit
+    """
+    if x_range is not None:
+        if pd.api.types.is_datetime64_any_dtype(x):
+            x0, x1 = pd.Timestamp(x_range[0]), pd.Timestamp(x_range[1])
+        else:
+            x0, x1 = float(x_range[0]), float(x_range[1])
+        start = max(int(x.searchsorted(x0, side='left')) - 1, 0)
+        end = min(int(x.searchsorted(x1, side='right')) + 1, len(x))
+        x, y = x.iloc[start:end], y.iloc[start:end]
+
+    window = pd.DataFrame({'x': x.to_numpy(), 'y': y.to_numpy()})
+    window = downsample_frame(window, 'x', 'y', n_out)
+    return window['x'], window['y']
+
+
+def _parse_x_range(relayout_data):
+    """
+    Extrait la plage de l'axe X d'un événement relayoutData.
+    Retourne (plage, réinitialisation) ou (None, False) si l'axe X n'a pas changé.
+    """
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return (relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']), False
+    if 'xaxis.range' in relayout_data:
+        return tuple(relayout_data['xaxis.range'][:2]), False
+    if relayout_data.get('xaxis.autorange'):
+        return None, True
+    return None, False
+
+
+def init_downsampling_callbacks(app):
+    """
+    Initialise le callback qui recharge en pleine résolution la fenêtre
+    visible des graphiques réduits lorsque l'utilisateur zoome
+
+    Args:
+        app: L'application Dash
+    """
+    @app.callback(
+        Output({'type': 'downsampled-graph', 'index': MATCH}, 'figure'),
+        Input({'type': 'downsampled-graph', 'index': MATCH}, 'relayoutData'),
+        prevent_initial_call=True
+    )
+    def refetch_visible_window(relayout_data):
+        if not relayout_data:
+            return no_update
+
+        x_range, reset = _parse_x_range(relayout_data)
+        if x_range is None and not reset:
+            return no_update
+
+        series_key = ctx.triggered_id['index']
+        with _cache_lock:
+            stored = _full_series_cache.get(series_key)
+            if stored is not None:
+                _full_series_cache.move_to_end(series_key)
+
+        # Séries expirées : on conserve la vue réduite actuelle
+        if stored is None:
+            return no_update
+
+        patched_figure = Patch()
+        for trace_index, (x, y) in stored.items():
+            window_x, window_y = _window_slice(x, y, x_range, MAX_POINTS_PER_TRACE)
+            patched_figure['data'][trace_index]['x'] = window_x.tolist()
+            patched_figure['data'][trace_index]['y'] = window_y.tolist()
+        return patched_figure
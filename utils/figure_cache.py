@@ -0,0 +1,146 @@
+# utils/figure_cache.py
+# Cache des graphiques sérialisés, indexé par constructeur, filtres et version des données :
+# cache mémoire (LRU) dans chaque processus et cache disque local partagé entre les workers
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import plotly
+
+from utils.data_loader import DataManager
+
+# Répertoire du cache disque (surchargeable par variable d'environnement)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.environ.get('FIGURE_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'figures'))
+
+# Version du format des graphiques (à incrémenter lorsque les constructeurs ou le thème changent,
+# pour ne pas relire des graphiques obsolètes du cache disque)
+CACHE_FORMAT_VERSION = 2
+
+# Nombre maximal d'entrées en mémoire et sur disque
+MAX_MEMORY_ENTRIES = 64
+MAX_DISK_ENTRIES = 512
+
+
+class FigureCache:
+    """
+    Mémorise le résultat sérialisé (JSON Plotly/Dash) des constructeurs de graphiques.
+    Un résultat relu du cache est renvoyé sous forme de composants sérialisés,
+    directement utilisables comme children d'un composant Dash.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager le cache entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = FigureCache(DataManager.get_instance())
+        return cls._instance
+
+    def __init__(self, data_manager, cache_dir=DEFAULT_CACHE_DIR,
+                 max_memory_entries=MAX_MEMORY_ENTRIES, max_disk_entries=MAX_DISK_ENTRIES):
+        """
+        Args:
+            data_manager: Gestionnaire de données (fournit la version des données)
+            cache_dir: Répertoire du cache disque (None pour le désactiver)
+            max_memory_entries: Taille du cache mémoire (éviction LRU)
+            max_disk_entries: Nombre de fichiers conservés sur disque (les plus anciens sont supprimés)
+        """
+        self.data_manager = data_manager
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                print(f"Cache disque des graphiques désactivé: {e}")
+                self.cache_dir = None
+
+    def make_key(self, builder_name, filters):
+        """Clé du cache : constructeur, filtres canoniques, version des données et du format"""
+        raw_key = (f"{builder_name}|{DataManager.filters_key(filters)}|"
+                   f"{self.data_manager.data_version}|{CACHE_FORMAT_VERSION}")
+        return hashlib.sha1(raw_key.encode()).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self.cache_dir:
+            return
+        try:
+            # Écriture atomique : un autre worker ne lit jamais un fichier partiel
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._disk_path(key))
+            self._prune_disk()
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du cache des graphiques: {e}")
+
+    def _prune_disk(self):
+        """Supprime les fichiers les plus anciens au-delà de max_disk_entries"""
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _remember(self, key, payload):
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_build(self, builder_name, filters, build):
+        """
+        Retourne le résultat en cache ou le construit puis le met en cache
+
+        Args:
+            builder_name: Nom du constructeur (fait partie de la clé)
+            filters: Filtres courants
+            build: Fonction sans argument produisant les composants
+
+        Returns:
+            Composants sérialisés (listes et dictionnaires Dash)
+        """
+        key = self.make_key(builder_name, filters)
+
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+
+        if payload is None:
+            payload = self._read_disk(key)
+            if payload is not None:
+                self._remember(key, payload)
+
+        if payload is None:
+            payload = plotly.io.json.to_json_plotly(build())
+            self._remember(key, payload)
+            self._write_disk(key, payload)
+
+        return json.loads(payload)
@@ -0,0 +1,160 @@
+# utils/figure_payload.py
+# Finalisation des figures Plotly avant envoi au navigateur : tableaux numériques
+# compacts (encodés en base64 par Plotly 6), arrondi des coordonnées à la précision d'affichage
+# (chiffres significatifs)
+# et suppression des valeurs par défaut inutiles du thème ; choix du rendu SVG ou WebGL
+# des nuages de points selon leur taille
+
+import os
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.graph_objects as go
+
+# Nombre de chiffres significatifs conservés pour les coordonnées flottantes (la partie entière
+# est toujours conservée : dates en millisecondes, grands comptages)
+DISPLAY_SIGNIFICANT_DIGITS = 6
+
+# Propriétés arrondies à DISPLAY_SIGNIFICANT_DIGITS : coordonnées affichées uniquement (customdata,
+# couleurs, tailles... gardent leur précision et ne changent que de type)
+ROUNDED_TRACE_KEYS = {'x', 'y', 'z', 'lat', 'lon'}
+
+# Journalisation de la taille de chaque figure (sérialisation supplémentaire, diagnostic uniquement ;
+# voir aussi utils/payload_benchmark.py)
+LOG_FIGURE_SIZES = os.environ.get('FIGURE_PAYLOAD_DEBUG', '') == '1'
+
+# Taille minimale d'un tableau pour qu'il soit converti (les petites listes restent lisibles)
+MIN_ARRAY_LENGTH = 8
+
+# Au-delà de ce nombre de points, les nuages et courbes sont rendus en WebGL
+WEBGL_POINT_THRESHOLD = 1000
+
+# Propriétés de trace à ne jamais convertir (structures géographiques)
+SKIPPED_TRACE_KEYS = {'geojson'}
+
+_INT32_MIN, _INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def scatter_trace(x, y, **kwargs):
+    """
+    Crée une trace de nuage de points ou de courbe, rendue en WebGL (Scattergl)
+    au-delà de WEBGL_POINT_THRESHOLD points et en SVG (Scatter) en dessous
+
+    Args:
+        x: Valeurs de l'axe X
+        y: Valeurs de l'axe Y
+        **kwargs: Propriétés de la trace (mode, marker, customdata, hovertemplate...)
+
+    Returns:
+        go.Scatter ou go.Scattergl
+    """
+    trace_class = go.Scattergl if len(x) > WEBGL_POINT_THRESHOLD else go.Scatter
+    return trace_class(x=x, y=y, **kwargs)
+
+
+def round_significant(array, significant_digits):
+    """
+    Arrondit chaque valeur à significant_digits chiffres significatifs, sans jamais
+    arrondir la partie entière (les valeurs nulles, infinies ou NaN sont inchangées)
+    """
+    array = np.asarray(array, dtype=np.float64)
+    magnitude = np.abs(array)
+    finite = np.isfinite(array) & (magnitude > 0)
+    exponents = np.floor(np.log10(magnitude, where=finite, out=np.zeros_like(array)))
+    decimals = np.maximum(significant_digits - 1 - exponents, 0)
+    scale = np.power(10.0, decimals)
+    return np.where(finite, np.round(array * scale) / scale, array)
+
+
+def _compact_array(value, significant_digits):
+    """
+    Convertit un tableau numérique en un type encodable en base64 par Plotly
+    (les entiers 64 bits sont sinon sérialisés en liste JSON ; ils ne passent en
+    int32 que si leur minimum et leur maximum y tiennent) ; les flottants sont
+    arrondis à significant_digits chiffres significatifs, sauf si significant_digits vaut None
+
+    Returns:
+        np.ndarray compact, ou None si le tableau n'est pas numérique
+    """
+    if isinstance(value, pd.Series):
+        value = value.to_numpy()
+    try:
+        array = np.asarray(value)
+    except ValueError:
+        # Tableau irrégulier
+        return None
+
+    if array.dtype.kind in 'iu':
+        if array.size and (array.min() < _INT32_MIN or array.max() > _INT32_MAX):
+            return array.astype(np.float64)
+        return array.astype(np.int32)
+    if array.dtype.kind == 'f':
+        # Les tableaux déjà réduits en float32 le restent
+        float_type = np.float32 if array.dtype.itemsize <= 4 else np.float64
+        if significant_digits is not None:
+            array = round_significant(array, significant_digits)
+        return array.astype(float_type)
+    return None
+
+
+def _compact_properties(properties, significant_digits):
+    """
+    Parcourt récursivement les propriétés d'une trace et retourne
+    uniquement celles à remplacer par leur version compacte
+    (seules les coordonnées de premier niveau sont arrondies)
+    """
+    changes = {}
+    for key, value in properties.items():
+        if key in SKIPPED_TRACE_KEYS:
+            continue
+        if isinstance(value, dict):
+            nested = _compact_properties(value, None)
+            if nested:
+                changes[key] = nested
+        elif isinstance(value, (list, tuple, np.ndarray, pd.Series)) and len(value) >= MIN_ARRAY_LENGTH:
+            compact = _compact_array(value, significant_digits if key in ROUNDED_TRACE_KEYS else None)
+            if compact is not None:
+                changes[key] = compact
+    return changes
+
+
+def _strip_unused_template_data(fig):
+    """
+    Ne conserve dans le thème que les valeurs par défaut des types de traces
+    réellement présents (le rendu est inchangé)
+    """
+    template = fig.layout.template
+    if template is None or template.data is None:
+        return
+    used_types = {trace.type for trace in fig.data}
+    template_data = template.data.to_plotly_json()
+    fig.layout.template = go.layout.Template(
+        layout=template.layout,
+        data={trace_type: defaults for trace_type, defaults in template_data.items() if trace_type in used_types}
+    )
+
+
+def finalize_figure(fig, label=None, significant_digits=DISPLAY_SIGNIFICANT_DIGITS):
+    """
+    Prépare une figure pour l'envoi au navigateur (modifiée sur place)
+
+    Args:
+        fig: Figure Plotly
+        label: Nom de la figure dans les traces de journalisation (FIGURE_PAYLOAD_DEBUG=1)
+        significant_digits: Chiffres significatifs conservés pour les coordonnées (None : aucun arrondi)
+
+    Returns:
+        La figure
+    """
+    for trace in fig.data:
+        changes = _compact_properties(trace.to_plotly_json(), significant_digits)
+        if changes:
+            trace.update(changes)
+
+    _strip_unused_template_data(fig)
+
+    if LOG_FIGURE_SIZES:
+        payload_size = len(plotly.io.json.to_json_plotly(fig))
+        print(f"Taille de la figure {label or fig.layout.title.text or ''}: {payload_size / 1024:.1f} Ko")
+    return fig
@@ -0,0 +1,283 @@
+# utils/geo_loader.py
+# Géométries des départements : chargement unique d'un GeoJSON local simplifié,
+# indexé par code département (préparé une seule fois depuis la source publique s'il manque)
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+# Source publique utilisée uniquement pour préparer le fichier local
+GEOJSON_SOURCE_URL = "https://france-geojson.gregoiredavid.fr/repo/departements.geojson"
+
+# Fichier simplifié livré avec l'application
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_GEOJSON_PATH = os.path.join(BASE_DIR, 'data', 'geo', 'departements-simplifies.geojson')
+
+# Tolérance de simplification (degrés, environ 500 m) et précision des coordonnées
+DEFAULT_TOLERANCE = 0.005
+DEFAULT_PRECISION = 4
+
+# Délai (secondes) de téléchargement de la source lorsque le fichier local manque,
+# et délai avant une nouvelle tentative après un échec
+GEOJSON_FETCH_TIMEOUT = 10
+GEOJSON_RETRY_DELAY = 300
+
+
+class DepartementGeoStore:
+    """
+    Géométries des départements chargées une seule fois et indexées par code.
+    Si le fichier local manque, il est préparé depuis la source publique ; en cas
+    d'échec (pas de réseau), le magasin est vide (available = False) et une nouvelle
+    tentative n'a lieu qu'après GEOJSON_RETRY_DELAY.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour ne lire le fichier GeoJSON qu'une fois"""
+        if cls._instance is None or (
+            not cls._instance.available
+            and time.monotonic() - cls._instance.loaded_at > GEOJSON_RETRY_DELAY
+        ):
+            cls._instance = DepartementGeoStore()
+        return cls._instance
+
+    def __init__(self, geojson_path=DEFAULT_GEOJSON_PATH, source=GEOJSON_SOURCE_URL):
+        """
+        Args:
+            geojson_path: Chemin du GeoJSON simplifié des départements
+            source: URL ou chemin du GeoJSON public utilisé si le fichier manque (None : aucun)
+        """
+        self.loaded_at = time.monotonic()
+        self.geojson = None
+        self.features_by_code = {}
+        self.codes = []
+
+        if not os.path.exists(geojson_path):
+            if source is None:
+                print(f"Fichier géographique introuvable : {geojson_path}")
+                return
+            try:
+                build_geojson_store(source, geojson_path, timeout=GEOJSON_FETCH_TIMEOUT)
+            except Exception as e:
+                print(f"Géométries des départements non préparées ({geojson_path}) : {e}. "
+                      f"Générez le fichier avec 'python -m utils.geo_loader'.")
+                return
+
+        with open(geojson_path, encoding='utf-8') as f:
+            self.geojson = json.load(f)
+
+        self.features_by_code = {
+            str(feature["properties"]["code"]): feature
+            for feature in self.geojson["features"]
+        }
+        self.codes = list(self.features_by_code)
+        print(f"Géométries chargées : {len(self.codes)} départements")
+
+    @property
+    def available(self):
+        """True si les géométries ont pu être chargées"""
+        return self.geojson is not None
+
+    @staticmethod
+    def normalize_code(department_code):
+        """Normalise un code département ('1' -> '01', ' 2a' -> '2A')"""
+        code = str(department_code).strip().upper()
+        return code.zfill(2) if code.isdigit() else code
+
+    def get_feature(self, department_code):
+        """Retourne la feature GeoJSON du département, ou None s'il est inconnu"""
+        return self.features_by_code.get(self.normalize_code(department_code))
+
+    def get_name(self, department_code):
+        """Retourne le nom du département, ou None s'il est inconnu"""
+        feature = self.get_feature(department_code)
+        return feature["properties"].get("nom") if feature is not None else None
+
+
+def _douglas_peucker(points, tolerance):
+    """
+    Simplifie une polyligne ouverte en conservant ses extrémités
+
+    Args:
+        points: Tableau numpy (n, 2)
+        tolerance: Distance maximale tolérée à la polyligne simplifiée
+
+    Returns:
+        Masque booléen des points conservés
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        inner = points[start + 1:end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def _polygon_list(geometry):
+    """Retourne la liste des polygones (listes d'anneaux) d'une géométrie"""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def simplify_geojson(geojson, tolerance=DEFAULT_TOLERANCE, precision=DEFAULT_PRECISION):
+    """
+    Simplifie les contours en préservant la topologie : les frontières communes
+    à deux départements sont découpées aux points de jonction et simplifiées
+    une seule fois, de sorte que les voisins restent jointifs.
+
+    Args:
+        geojson: FeatureCollection source (Polygon / MultiPolygon)
+        tolerance: Tolérance de Douglas-Peucker en degrés
+        precision: Nombre de décimales conservées
+
+    Returns:
+        Nouvelle FeatureCollection avec les propriétés 'code' et 'nom' uniquement
+    """
+    # Anneaux ouverts (sans le point de fermeture) sur une grille commune
+    rings = []
+    for feature in geojson["features"]:
+        for polygon in _polygon_list(feature["geometry"]):
+            for ring in polygon:
+                points = []
+                for x, y in (coord[:2] for coord in ring):
+                    point = (round(x, precision), round(y, precision))
+                    if not points or points[-1] != point:
+                        points.append(point)
+                if len(points) > 1 and points[0] == points[-1]:
+                    points.pop()
+                rings.append(points)
+
+    # Anneaux auxquels appartient chaque sommet
+    membership = {}
+    for ring_index, points in enumerate(rings):
+        for point in points:
+            membership.setdefault(point, set()).add(ring_index)
+
+    simplified_arcs = {}
+
+    def simplify_arc(arc):
+        # Sens canonique : un arc partagé est simplifié de la même façon pour ses deux anneaux
+        reverse = arc[::-1]
+        canonical = arc if arc <= reverse else reverse
+        if canonical not in simplified_arcs:
+            keep = _douglas_peucker(np.asarray(canonical, dtype='float64'), tolerance)
+            simplified_arcs[canonical] = [point for point, kept in zip(canonical, keep) if kept]
+        result = simplified_arcs[canonical]
+        return result if canonical == arc else result[::-1]
+
+    simplified_rings = []
+    for points in rings:
+        n = len(points)
+        if n < 3:
+            simplified_rings.append(None)
+            continue
+
+        # Points de jonction : changement de voisinage ou sommet commun à trois anneaux
+        junctions = [
+            i for i in range(n)
+            if len(membership[points[i]]) >= 3
+            or membership[points[i]] != membership[points[i - 1]]
+            or membership[points[i]] != membership[points[(i + 1) % n]]
+        ]
+        if not junctions:
+            # Anneau isolé (île) : ancrage sur le premier point et le plus éloigné
+            array = np.asarray(points, dtype='float64')
+            farthest = int(np.argmax(np.hypot(*(array - array[0]).T)))
+            junctions = sorted({0, farthest})
+
+        result = []
+        for k, start in enumerate(junctions):
+            end = junctions[(k + 1) % len(junctions)]
+            arc = tuple(points[start:end + 1]) if end > start else tuple(points[start:] + points[:end + 1])
+            result.extend(simplify_arc(arc)[:-1])
+
+        if len(result) < 3:
+            result = points
+        simplified_rings.append(result + [result[0]])
+
+    # Reconstruction des features dans l'ordre d'origine
+    features = []
+    ring_iter = iter(simplified_rings)
+    for feature in geojson["features"]:
+        polygons = []
+        for polygon in _polygon_list(feature["geometry"]):
+            new_polygon = [ring for ring in (next(ring_iter) for _ in polygon) if ring is not None]
+            if new_polygon:
+                polygons.append([[list(point) for point in ring] for ring in new_polygon])
+
+        geometry = (
+            {"type": "Polygon", "coordinates": polygons[0]} if len(polygons) == 1
+            else {"type": "MultiPolygon", "coordinates": polygons}
+        )
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "code": str(feature["properties"]["code"]),
+                "nom": feature["properties"].get("nom")
+            },
+            "geometry": geometry
+        })
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def build_geojson_store(source=GEOJSON_SOURCE_URL, output_path=DEFAULT_GEOJSON_PATH,
+                        tolerance=DEFAULT_TOLERANCE, precision=DEFAULT_PRECISION, timeout=60):
+    """
+    Prépare le fichier local à partir du GeoJSON public (URL ou chemin local).
+    Lancé une fois sur un poste ayant accès au réseau, ou au premier affichage d'une carte.
+    """
+    if source.startswith(("http://", "https://")):
+        import requests
+        response = requests.get(source, timeout=timeout)
+        response.raise_for_status()
+        geojson = response.json()
+    else:
+        with open(source, encoding='utf-8') as f:
+            geojson = json.load(f)
+
+    simplified = simplify_geojson(geojson, tolerance=tolerance, precision=precision)
+
+    # Écriture atomique : un autre worker ne lit jamais un fichier incomplet
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(simplified, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, output_path)
+
+    print(f"GeoJSON simplifié écrit dans {output_path} "
+          f"({os.path.getsize(output_path) / 1024:.0f} Ko, {len(simplified['features'])} départements)")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prépare le GeoJSON simplifié des départements")
+    parser.add_argument("--source", default=GEOJSON_SOURCE_URL, help="URL ou chemin du GeoJSON source")
+    parser.add_argument("--output", default=DEFAULT_GEOJSON_PATH, help="Fichier de sortie")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Tolérance en degrés")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION, help="Décimales conservées")
+    args = parser.parse_args()
+    build_geojson_store(args.source, args.output, args.tolerance, args.precision)
@@ -1,3 +1,69 @@
+from functools import lru_cache
+
+@lru_cache(maxsize=128)
+def _department_map_figure(department_code, data_version):
+    """
+    Construit (une seule fois par code département et version des données)
+    la figure de la carte avec le département mis en évidence
+    
+    Returns:
+        dict de la figure, partagé entre les appels : ne pas le modifier
+    """
+    geo_store = DepartementGeoStore.get_instance()
+    
+    # Création d'un DataFrame pour colorer un seul département
+    departements_df = pd.DataFrame({
+        "code": geo_store.codes,
+        "value": [1 if code == department_code else 0 for code in geo_store.codes]
+    })
+    
+    # Nom du département sélectionné
+    selected_dept_name = geo_store.get_name(department_code) or "Département"
+    
+    # Créer la carte avec Plotly Express
+    fig = px.choropleth(
+        departements_df,
+        geojson=geo_store.geojson,
+        locations="code",
+        featureidkey="properties.code",
+        color="value",
+        color_continuous_scale=[[0, "#003399"], [1, "#e2001a"]], # Bleu foncé et rouge SFR
+        range_color=(0, 1),
+        scope="europe"
+    )
+    
+    # Configurer l'apparence
+    fig.update_geos(
+        fitbounds="locations", 
+        visible=False
+    )
+    
+    # Augmenter la taille de la carte
+    fig.update_layout(
+        title=f"{selected_dept_name} ({department_code})",
+        title_font_size=16,
+        margin={"r": 5, "t": 40, "l": 5, "b": 5},
+        coloraxis_showscale=False,
+        height=550,  # Augmentation de la hauteur
+        width=500    # Augmentation de la largeur
+    )
+    
+    # Ajouter des bordures blanches pour bien délimiter les départements
+    fig.update_traces(
+        marker_line_color='white',
+        marker_line_width=1
+    )
+    
+    return finalize_figure(fig, f"carte {department_code}").to_dict()
+
+def create_geometries_unavailable_message():
+    """Message affiché à la place d'une carte lorsque les géométries n'ont pas été préparées"""
+    return html.Div([
+        html.P("Carte indisponible : les géométries des départements n'ont pas été préparées "
+               "(data/geo/departements-simplifies.geojson, à générer avec 'python -m utils.geo_loader').",
+               style=NO_DATA_STYLE)
+    ])
+
 def create_france_map_with_department(department_code):
     """
     Crée une carte de la France avec le département sélectionné mis en évidence
@@ -10,89 +76,25 @@ def create_france_map_with_department(department_code):
         ])
     
     try:
-        import requests
-        # URL vers un GeoJSON des départements français
-        geojson_url = "https://france-geojson.gregoiredavid.fr/repo/departements.geojson"
-        
-        # Charger les données géoJSON
-        response = requests.get(geojson_url)
-        if response.status_code != 200:
-            return html.Div([
-                html.P(f"Aucune graphe disponible pour la carte du département {department_code}. Erreur de chargement des données géographiques.", 
-                       style=NO_DATA_STYLE)
-            ])
-            
-        departements_geojson = response.json()
+        # Géométries locales simplifiées, chargées une seule fois et indexées par code
+        geo_store = DepartementGeoStore.get_instance()
+        department_code = geo_store.normalize_code(department_code)
+        if not geo_store.available:
+            return create_geometries_unavailable_message()
         
         # Vérifier si le département existe dans les données GeoJSON
-        department_exists = False
-        for feature in departements_geojson["features"]:
-            if feature["properties"]["code"] == department_code:
-                department_exists = True
-                break
-                
-        if not department_exists:
+        if geo_store.get_feature(department_code) is None:
             return html.Div([
                 html.P(f"Aucune graphe disponible pour la carte. Le département {department_code} n'existe pas dans les données géographiques.", 
                        style=NO_DATA_STYLE)
             ])
         
-        # Création d'un DataFrame pour colorer un seul département
-        departements_df = pd.DataFrame({
-            "code": [f["properties"]["code"] for f in departements_geojson["features"]],
-            "value": [1 if f["properties"]["code"] == department_code else 0 for f in departements_geojson["features"]]
-        })
-        
-        # Trouver le nom du département sélectionné
-        selected_dept_name = "Département"
-        for feature in departements_geojson["features"]:
-            if feature["properties"]["code"] == department_code:
-                selected_dept_name = feature["properties"]["nom"]
-                break
-        
-        # Créer la carte avec Plotly Express
-        fig = px.choropleth(
-            departements_df,
-            geojson=departements_geojson,
-            locations="code",
-            featureidkey="properties.code",
-            color="value",
-            color_continuous_scale=[[0, "#003399"], [1, "#e2001a"]], # Bleu foncé et rouge SFR
-            range_color=(0, 1),
-            scope="europe"
-        )
-        
-        # Configurer l'apparence
-        fig.update_geos(
-            fitbounds="locations", 
-            visible=False
-        )
-        
-        # Augmenter la taille de la carte
-        fig.update_layout(
-            title=f"{selected_dept_name} ({department_code})",
-            title_font_size=16,
-            margin={"r": 5, "t": 40, "l": 5, "b": 5},
-            coloraxis_showscale=False,
-            height=550,  # Augmentation de la hauteur
-            width=500    # Augmentation de la largeur
-        )
-        
-        # Ajouter des bordures blanches pour bien délimiter les départements
-        fig.update_traces(
-            marker_line_color='white',
-            marker_line_width=1
-        )
+        # Figure mémorisée par code département et version des données
+        figure = _department_map_figure(department_code, DataManager.get_instance().data_version)
         
         return dcc.Graph(
-            figure=fig,
-            style={
-                'border': '1px solid #ddd', 
-                'borderRadius': '5px', 
-                'boxShadow': '0 2px 6px rgba(0,0,0,0.1)',
-                'marginTop': '10px',
-                'marginBottom': '15px'
-            },
+            figure=figure,
+            style=MAP_GRAPH_STYLE,
             config={'displayModeBar': False}
         )
     except Exception as e:
@@ -102,44 +104,108 @@ def create_france_map_with_department(department_code):
                    style=NO_DATA_STYLE)
         ])
 
-def create_temporal_stats_graphs(filtered_df):
+@lru_cache(maxsize=16)
+def _national_map_figure(metric, contamination, version_key):
     """
-    Crée des graphiques statistiques liés aux aspects temporels
+    Construit (une seule fois par indicateur, contamination et version des données)
+    la carte de France colorée par un indicateur agrégé par département
+    
+    Returns:
+        dict de la figure, partagé entre les appels : ne pas le modifier
     """
-    # Vérifier si le DataFrame est vide
-    if filtered_df.empty:
-        return [html.Div(
-            "Aucune graphe disponible pour les statistiques temporelles. Aucune donnée disponible.",
-            style=NO_DATA_STYLE
-        )]
+    geo_store = DepartementGeoStore.get_instance()
+    metric_config = NATIONAL_MAP_METRICS[metric]
+    column = metric_config['column']
     
-    graphs = []
+    # Tous les départements sont tracés, y compris ceux sans données
+    metrics = DepartementMetricsStore.get_instance().get_metrics(contamination)
+    values = metrics.drop_duplicates('code').set_index('code')[column].reindex(geo_store.codes)
+    if metric != 'dns':
+        values = values.fillna(0)
     
-    # Section titre pour les graphiques temporels
-    graphs.append(html.Div("Statistiques temporelles", style=SECTION_TITLE_STYLE))
+    map_df = pd.DataFrame({
+        "code": geo_store.codes,
+        "nom": [geo_store.get_name(code) for code in geo_store.codes],
+        "value": values.to_numpy()
+    })
+    
+    fig = px.choropleth(
+        map_df,
+        geojson=geo_store.geojson,
+        locations="code",
+        featureidkey="properties.code",
+        color="value",
+        hover_name="nom",
+        hover_data={"code": True, "value": f":{metric_config['format']}"},
+        labels={"value": metric_config['label'], "code": "Code"},
+        color_continuous_scale=[[0, "#f5f5f5"], [1, "#e2001a"]],
+        scope="europe"
+    )
+    
+    fig.update_geos(
+        fitbounds="geojson", 
+        visible=False
+    )
+    
+    fig.update_layout(
+        title=(f"France : {metric_config['label']} (contamination {contamination})" if metric == 'anomalies'
+               else f"France : {metric_config['label']}"),
+        title_font_size=16,
+        margin={"r": 5, "t": 40, "l": 5, "b": 5},
+        coloraxis_colorbar=dict(title=""),
+        height=600,
+        width=600
+    )
     
-    temporal_graphs_created = False
+    fig.update_traces(
+        marker_line_color='white',
+        marker_line_width=0.5
+    )
+    
+    return finalize_figure(fig, f"carte nationale {metric}").to_dict()
+
+def create_france_metric_figure(metric, contamination=None):
+    """
+    Retourne la figure de la carte nationale pour un indicateur
+    ('observations', 'dns' ou 'anomalies'), mémorisée par version des données.
+    Seul le nombre d'anomalies dépend du niveau de contamination (None : niveau par défaut).
+    """
+    if metric != 'anomalies' or contamination is None:
+        contamination = DEFAULT_CONTAMINATION
+    version_key = DepartementMetricsStore.get_instance().version_key(contamination)
+    return _national_map_figure(metric, contamination, version_key)
+
+def _temporal_days_section(filtered_df):
+    """
+    Graphique du nombre d'observations par jour de la semaine
+    
+    Returns:
+        Tuple (composants, True si un graphique a été créé)
+    """
+    graphs = []
+    created = False
     
-    # Graphique pour jour de la semaine
     if 'day_of_week' in filtered_df.columns and not filtered_df['day_of_week'].isna().all():
         day_mapping = {0: 'Lundi', 1: 'Mardi', 2: 'Mercredi', 3: 'Jeudi', 
                       4: 'Vendredi', 5: 'Samedi', 6: 'Dimanche'}
-        filtered_df_copy = filtered_df.copy()
+        
+        # Comptage sur les codes bruts, libellés appliqués aux seules lignes du résultat
+        raw_day_counts = filtered_df['day_of_week'].value_counts()
         
         # Vérifier si les valeurs dans day_of_week sont mappables
-        valid_days = [day for day in filtered_df['day_of_week'].dropna().unique() if day in day_mapping]
+        valid_days = [day for day in raw_day_counts.index if day in day_mapping]
         
         if valid_days:
-            filtered_df_copy['Jour'] = filtered_df_copy['day_of_week'].map(day_mapping)
+            day_labels = map_count_labels(raw_day_counts, day_mapping)
             
             # Vérifier si aucune donnée n'a pu être mappée
-            if filtered_df_copy['Jour'].isna().all():
+            if day_labels.empty:
                 graphs.append(html.Div(
                     "Aucune graphe disponible pour la répartition par jour de la semaine. Aucune donnée après mappage.",
                     style=NO_DATA_STYLE
                 ))
             else:
-                day_counts = filtered_df_copy['Jour'].value_counts().reset_index()
+                day_counts = day_labels.reset_index()
                 day_counts.columns = ['Jour', 'Nombre d\'observations']
                 
                 # Réordonner les jours correctement
@@ -158,10 +224,7 @@ def create_temporal_stats_graphs(filtered_df):
                 
                 fig_days.update_layout(
                     height=400, 
-                    margin={"r": 20, "t": 40, "l": 50, "b": 40},
-                    font=GRAPH_FONT,
-                    title_font=GRAPH_TITLE_FONT,
-                    plot_bgcolor='white'
+                    margin={"r": 20, "t": 40, "l": 50, "b": 40}
                 )
                 
                 # Ajouter les valeurs sur les barres
@@ -172,7 +235,7 @@ def create_temporal_stats_graphs(filtered_df):
                 )
                 
                 graphs.append(html.Div([
-                    dcc.Graph(figure=fig_days, config={'displayModeBar': False})
+                    dcc.Graph(figure=finalize_figure(fig_days), config={'displayModeBar': False})
                 ], style={
                     'marginBottom': '20px', 
                     'border': '1px solid #ddd', 
@@ -182,7 +245,7 @@ def create_temporal_stats_graphs(filtered_df):
                     'boxShadow': '0 2px 5px rgba(0,0,0,0.05)',
                     'width': '100%'
                 }))
-                temporal_graphs_created = True
+                created = True
         else:
             graphs.append(html.Div(
                 "Aucune graphe disponible pour la répartition par jour de la semaine. Données incompatibles.",
@@ -194,7 +257,18 @@ def create_temporal_stats_graphs(filtered_df):
             style=NO_DATA_STYLE
         ))
     
-    # Graphique pour heure
+    return graphs, created
+
+def _temporal_hours_section(filtered_df):
+    """
+    Graphique du nombre d'observations par heure
+    
+    Returns:
+        Tuple (composants, True si un graphique a été créé)
+    """
+    graphs = []
+    created = False
+    
     if 'heure' in filtered_df.columns and not filtered_df['heure'].isna().all():
         # Vérifier si les heures sont des valeurs numériques valides
         try:
@@ -222,9 +296,6 @@ def create_temporal_stats_graphs(filtered_df):
                 fig_hours.update_layout(
                     height=400,
                     margin={"r": 20, "t": 40, "l": 50, "b": 40},
-                    font=GRAPH_FONT,
-                    title_font=GRAPH_TITLE_FONT,
-                    plot_bgcolor='white',
                     xaxis=dict(
                         tickmode='linear', 
                         tick0=0, 
@@ -244,7 +315,7 @@ def create_temporal_stats_graphs(filtered_df):
                 )
                 
                 graphs.append(html.Div([
-                    dcc.Graph(figure=fig_hours, config={'displayModeBar': False})
+                    dcc.Graph(figure=finalize_figure(fig_hours), config={'displayModeBar': False})
                 ], style={
                     'marginBottom': '20px', 
                     'border': '1px solid #ddd', 
@@ -254,7 +325,7 @@ def create_temporal_stats_graphs(filtered_df):
                     'boxShadow': '0 2px 5px rgba(0,0,0,0.05)',
                     'width': '100%'
                 }))
-                temporal_graphs_created = True
+                created = True
         except Exception as e:
             print(f"Erreur lors de la création du graphique par heure: {e}")
             graphs.append(html.Div(
@@ -267,22 +338,92 @@ def create_temporal_stats_graphs(filtered_df):
             style=NO_DATA_STYLE
         ))
     
+    return graphs, created
+
+def _temporal_binary_chart(filtered_df, col):
+    """
+    Graphique circulaire d'une variable temporelle binaire
+    """
+    options = TEMPORAL_BINARY_COLUMNS[col]
+    if not filtered_df[col].isna().all():
+        return create_pie_chart(filtered_df[col].value_counts(), col, options['mapping'], options['title'])
+    return html.Div(
+        f"Aucune graphe disponible pour {options['title']}. Données manquantes.",
+        style=NO_DATA_STYLE
+    )
+
+def list_temporal_sections(filtered_df):
+    """
+    Liste les sections des statistiques temporelles disponibles, sans construire
+    de graphique (affichage immédiat des en-têtes)
+    
+    Returns:
+        Liste de tuples (clé de section, titre)
+    """
+    if filtered_df.empty:
+        return []
+    
+    sections = []
+    if 'day_of_week' in filtered_df.columns:
+        sections.append(('days', "Nombre d'observations par jour de la semaine"))
+    if 'heure' in filtered_df.columns:
+        sections.append(('hours', "Nombre d'observations par heure"))
+    for col, options in TEMPORAL_BINARY_COLUMNS.items():
+        if col in filtered_df.columns:
+            sections.append((f'binary:{col}', options['title']))
+    return sections
+
+def create_temporal_section(filtered_df, section):
+    """
+    Construit les graphiques d'une seule section des statistiques temporelles
+    
+    Args:
+        filtered_df: Données filtrées
+        section: Clé de section (voir list_temporal_sections)
+    """
+    graphs = []
+    if section == 'days':
+        graphs, _ = _temporal_days_section(filtered_df)
+    elif section == 'hours':
+        graphs, _ = _temporal_hours_section(filtered_df)
+    elif section.startswith('binary:'):
+        col = section.split(':', 1)[1]
+        if col in TEMPORAL_BINARY_COLUMNS and col in filtered_df.columns:
+            graphs = [_temporal_binary_chart(filtered_df, col)]
+    
+    if not graphs:
+        graphs.append(html.Div(
+            "Aucune graphe disponible pour cette section. Aucune donnée disponible.",
+            style=NO_DATA_STYLE
+        ))
+    return graphs
+
+def create_temporal_stats_graphs(filtered_df):
+    """
+    Crée des graphiques statistiques liés aux aspects temporels
+    """
+    # Vérifier si le DataFrame est vide
+    if filtered_df.empty:
+        return [html.Div(
+            "Aucune graphe disponible pour les statistiques temporelles. Aucune donnée disponible.",
+            style=NO_DATA_STYLE
+        )]
+    
+    graphs = []
+    
+    # Section titre pour les graphiques temporels
+    graphs.append(html.Div("Statistiques temporelles", style=SECTION_TITLE_STYLE))
+    
+    # Graphiques par jour de la semaine et par heure
+    day_graphs, days_created = _temporal_days_section(filtered_df)
+    hour_graphs, hours_created = _temporal_hours_section(filtered_df)
+    graphs.extend(day_graphs)
+    graphs.extend(hour_graphs)
+    temporal_graphs_created = days_created or hours_created
+    
     # Section titre pour les variables binaires
     binary_vars_available = False
-    temp_binary_columns = {
-        'is_weekend': {'title': "Répartition Week-end vs Semaine", 
-                       'mapping': {1: 'Week-end', 0: 'Semaine'}},
-        'is_peak_hour': {'title': "Répartition par type d'heure", 
-                         'mapping': {1: 'Heure de pointe', 0: 'Heure normale'}},
-        'is_holiday': {'title': "Répartition par type de jour", 
-                        'mapping': {1: 'Jour férié', 0: 'Jour normal'}},
-        'is_working_hour': {'title': "Répartition par heure ouvrée/non ouvrée", 
-                           'mapping': {1: 'Heure ouvrée', 0: 'Heure non ouvrée'}},
-        'is_night_hour': {'title': "Répartition par heure de nuit/jour", 
-                          'mapping': {1: 'Heure de nuit', 0: 'Heure de jour'}}
-    }
-    
-    for col in temp_binary_columns.keys():
+    for col in TEMPORAL_BINARY_COLUMNS.keys():
         if col in filtered_df.columns and not filtered_df[col].isna().all():
             binary_vars_available = True
             break
@@ -291,16 +432,10 @@ def create_temporal_stats_graphs(filtered_df):
         graphs.append(html.Div("Répartition par variables temporelles binaires", style=SUBSECTION_TITLE_STYLE))
         
         # Organiser les graphiques circulaires en grille de 2 colonnes
-        pie_charts = []
-        for col, options in temp_binary_columns.items():
-            if col in filtered_df.columns and not filtered_df[col].isna().all():
-                pie_charts.append(create_pie_chart(
-                    filtered_df, col, options['mapping'], options['title']))
-            elif col in filtered_df.columns:
-                pie_charts.append(html.Div(
-                    f"Aucune graphe disponible pour {options['title']}. Données manquantes.",
-                    style=NO_DATA_STYLE
-                ))
+        pie_charts = [
+            _temporal_binary_chart(filtered_df, col)
+            for col in TEMPORAL_BINARY_COLUMNS if col in filtered_df.columns
+        ]
         
         # Regrouper les graphiques circulaires par paires
         for i in range(0, len(pie_charts), 2):
@@ -327,9 +462,19 @@ def create_temporal_stats_graphs(filtered_df):
 from dash import html, dcc
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
+import uuid
 from styles.theme import sfr_colors
 import dash_bootstrap_components as dbc
+from utils.downsampling import downsample_frame
+from utils.geo_loader import DepartementGeoStore
+from utils.figure_payload import finalize_figure
+from utils.map_metrics import DepartementMetricsStore, NATIONAL_MAP_METRICS
+from utils.anomaly_files import DEFAULT_CONTAMINATION
+from utils.data_loader import DataManager
+from utils.topology_index import TopologyIndex, STRUCTURE_HIERARCHY
 
 # Styles uniformisés pour les éléments de graphiques
 SECTION_TITLE_STYLE = {
@@ -356,18 +501,6 @@ DETAIL_TITLE_STYLE = {
     'fontSize': '14px'
 }
 
-GRAPH_TITLE_FONT = dict(
-    size=15,
-    color='#000000',  # Noir pour les titres de graphiques
-    family='Arial, sans-serif'
-)
-
-GRAPH_FONT = dict(
-    size=13,
-    color='#000000',
-    family='Arial, sans-serif'
-)
-
 # Style pour les messages d'absence de données
 NO_DATA_STYLE = {
     'padding': '20px',
@@ -381,23 +514,166 @@ NO_DATA_STYLE = {
     'width': '100%'
 }
 
-def create_bar_chart(df, column, title_prefix, limit=20):
+# Style des cartes de France
+MAP_GRAPH_STYLE = {
+    'border': '1px solid #ddd', 
+    'borderRadius': '5px', 
+    'boxShadow': '0 2px 6px rgba(0,0,0,0.1)',
+    'marginTop': '10px',
+    'marginBottom': '15px'
+}
+
+# Variables temporelles binaires représentées en graphiques circulaires
+TEMPORAL_BINARY_COLUMNS = {
+    'is_weekend': {'title': "Répartition Week-end vs Semaine", 
+                   'mapping': {1: 'Week-end', 0: 'Semaine'}},
+    'is_peak_hour': {'title': "Répartition par type d'heure", 
+                     'mapping': {1: 'Heure de pointe', 0: 'Heure normale'}},
+    'is_holiday': {'title': "Répartition par type de jour", 
+                   'mapping': {1: 'Jour férié', 0: 'Jour normal'}},
+    'is_working_hour': {'title': "Répartition par heure ouvrée/non ouvrée", 
+                        'mapping': {1: 'Heure ouvrée', 0: 'Heure non ouvrée'}},
+    'is_night_hour': {'title': "Répartition par heure de nuit/jour", 
+                      'mapping': {1: 'Heure de nuit', 0: 'Heure de jour'}}
+}
+
+# Date de référence (un dimanche) pour placer jour de la semaine et heure sur un axe temporel
+WEEKLY_BASE_DATE = pd.Timestamp('2023-01-01')
+
+def build_weekly_datetime(jours, heures, base_date=WEEKLY_BASE_DATE):
+    """
+    Construit l'axe temporel d'un agrégat jour de la semaine / heure
+    par arithmétique vectorielle sur les entiers (sans parcours ligne à ligne)
+
+    Args:
+        jours: Série des jours de la semaine (0 = dimanche de la date de référence)
+        heures: Série des heures (0-23)
+        base_date: Date de référence
+
+    Returns:
+        pd.Series de type datetime64 alignée sur l'index de jours
+        (NaT lorsque le jour ou l'heure est manquant ou non numérique)
+    """
+    jours = pd.Series(jours)
+    # Calcul en heures flottantes : les valeurs manquantes restent NaN puis NaT
+    jours_values = pd.to_numeric(jours, errors='coerce').to_numpy(dtype='float64')
+    heures_values = pd.to_numeric(pd.Series(heures), errors='coerce').to_numpy(dtype='float64')
+    offsets = pd.to_timedelta(jours_values * 24 + heures_values, unit='h')
+    return pd.Series(base_date + offsets, index=jours.index)
+
+def build_combination_labels(df, columns, sep="-"):
+    """
+    Construit un libellé par ligne en concaténant les valeurs de plusieurs colonnes.
+    La conversion en texte n'est faite qu'une fois par combinaison distincte,
+    puis les libellés sont répartis sur les lignes via les codes de groupe.
+
+    Args:
+        df: DataFrame source
+        columns: Colonnes à concaténer, dans l'ordre
+        sep: Séparateur entre les valeurs
+
+    Returns:
+        pd.Series de libellés alignée sur l'index de df
+    """
+    columns = list(columns)
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+
+    keys = df[columns]
+    codes = keys.groupby(columns, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+    # drop_duplicates conserve l'ordre de première apparition, comme ngroup(sort=False)
+    uniques = keys.drop_duplicates()
+    labels = uniques[columns[0]].astype(str)
+    for column in columns[1:]:
+        labels = labels + sep + uniques[column].astype(str)
+
+    return pd.Series(labels.to_numpy(dtype=object)[codes], index=df.index)
+
+def create_histogram_figure(values, nbins=20, title=None, x_label=None, color="#e2001a"):
+    """
+    Crée un histogramme dont les classes sont calculées côté serveur :
+    seuls les bornes et effectifs des classes sont envoyés au navigateur,
+    quelle que soit la taille des données
+    
+    Args:
+        values: Série numérique (les valeurs manquantes sont ignorées)
+        nbins: Nombre de classes
+        title: Titre du graphique
+        x_label: Libellé de l'axe X
+        color: Couleur des barres
+    
+    Returns:
+        go.Figure avec une trace de barres
+    """
+    array = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64')
+    array = array[np.isfinite(array)]
+    
+    counts, edges = np.histogram(array, bins=nbins)
+    starts, ends = edges[:-1], edges[1:]
+    
+    fig = go.Figure(go.Bar(
+        x=(starts + ends) / 2,
+        y=counts.astype('float64'),
+        width=ends - starts,
+        customdata=np.column_stack([starts, ends]),
+        hovertemplate="[%{customdata[0]:.4~g} ; %{customdata[1]:.4~g}[<br>Nombre d'observations : %{y:,.0f}<extra></extra>",
+        marker_color=color
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title="Nombre d'observations",
+        bargap=0
+    )
+    
+    return fig
+
+def map_count_labels(counts, mapping):
+    """
+    Applique des libellés aux valeurs d'un comptage (résultat de value_counts)
+    sans toucher aux lignes sources ; les valeurs sans libellé sont ignorées
+    et les valeurs partageant un libellé sont additionnées
+    
+    Args:
+        counts: Série des effectifs indexée par les codes bruts
+        mapping: Dictionnaire {code: libellé}
+    
+    Returns:
+        Série des effectifs indexée par libellé, triée par effectif décroissant
+    """
+    labels = counts.index.map(mapping)
+    labelled = counts[labels.notna()]
+    if labelled.empty:
+        return labelled
+    return (
+        labelled.groupby(labels[labels.notna()], sort=False).sum()
+        .sort_values(ascending=False, kind='stable')
+    )
+
+def create_bar_chart(counts, column, title_prefix, limit=20):
     """
     Crée un graphique à barres horizontal qui utilise presque toute la largeur du chat
     Version améliorée avec meilleure visibilité des nombres
+    
+    Args:
+        counts: Effectifs précalculés (value_counts de la colonne) indexés par valeur
+        column: Nom de la colonne comptée (pour les libellés)
+        title_prefix: Début du titre du graphique
+        limit: Nombre maximal de valeurs affichées
     """
     from dash import html, dcc
     import plotly.express as px
     
-    # Vérifier si le DataFrame est vide ou si la colonne ne contient que des valeurs NaN
-    if df.empty or df[column].isna().all() or len(df[column].dropna().unique()) == 0:
+    # Vérifier si le comptage est vide (aucune valeur renseignée)
+    if counts is None or counts.empty:
         readable_column = column.replace('_', ' ').title()
         return html.Div(
             f"Aucune graphe disponible pour {title_prefix} par {readable_column}.",
             style=NO_DATA_STYLE
         )
     
-    counts = df[column].value_counts().reset_index()
+    counts = counts.sort_values(ascending=False, kind='stable').reset_index()
     readable_column = column.replace('_', ' ').title()
     counts.columns = [readable_column, 'Nombre d\'observations']
     
@@ -434,9 +710,6 @@ def create_bar_chart(df, column, title_prefix, limit=20):
         margin={"r": 120, "t": 40, "l": 150, "b": 40},  # Augmentation significative de la marge droite
         xaxis_title="Nombre d'observations",
         yaxis_title=None,
-        font=GRAPH_FONT,
-        title_font=GRAPH_TITLE_FONT,
-        plot_bgcolor='white',
         width=900,  # Largeur fixe du graphique
         xaxis=dict(
             range=[0, max_val * 1.20]  # Ajouter 20% d'espace à droite
@@ -455,7 +728,7 @@ def create_bar_chart(df, column, title_prefix, limit=20):
     # Container amélioré avec largeur complète
     return html.Div([
         dcc.Graph(
-            figure=fig, 
+            figure=finalize_figure(fig), 
             config={'displayModeBar': False, 'responsive': True},
             style={'width': '100%'}  # Utiliser toute la largeur disponible
         )
@@ -469,6 +742,309 @@ def create_bar_chart(df, column, title_prefix, limit=20):
         'width': '100%'  # Conteneur utilisant toute la largeur
     })
 
+def _structure_applied_columns(current_filters):
+    """
+    Colonnes de la hiérarchie déjà filtrées (exclues des distributions et croisements)
+    """
+    structure_columns = dict(STRUCTURE_HIERARCHY)
+    applied_columns = []
+    for filter_name in current_filters.keys():
+        if filter_name in structure_columns:
+            applied_columns.append(structure_columns[filter_name])
+        elif filter_name in structure_columns.values():
+            applied_columns.append(filter_name)
+    return applied_columns
+
+def _structure_distribution_columns(filtered_df, applied_columns):
+    """
+    Colonnes non filtrées pour lesquelles une distribution simple est affichée
+    """
+    return [col for label, col in STRUCTURE_HIERARCHY 
+            if col not in applied_columns and col in filtered_df.columns]
+
+def _structure_pairs(filtered_df, applied_columns):
+    """
+    Paires de niveaux adjacents de la hiérarchie à croiser
+    
+    Returns:
+        Liste de tuples ((libellé, colonne), (libellé, colonne))
+    """
+    # Ne prendre que les colonnes non filtrées et disponibles dans le DataFrame
+    available_hierarchy = [(label, col) for label, col in STRUCTURE_HIERARCHY 
+                          if col not in applied_columns and col in filtered_df.columns 
+                          and not filtered_df[col].isna().all()]
+    return list(zip(available_hierarchy, available_hierarchy[1:]))
+
+def create_structure_filter_summary(filtered_df, current_filters):
+    """
+    Résumé des filtres de structure appliqués (None si aucun)
+    """
+    applied_filters_text = []
+    for col in _structure_applied_columns(current_filters):
+        readable_col = col.replace('_', ' ').title()
+        if col in filtered_df.columns:
+            unique_values = filtered_df[col].unique()
+            if len(unique_values) == 1:
+                value_str = str(unique_values[0])
+                applied_filters_text.append(f"{readable_col}: {value_str}")
+            else:
+                applied_filters_text.append(f"{readable_col}: {len(unique_values)} valeurs")
+    
+    if not applied_filters_text:
+        return None
+    
+    return html.Div([
+        html.Div("Filtres de structure appliqués:", 
+               style={'marginBottom': '8px', 'fontWeight': 'bold', 'fontSize': '14px', 'color': '#000000'}),
+        html.Ul([
+            html.Li(text) for text in applied_filters_text
+        ], style={'paddingLeft': '20px'})
+    ], style={'backgroundColor': '#f5f5f5', 'padding': '15px', 'borderRadius': '5px', 'marginBottom': '20px'})
+
+def _structure_distribution_chart(filtered_df, path_counts, column):
+    """
+    Distribution du nombre d'observations d'un niveau (None si la colonne est vide)
+    """
+    if filtered_df[column].isna().all() or len(filtered_df[column].dropna().unique()) == 0:
+        return None
+    return create_bar_chart(TopologyIndex.rollup(path_counts, [column]), column, "Nombre d'observations")
+
+def _structure_pair_section(filtered_df, path_counts, current, following):
+    """
+    Top 10 des paires de deux niveaux adjacents : graphique et tableau de détail
+    
+    Args:
+        filtered_df: Données filtrées
+        path_counts: Table des chemins de la hiérarchie sous les filtres courants
+        current: Tuple (libellé, colonne) du niveau supérieur
+        following: Tuple (libellé, colonne) du niveau inférieur
+        
+    Returns:
+        Tuple (composants, True si un graphique a été créé)
+    """
+    current_label, current_col = current
+    next_label, next_col = following
+    graphs = []
+    created = False
+    
+    try:
+        # Vérifier si les deux colonnes ont des données non-null
+        if filtered_df[current_col].isna().all() or filtered_df[next_col].isna().all():
+            graphs.append(html.Div(
+                f"Aucune graphe disponible pour le croisement {current_label} - {next_label}. Données manquantes.",
+                style=NO_DATA_STYLE
+            ))
+            return graphs, False
+        
+        # Calculer le nombre d'observations pour chaque paire (current_col, next_col)
+        pair_counts = TopologyIndex.rollup(path_counts, [current_col, next_col], sort=True).reset_index(name='count')
+        
+        # Vérifier si pair_counts est vide
+        if pair_counts.empty:
+            graphs.append(html.Div(
+                f"Aucune graphe disponible pour le croisement {current_label} - {next_label}. Aucune donnée après regroupement.",
+                style=NO_DATA_STYLE
+            ))
+            return graphs, False
+        
+        # Trier par nombre d'observations décroissant et prendre les 10 premières
+        top_pairs = pair_counts.sort_values('count', ascending=False).head(10)
+        
+        if len(top_pairs) > 0:
+            created = True
+            
+            # Créer des labels pour les paires
+            top_pairs['pair_label'] = build_combination_labels(top_pairs, [current_col, next_col], sep=" - ")
+            
+            # Couleur pour barres horizontales
+            color_scale = [[0, "#003399"], [1, "#e2001a"]]
+            
+            # Créer un graphique à barres horizontales avec largeur optimisée
+            fig = px.bar(
+                top_pairs,
+                y='pair_label',
+                x='count',
+                orientation='h',
+                title=f"Top 10 des paires avec le plus d'observations",
+                labels={
+                    'pair_label': f"{current_label} - {next_label}",
+                    'count': "Nombre d'observations"
+                },
+                color='count',
+                color_continuous_scale=color_scale,
+                height=max(400, len(top_pairs) * 40)  # Hauteur adaptative
+            )
+            
+            # Configurer la mise en page avec marges élargies pour les longues barres
+            fig.update_layout(
+                margin={"r": 100, "t": 60, "l": 20, "b": 40},  # Augmentation de la marge droite (100px au lieu de 20px)
+                xaxis_title="Nombre d'observations",
+                yaxis_title=None,
+                width=900  # Largeur fixe plus grande (900px) pour tout le graphique
+            )
+            
+            # Ajouter les valeurs sur les barres avec positionnement amélioré
+            max_value = top_pairs['count'].max()  # Valeur maximale pour ajuster le positionnement
+            
+            # Si certaines barres sont très longues, ajuster le positionnement du texte
+            if max_value > 5000:  # Seuil pour les barres longues
+                fig.update_traces(
+                    texttemplate='<b>%{x}</b>',
+                    textposition='outside',
+                    textfont=dict(size=13, color='black'),
+                    cliponaxis=False,  # Empêcher que le texte soit coupé
+                    hovertemplate='%{y}: %{x} observations<extra></extra>'
+                )
+            else:
+                fig.update_traces(
+                    texttemplate='<b>%{x}</b>',
+                    textposition='outside',
+                    textfont=dict(size=13, color='black'),
+                    hovertemplate='%{y}: %{x} observations<extra></extra>'
+                )
+            
+            # Ajouter une grille horizontale pour faciliter la lecture
+            fig.update_yaxes(
+                showgrid=True,
+                gridcolor='rgba(0,0,0,0.05)'
+            )
+            
+            # Étendre l'axe X pour donner plus d'espace pour les valeurs
+            fig.update_xaxes(
+                range=[0, max_value * 1.15]  # Ajouter 15% à la valeur max
+            )
+            
+            # Ajouter une table avec les détails
+            table_header = [
+                html.Thead(html.Tr([
+                    html.Th(current_label), 
+                    html.Th(next_label), 
+                    html.Th("Nb. Observations")
+                ], style={'backgroundColor': '#f0f0f0'}))
+            ]
+            
+            rows = []
+            for i, row in top_pairs.iterrows():
+                rows.append(html.Tr([
+                    html.Td(str(row[current_col])),
+                    html.Td(str(row[next_col])),
+                    html.Td(str(row['count']), style={'fontWeight': 'bold', 'textAlign': 'right'})
+                ]))
+            
+            table_body = [html.Tbody(rows)]
+            
+            try:
+                # Essayer d'utiliser dbc.Table si disponible
+                import dash_bootstrap_components as dbc
+                table = dbc.Table(
+                    table_header + table_body,
+                    bordered=True,
+                    hover=True,
+                    striped=True,
+                    size="sm",
+                    style={'marginTop': '20px'}
+                )
+            except ImportError:
+                # Sinon utiliser la table HTML standard
+                table = html.Table(
+                    table_header + table_body,
+                    style={
+                        'width': '100%',
+                        'borderCollapse': 'collapse',
+                        'marginTop': '20px'
+                    },
+                    className='table table-striped table-bordered table-hover'
+                )
+            
+            # Ajouter le graphique et la table dans un même conteneur
+            graphs.append(html.Div([
+                dcc.Graph(
+                    figure=finalize_figure(fig),
+                    config={'displayModeBar': False, 'responsive': True},
+                    style={'width': '100%'}  # Assurer que le graphique utilise toute la largeur disponible
+                ),
+                html.Div("Détail des 10 premiers croisements", style=DETAIL_TITLE_STYLE),
+                table
+            ], style={
+                'marginBottom': '30px',
+                'border': '1px solid #ddd',
+                'borderRadius': '8px',
+                'padding': '15px',
+                'backgroundColor': 'white',
+                'boxShadow': '0 2px 5px rgba(0,0,0,0.05)',
+                'width': '100%'  # Utiliser toute la largeur disponible
+            }))
+        else:
+            graphs.append(html.Div(
+                f"Aucune graphe disponible pour le croisement {current_label}-{next_label}. Pas assez de données.",
+                style=NO_DATA_STYLE
+            ))
+    
+    except Exception as e:
+        print(f"Erreur lors de la création du croisement {current_col}-{next_col}: {e}")
+        graphs.append(html.Div(
+            f"Aucune graphe disponible pour le croisement {current_label} et {next_label}. Erreur: {str(e)}",
+            style=NO_DATA_STYLE
+        ))
+    
+    return graphs, created
+
+def list_structure_sections(filtered_df, current_filters):
+    """
+    Liste les sections des statistiques de structure disponibles, sans construire
+    de graphique (affichage immédiat des en-têtes)
+    
+    Returns:
+        Liste de tuples (clé de section, titre)
+    """
+    if filtered_df.empty:
+        return []
+    
+    applied_columns = _structure_applied_columns(current_filters)
+    sections = [
+        (f'distribution:{column}', f"Nombre d'observations par {column.replace('_', ' ').title()}")
+        for column in _structure_distribution_columns(filtered_df, applied_columns)
+    ]
+    sections.extend(
+        (f'pair:{current_col}:{next_col}', f"Top 10 des paires {current_label} - {next_label}")
+        for (current_label, current_col), (next_label, next_col) in _structure_pairs(filtered_df, applied_columns)
+    )
+    return sections
+
+def create_structure_section(filtered_df, current_filters, section):
+    """
+    Construit les graphiques d'une seule section des statistiques de structure
+    
+    Args:
+        filtered_df: Données filtrées
+        current_filters: Filtres courants
+        section: Clé de section (voir list_structure_sections)
+    """
+    path_counts = TopologyIndex.get_instance().path_counts(current_filters, filtered_df=filtered_df)
+    structure_labels = {col: label for label, col in STRUCTURE_HIERARCHY}
+    
+    graphs = []
+    kind, _, columns = section.partition(':')
+    if kind == 'distribution' and columns in filtered_df.columns:
+        chart = _structure_distribution_chart(filtered_df, path_counts, columns)
+        if chart is not None:
+            graphs.append(chart)
+    elif kind == 'pair':
+        current_col, _, next_col = columns.partition(':')
+        if current_col in filtered_df.columns and next_col in filtered_df.columns:
+            graphs, _ = _structure_pair_section(
+                filtered_df, path_counts,
+                (structure_labels.get(current_col, current_col), current_col),
+                (structure_labels.get(next_col, next_col), next_col)
+            )
+    
+    if not graphs:
+        graphs.append(html.Div(
+            "Aucune graphe disponible pour cette section. Aucune donnée disponible.",
+            style=NO_DATA_STYLE
+        ))
+    return graphs
+
 def create_structure_stats_graphs(filtered_df, current_filters):
     """
     Crée des graphiques statistiques liés à la structure technique:
@@ -477,12 +1053,6 @@ def create_structure_stats_graphs(filtered_df, current_filters):
     
     Version améliorée avec graphiques élargis et titres en noir
     """
-    import pandas as pd
-    from dash import html, dcc
-    import plotly.express as px
-    import plotly.graph_objects as go
-    from styles.theme import sfr_colors
-    
     # Vérifier si le DataFrame est vide
     if filtered_df.empty:
         return [html.Div(
@@ -492,55 +1062,20 @@ def create_structure_stats_graphs(filtered_df, current_filters):
     
     graphs = []
     
-    # Liste complète des colonnes de structure dans l'ordre hiérarchique
-    structure_hierarchy = [
-        ('Département', 'code_departement'),
-        ('Boucle', 'boucle'),
-        ('Identifiant de PEAG', 'peag_nro'),
-        ('Identifiant d\'OLT', 'olt_name'),
-        ('PEBIB', 'pebib'),
-        ('POP DNS', 'pop_dns')
-    ]
-    
-    # Dictionnaire pour faciliter la conversion
-    structure_columns = dict(structure_hierarchy)
+    # Nombre d'observations de chaque chemin de la hiérarchie sous les filtres courants :
+    # toutes les distributions et tous les croisements en sont dérivés
+    path_counts = TopologyIndex.get_instance().path_counts(current_filters, filtered_df=filtered_df)
     
-    # Convertir les noms de filtres en noms de colonnes
-    applied_columns = []
-    for filter_name in current_filters.keys():
-        if filter_name in structure_columns:
-            applied_columns.append(structure_columns[filter_name])
-        elif filter_name in structure_columns.values():
-            applied_columns.append(filter_name)
+    applied_columns = _structure_applied_columns(current_filters)
     
     # Afficher un résumé des filtres appliqués
-    if applied_columns:
-        applied_filters_text = []
-        for col in applied_columns:
-            readable_col = col.replace('_', ' ').title()
-            if col in filtered_df.columns:
-                unique_values = filtered_df[col].unique()
-                if len(unique_values) == 1:
-                    value_str = str(unique_values[0])
-                    applied_filters_text.append(f"{readable_col}: {value_str}")
-                else:
-                    applied_filters_text.append(f"{readable_col}: {len(unique_values)} valeurs")
-        
-        if applied_filters_text:
-            filter_summary = html.Div([
-                html.Div("Filtres de structure appliqués:", 
-                       style={'marginBottom': '8px', 'fontWeight': 'bold', 'fontSize': '14px', 'color': '#000000'}),
-                html.Ul([
-                    html.Li(text) for text in applied_filters_text
-                ], style={'paddingLeft': '20px'})
-            ], style={'backgroundColor': '#f5f5f5', 'padding': '15px', 'borderRadius': '5px', 'marginBottom': '20px'})
-            
-            graphs.append(filter_summary)
+    filter_summary = create_structure_filter_summary(filtered_df, current_filters)
+    if filter_summary is not None:
+        graphs.append(filter_summary)
     
     # PARTIE 1: GRAPHIQUES SIMPLES DU NOMBRE D'OBSERVATIONS
     # Créer des graphiques simples de distribution pour les colonnes non filtrées
-    remaining_columns = [col for label, col in structure_hierarchy 
-                         if col not in applied_columns and col in filtered_df.columns]
+    remaining_columns = _structure_distribution_columns(filtered_df, applied_columns)
     
     # Section titre pour les graphiques de distribution
     if remaining_columns:
@@ -548,11 +1083,9 @@ def create_structure_stats_graphs(filtered_df, current_filters):
         
         has_graphs = False
         for column in remaining_columns:
-            # Vérifier si la colonne contient des données valides
-            if not filtered_df[column].isna().all() and len(filtered_df[column].dropna().unique()) > 0:
-                # Graphique de distribution simple
-                title_prefix = "Nombre d'observations"
-                graphs.append(create_bar_chart(filtered_df, column, title_prefix))
+            chart = _structure_distribution_chart(filtered_df, path_counts, column)
+            if chart is not None:
+                graphs.append(chart)
                 has_graphs = True
         
         if not has_graphs:
@@ -562,186 +1095,20 @@ def create_structure_stats_graphs(filtered_df, current_filters):
             ))
     
     # PARTIE 2: GRAPHIQUES DE CROISEMENT OPTIMISÉS
-    # Ne prendre que les colonnes non filtrées et disponibles dans le DataFrame
-    available_hierarchy = [(label, col) for label, col in structure_hierarchy 
-                          if col not in applied_columns and col in filtered_df.columns 
-                          and not filtered_df[col].isna().all()]
-    
     # Créer des croisements entre composants adjacents dans la hiérarchie
-    if len(available_hierarchy) >= 2:
+    pairs = _structure_pairs(filtered_df, applied_columns)
+    if pairs:
         added_croisement_graphs = False
         
-        for i in range(len(available_hierarchy) - 1):
-            current_label, current_col = available_hierarchy[i]
-            next_label, next_col = available_hierarchy[i + 1]
-            
+        for (current_label, current_col), (next_label, next_col) in pairs:
             # Titre de section pour chaque paire (en noir)
             graphs.append(html.Div(f"Top 10 des paires {current_label} - {next_label}", style=SECTION_TITLE_STYLE))
             
-            try:
-                # Vérifier si les deux colonnes ont des données non-null
-                if filtered_df[current_col].isna().all() or filtered_df[next_col].isna().all():
-                    graphs.append(html.Div(
-                        f"Aucune graphe disponible pour le croisement {current_label} - {next_label}. Données manquantes.",
-                        style=NO_DATA_STYLE
-                    ))
-                    continue
-                
-                # Calculer le nombre d'observations pour chaque paire (current_col, next_col)
-                pair_counts = filtered_df.groupby([current_col, next_col]).size().reset_index(name='count')
-                
-                # Vérifier si pair_counts est vide
-                if pair_counts.empty:
-                    graphs.append(html.Div(
-                        f"Aucune graphe disponible pour le croisement {current_label} - {next_label}. Aucune donnée après regroupement.",
-                        style=NO_DATA_STYLE
-                    ))
-                    continue
-                
-                # Trier par nombre d'observations décroissant et prendre les 10 premières
-                top_pairs = pair_counts.sort_values('count', ascending=False).head(10)
-                
-                if len(top_pairs) > 0:
-                    added_croisement_graphs = True
-                    
-                    # Créer des labels pour les paires
-                    top_pairs['pair_label'] = top_pairs.apply(
-                        lambda row: f"{row[current_col]} - {row[next_col]}", axis=1
-                    )
-                    
-                    # Couleur pour barres horizontales
-                    color_scale = [[0, "#003399"], [1, "#e2001a"]]
-                    
-                    # Créer un graphique à barres horizontales avec largeur optimisée
-                    fig = px.bar(
-                        top_pairs,
-                        y='pair_label',
-                        x='count',
-                        orientation='h',
-                        title=f"Top 10 des paires avec le plus d'observations",
-                        labels={
-                            'pair_label': f"{current_label} - {next_label}",
-                            'count': "Nombre d'observations"
-                        },
-                        color='count',
-                        color_continuous_scale=color_scale,
-                        height=max(400, len(top_pairs) * 40)  # Hauteur adaptative
-                    )
-                    
-                    # Configurer la mise en page avec marges élargies pour les longues barres
-                    fig.update_layout(
-                        margin={"r": 100, "t": 60, "l": 20, "b": 40},  # Augmentation de la marge droite (100px au lieu de 20px)
-                        font=GRAPH_FONT,
-                        title_font=GRAPH_TITLE_FONT,
-                        xaxis_title="Nombre d'observations",
-                        yaxis_title=None,
-                        plot_bgcolor='white',
-                        width=900  # Largeur fixe plus grande (900px) pour tout le graphique
-                    )
-                    
-                    # Ajouter les valeurs sur les barres avec positionnement amélioré
-                    max_value = top_pairs['count'].max()  # Valeur maximale pour ajuster le positionnement
-                    
-                    # Si certaines barres sont très longues, ajuster le positionnement du texte
-                    if max_value > 5000:  # Seuil pour les barres longues
-                        fig.update_traces(
-                            texttemplate='<b>%{x}</b>',
-                            textposition='outside',
-                            textfont=dict(size=13, color='black'),
-                            cliponaxis=False,  # Empêcher que le texte soit coupé
-                            hovertemplate='%{y}: %{x} observations<extra></extra>'
-                        )
-                    else:
-                        fig.update_traces(
-                            texttemplate='<b>%{x}</b>',
-                            textposition='outside',
-                            textfont=dict(size=13, color='black'),
-                            hovertemplate='%{y}: %{x} observations<extra></extra>'
-                        )
-                    
-                    # Ajouter une grille horizontale pour faciliter la lecture
-                    fig.update_yaxes(
-                        showgrid=True,
-                        gridcolor='rgba(0,0,0,0.05)'
-                    )
-                    
-                    # Étendre l'axe X pour donner plus d'espace pour les valeurs
-                    fig.update_xaxes(
-                        range=[0, max_value * 1.15]  # Ajouter 15% à la valeur max
-                    )
-                    
-                    # Ajouter une table avec les détails
-                    table_header = [
-                        html.Thead(html.Tr([
-                            html.Th(current_label), 
-                            html.Th(next_label), 
-                            html.Th("Nb. Observations")
-                        ], style={'backgroundColor': '#f0f0f0'}))
-                    ]
-                    
-                    rows = []
-                    for i, row in top_pairs.iterrows():
-                        rows.append(html.Tr([
-                            html.Td(str(row[current_col])),
-                            html.Td(str(row[next_col])),
-                            html.Td(str(row['count']), style={'fontWeight': 'bold', 'textAlign': 'right'})
-                        ]))
-                    
-                    table_body = [html.Tbody(rows)]
-                    
-                    try:
-                        # Essayer d'utiliser dbc.Table si disponible
-                        import dash_bootstrap_components as dbc
-                        table = dbc.Table(
-                            table_header + table_body,
-                            bordered=True,
-                            hover=True,
-                            striped=True,
-                            size="sm",
-                            style={'marginTop': '20px'}
-                        )
-                    except ImportError:
-                        # Sinon utiliser la table HTML standard
-                        table = html.Table(
-                            table_header + table_body,
-                            style={
-                                'width': '100%',
-                                'borderCollapse': 'collapse',
-                                'marginTop': '20px'
-                            },
-                            className='table table-striped table-bordered table-hover'
-                        )
-                    
-                    # Ajouter le graphique et la table dans un même conteneur
-                    graphs.append(html.Div([
-                        dcc.Graph(
-                            figure=fig,
-                            config={'displayModeBar': False, 'responsive': True},
-                            style={'width': '100%'}  # Assurer que le graphique utilise toute la largeur disponible
-                        ),
-                        html.Div("Détail des 10 premiers croisements", style=DETAIL_TITLE_STYLE),
-                        table
-                    ], style={
-                        'marginBottom': '30px',
-                        'border': '1px solid #ddd',
-                        'borderRadius': '8px',
-                        'padding': '15px',
-                        'backgroundColor': 'white',
-                        'boxShadow': '0 2px 5px rgba(0,0,0,0.05)',
-                        'width': '100%'  # Utiliser toute la largeur disponible
-                    }))
-                else:
-                    graphs.append(html.Div(
-                        f"Aucune graphe disponible pour le croisement {current_label}-{next_label}. Pas assez de données.",
-                        style=NO_DATA_STYLE
-                    ))
-            
-            except Exception as e:
-                print(f"Erreur lors de la création du croisement {current_col}-{next_col}: {e}")
-                graphs.append(html.Div(
-                    f"Aucune graphe disponible pour le croisement {current_label} et {next_label}. Erreur: {str(e)}",
-                    style=NO_DATA_STYLE
-                ))
+            pair_graphs, created = _structure_pair_section(
+                filtered_df, path_counts, (current_label, current_col), (next_label, next_col)
+            )
+            graphs.extend(pair_graphs)
+            added_croisement_graphs = added_croisement_graphs or created
         
         if not added_croisement_graphs:
             graphs.append(html.Div(
@@ -758,6 +1125,105 @@ def create_structure_stats_graphs(filtered_df, current_filters):
     
     return graphs
 
+def describe_temporal_stats(filtered_df):
+    """
+    Plan des statistiques temporelles : sections disponibles, sans graphique
+    """
+    return {'summary': None, 'sections': list_temporal_sections(filtered_df)}
+
+def describe_structure_stats(filtered_df, current_filters):
+    """
+    Plan des statistiques de structure : résumé des filtres et sections disponibles, sans graphique
+    """
+    if filtered_df.empty:
+        return {'summary': None, 'sections': []}
+    return {
+        'summary': create_structure_filter_summary(filtered_df, current_filters),
+        'sections': list_structure_sections(filtered_df, current_filters)
+    }
+
+def create_stats_section(view, filtered_df, current_filters, section):
+    """
+    Construit les graphiques d'une section de statistiques chargée à la demande
+    
+    Args:
+        view: Vue statistique ('temporal' ou 'structure')
+        filtered_df: Données filtrées
+        current_filters: Filtres courants
+        section: Clé de la section
+    """
+    if view == 'temporal':
+        return create_temporal_section(filtered_df, section)
+    if view == 'structure':
+        return create_structure_section(filtered_df, current_filters, section)
+    return [html.Div("Aucune graphe disponible pour cette section.", style=NO_DATA_STYLE)]
+
+def create_lazy_section(view, section, title, filter_token, start_open=False):
+    """
+    Crée l'en-tête repliable d'une section de statistiques. Le contenu est vide
+    et n'est construit qu'à l'ouverture de la section (callback load_lazy_stats_section).
+    
+    Args:
+        view: Vue statistique ('temporal' ou 'structure')
+        section: Clé de la section
+        title: Titre affiché dans l'en-tête
+        filter_token: Jeton de la version des filtres à afficher (relue au chargement)
+        start_open: Section ouverte (et donc chargée) dès l'affichage
+    """
+    section_id = str(uuid.uuid4())
+    return html.Div([
+        dcc.Store(
+            id={'type': 'lazy-section-spec', 'index': section_id},
+            data={'view': view, 'section': section, 'filter_token': filter_token}
+        ),
+        dbc.Accordion([
+            dbc.AccordionItem(
+                dcc.Loading(
+                    html.Div(id={'type': 'lazy-section-body', 'index': section_id}),
+                    type="circle",
+                    color=sfr_colors['red']
+                ),
+                title=title,
+                item_id=section
+            )
+        ],
+            id={'type': 'lazy-section', 'index': section_id},
+            active_item=section if start_open else None,
+            start_collapsed=not start_open,
+            flush=True
+        )
+    ], style={'marginBottom': '10px', 'border': '1px solid #ddd', 'borderRadius': '8px', 'overflow': 'hidden'})
+
+def create_lazy_stats_sections(view, outline, filter_token, title):
+    """
+    Crée les en-têtes des sections d'une vue statistique à partir de son plan ;
+    seule la première section est ouverte et chargée immédiatement
+    
+    Args:
+        view: Vue statistique ('temporal' ou 'structure')
+        outline: Plan de la vue (describe_temporal_stats / describe_structure_stats)
+        filter_token: Jeton de la version des filtres du plan (latest_state_token)
+        title: Titre de la vue
+    """
+    components = []
+    if outline.get('summary') is not None:
+        components.append(outline['summary'])
+    
+    sections = outline.get('sections') or []
+    if not sections:
+        components.append(html.Div(
+            f"Aucune graphe disponible pour les {title.lower()}. Aucune donnée disponible.",
+            style=NO_DATA_STYLE
+        ))
+        return components
+    
+    components.append(html.Div(title, style=SECTION_TITLE_STYLE))
+    components.extend(
+        create_lazy_section(view, section, section_title, filter_token, start_open=(i == 0))
+        for i, (section, section_title) in enumerate(sections)
+    )
+    return components
+
 def create_attributes_stats_graphs(filtered_df):
     """
     Crée des graphiques statistiques liés aux attributs techniques
@@ -776,7 +1242,7 @@ def create_attributes_stats_graphs(filtered_df):
     
     # Graphiques en barre
     if 'olt_model' in filtered_df.columns and not filtered_df['olt_model'].isna().all():
-        graphs.append(create_bar_chart(filtered_df, 'olt_model', "Nombre d'observations"))
+        graphs.append(create_bar_chart(filtered_df['olt_model'].value_counts(), 'olt_model', "Nombre d'observations"))
     elif 'olt_model' in filtered_df.columns:
         graphs.append(html.Div(
             "Aucune graphe disponible pour la distribution des modèles d'OLT. Données manquantes.",
@@ -804,7 +1270,7 @@ def create_attributes_stats_graphs(filtered_df):
         for col, options in binary_columns.items():
             if col in filtered_df.columns and not filtered_df[col].isna().all():
                 mapping = options.get('mapping', {1: 'Oui', 0: 'Non'})
-                graphs.append(create_pie_chart(filtered_df, col, mapping, options.get('title')))
+                graphs.append(create_pie_chart(filtered_df[col].value_counts(), col, mapping, options.get('title')))
             elif col in filtered_df.columns:
                 graphs.append(html.Div(
                     f"Aucune graphe disponible pour {options.get('title')}. Données manquantes.",
@@ -822,25 +1288,20 @@ def create_attributes_stats_graphs(filtered_df):
                 style=NO_DATA_STYLE
             ))
         else:
-            fig_clients = px.histogram(
-                filtered_df,
-                x='nb_client_total',
+            fig_clients = create_histogram_figure(
+                filtered_df['nb_client_total'],
                 nbins=20,
                 title="Distribution du nombre de clients",
-                labels={'nb_client_total': 'Nombre de clients'},
-                color_discrete_sequence=["#e2001a"]
+                x_label='Nombre de clients'
             )
             
             fig_clients.update_layout(
                 height=400,
-                margin={"r": 10, "t": 40, "l": 10, "b": 40},
-                font=GRAPH_FONT,
-                title_font=GRAPH_TITLE_FONT,
-                plot_bgcolor='white'
+                margin={"r": 10, "t": 40, "l": 10, "b": 40}
             )
             
             graphs.append(html.Div([
-                dcc.Graph(figure=fig_clients, config={'displayModeBar': False})
+                dcc.Graph(figure=finalize_figure(fig_clients), config={'displayModeBar': False})
             ], style={
                 'marginBottom': '20px', 
                 'border': '1px solid #ddd', 
@@ -866,12 +1327,18 @@ def create_attributes_stats_graphs(filtered_df):
     
     return graphs
 
-def create_pie_chart(df, column, mapping={1: 'Oui', 0: 'Non'}, title=None):
+def create_pie_chart(counts, column, mapping={1: 'Oui', 0: 'Non'}, title=None):
     """
     Crée un graphique circulaire générique pour les variables binaires
+    
+    Args:
+        counts: Effectifs précalculés (value_counts sur les codes bruts) indexés par code
+        column: Nom de la colonne comptée
+        mapping: Libellés des codes
+        title: Titre du graphique
     """
-    # Vérifier si le DataFrame est vide ou si la colonne ne contient que des valeurs NaN
-    if df.empty or df[column].isna().all():
+    # Vérifier si le comptage est vide (colonne sans valeur renseignée)
+    if counts is None or counts.empty:
         readable_column = column.replace('_', ' ').title()
         title_text = title or f"Répartition des observations par {readable_column}"
         return html.Div(
@@ -880,18 +1347,17 @@ def create_pie_chart(df, column, mapping={1: 'Oui', 0: 'Non'}, title=None):
         )
     
     readable_column = column.replace('_', ' ').title().replace('Is ', '')
-    df_copy = df.copy()
-    df_copy[readable_column] = df_copy[column].map(mapping)
+    labelled_counts = map_count_labels(counts, mapping)
     
     # Vérifier si aucune donnée n'a pu être mappée
-    if df_copy[readable_column].isna().all():
+    if labelled_counts.empty:
         title_text = title or f"Répartition des observations par {readable_column}"
         return html.Div(
             f"Aucune graphe disponible pour {title_text}. Aucune donnée après mappage.",
             style=NO_DATA_STYLE
         )
     
-    counts = df_copy[readable_column].value_counts().reset_index()
+    counts = labelled_counts.reset_index()
     
     # Vérifier si counts est vide
     if counts.empty:
@@ -916,7 +1382,6 @@ def create_pie_chart(df, column, mapping={1: 'Oui', 0: 'Non'}, title=None):
     fig.update_layout(
         height=400,
         margin={"r": 10, "t": 40, "l": 10, "b": 20},
-        title_font=GRAPH_TITLE_FONT,
         legend_title_font=dict(size=12, color='#000000'),
         legend_font=dict(size=12, color='#000000')
     )
@@ -930,7 +1395,7 @@ def create_pie_chart(df, column, mapping={1: 'Oui', 0: 'Non'}, title=None):
     )
     
     return html.Div([
-        dcc.Graph(figure=fig, config={'displayModeBar': False})
+        dcc.Graph(figure=finalize_figure(fig), config={'displayModeBar': False})
     ], style={
         'marginBottom': '20px', 
         'border': '1px solid #ddd', 
@@ -939,4 +1404,120 @@ def create_pie_chart(df, column, mapping={1: 'Oui', 0: 'Non'}, title=None):
         'backgroundColor': 'white',
         'boxShadow': '0 2px 5px rgba(0,0,0,0.05)',
         'width': '100%'
-    })
\ No newline at end of file
+    })
+
+def create_dns_small_multiples(df_grouped, top_combinations, x_col, combination_labels, dns_avg, cols=4):
+    """
+    Crée une figure unique en grille (small multiples) pour les combinaisons DNS
+    au lieu d'un graphique complet par combinaison
+
+    Args:
+        df_grouped: DataFrame agrégé avec les colonnes 'combination', x_col,
+            'moy_avg_dns_time' et 'total_tests_dns'
+        top_combinations: Liste ordonnée des combinaisons à afficher
+        x_col: Colonne temporelle de l'axe X
+        combination_labels: Dictionnaire {combinaison: libellé court}
+        dns_avg: Moyenne globale affichée comme référence
+        cols: Nombre de colonnes de la grille
+
+    Returns:
+        Liste de composants (graphique et tableau récapitulatif)
+    """
+    if not top_combinations:
+        return [html.Div(
+            "Aucune graphe disponible pour les combinaisons DNS. Aucune donnée disponible.",
+            style=NO_DATA_STYLE
+        )]
+
+    rows = int(np.ceil(len(top_combinations) / cols))
+    fig = make_subplots(
+        rows=rows,
+        cols=cols,
+        shared_xaxes=True,
+        shared_yaxes=True,
+        subplot_titles=[combination_labels[c] for c in top_combinations],
+        vertical_spacing=0.06,
+        horizontal_spacing=0.02
+    )
+
+    # Un seul regroupement pour toutes les combinaisons
+    by_combination = {
+        combination: group.sort_values(x_col)
+        for combination, group in df_grouped[df_grouped['combination'].isin(top_combinations)].groupby('combination')
+    }
+
+    summary_rows = []
+    for position, combination in enumerate(top_combinations):
+        combo_data = by_combination.get(combination)
+        if combo_data is None or combo_data.empty:
+            continue
+
+        plot_data = downsample_frame(combo_data, x_col, 'moy_avg_dns_time')
+
+        # Tableaux typés : dates en millisecondes epoch (axe de type date) et float32.
+        # Les entiers 64 bits n'ont pas d'équivalent typé côté navigateur, d'où float64.
+        x_values = pd.to_datetime(plot_data[x_col]).to_numpy(dtype='datetime64[ms]').astype(np.int64).astype(np.float64)
+        y_values = plot_data['moy_avg_dns_time'].to_numpy(dtype=np.float32)
+
+        fig.add_trace(
+            go.Scattergl(
+                x=x_values,
+                y=y_values,
+                mode='lines',
+                line=dict(color='#e2001a', width=1.5),
+                name=combination_labels[combination],
+                hovertemplate='%{x|%d/%m %Hh}: %{y:.1f} ms<extra></extra>'
+            ),
+            row=position // cols + 1,
+            col=position % cols + 1
+        )
+
+        summary_rows.append(html.Tr([
+            html.Td(combination_labels[combination]),
+            html.Td(f"{combo_data['moy_avg_dns_time'].mean():.2f} ms", style={'textAlign': 'right'}),
+            html.Td(f"{combo_data['moy_avg_dns_time'].max():.2f} ms", style={'textAlign': 'right'}),
+            html.Td(f"{combo_data['total_tests_dns'].sum():,}".replace(',', ' '), style={'textAlign': 'right'})
+        ]))
+
+    # Ligne de référence (moyenne globale) : une forme par sous-graphique, les axes Y communs
+    # la placent à la même hauteur dans chaque cellule
+    fig.add_hline(y=dns_avg, line_dash="dash", line_color="gray", line_width=1, row='all', col='all')
+
+    fig.update_xaxes(type='date', tickformat='%d/%m', nticks=4, tickfont=dict(size=9))
+    fig.update_yaxes(tickfont=dict(size=9))
+    fig.update_annotations(font=dict(size=10, color='#000000'))
+    fig.update_layout(
+        height=170 * rows + 60,
+        margin={"r": 10, "t": 40, "l": 40, "b": 30},
+        showlegend=False
+    )
+
+    table = dbc.Table(
+        [
+            html.Thead(html.Tr([
+                html.Th("Combinaison"),
+                html.Th("Temps moyen"),
+                html.Th("Temps max"),
+                html.Th("Total tests")
+            ], style={'backgroundColor': '#f0f0f0'})),
+            html.Tbody(summary_rows)
+        ],
+        bordered=True,
+        hover=True,
+        striped=True,
+        size="sm",
+        style={'marginTop': '15px', 'fontSize': '12px'}
+    )
+
+    return [html.Div([
+        dcc.Graph(figure=finalize_figure(fig, "grille DNS"), config={'displayModeBar': False, 'responsive': True}),
+        table
+    ], style={
+        'marginBottom': '25px',
+        'border': '1px solid #ddd',
+        'borderRadius': '8px',
+        'padding': '15px',
+        'backgroundColor': 'white',
+        'boxShadow': '0 2px 5px rgba(0,0,0,0.05)',
+        'width': '100%'
+    })]
@@ -0,0 +1,143 @@
+# utils/hll.py
+# Esquisses HyperLogLog : estimation du nombre de valeurs distinctes en mémoire bornée,
+# fusionnables (maximum des registres) pour combiner des partitions sans relire les lignes
+
+import numpy as np
+import pandas as pd
+
+# Précision par défaut : 2^12 registres, erreur relative typique de 1,04 / sqrt(4096) ≈ 1,6 %
+HLL_PRECISION = 12
+
+HASH_BITS = 64
+
+
+def hash_values(values):
+    """Empreintes 64 bits (stables d'un processus à l'autre) des valeurs"""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _bit_length(values):
+    """Nombre de bits significatifs de chaque entier non signé 64 bits"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # Les entiers 32 bits sont représentés exactement en flottant : l'exposant donne la longueur
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def register_ranks(hashes, precision=HLL_PRECISION):
+    """
+    Registre et rang de chaque empreinte
+
+    Args:
+        hashes: Empreintes 64 bits (np.uint64)
+        precision: Nombre de bits d'adresse des registres
+
+    Returns:
+        (indices des registres, rangs = position du premier bit à 1 des bits restants)
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    remaining_bits = HASH_BITS - precision
+    registers = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << remaining_bits) - 1)
+    ranks = (remaining_bits - _bit_length(remainder) + 1).astype(np.uint8)
+    return registers, ranks
+
+
+class HyperLogLog:
+    """Esquisse HyperLogLog dense (un rang maximal par registre)"""
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        """
+        Args:
+            precision: Nombre de bits d'adresse (2^precision registres)
+            registers: Registres existants (np.uint8), par exemple issus d'une fusion
+        """
+        self.precision = precision
+        self.registers = (np.zeros(1 << precision, dtype=np.uint8) if registers is None
+                          else np.asarray(registers, dtype=np.uint8))
+
+    @classmethod
+    def from_values(cls, values, precision=HLL_PRECISION):
+        sketch = cls(precision)
+        sketch.add(values)
+        return sketch
+
+    def add(self, values):
+        """Ajoute des valeurs à l'esquisse"""
+        self.add_hashes(hash_values(values))
+
+    def add_hashes(self, hashes):
+        """Ajoute des empreintes déjà calculées"""
+        registers, ranks = register_ranks(hashes, self.precision)
+        np.maximum.at(self.registers, registers, ranks)
+
+    def merge(self, other):
+        """Union de deux esquisses de même précision"""
+        if other.precision != self.precision:
+            raise ValueError("Fusion impossible : précisions HyperLogLog différentes")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def count(self):
+        """Estimation du nombre de valeurs distinctes"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Petites cardinalités : comptage linéaire sur les registres vides
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class PartitionedSketches:
+    """
+    Esquisses d'une colonne pour chaque partition des données, stockées de façon creuse
+    (partition, registre, rang) : une partition ne contient que quelques valeurs distinctes.
+    L'union d'un ensemble quelconque de partitions donne une esquisse HyperLogLog.
+    """
+
+    def __init__(self, partition_ids, values, precision=HLL_PRECISION):
+        """
+        Args:
+            partition_ids: Numéro de partition de chaque ligne (entiers >= 0)
+            values: Valeur de la colonne pour chaque ligne (les valeurs manquantes sont ignorées)
+            precision: Nombre de bits d'adresse des registres
+        """
+        self.precision = precision
+        codes, uniques = pd.factorize(values)
+        partition_ids = np.asarray(partition_ids, dtype=np.int64)
+        valid = codes >= 0
+
+        # Couples (partition, valeur) distincts, puis empreinte de chaque valeur distincte
+        pairs = np.unique(partition_ids[valid] * max(len(uniques), 1) + codes[valid])
+        pair_partitions = pairs // max(len(uniques), 1)
+        registers, ranks = register_ranks(hash_values(uniques)[pairs % max(len(uniques), 1)], precision)
+
+        # Rang maximal par (partition, registre)
+        entries = (
+            pd.DataFrame({'partition': pair_partitions, 'register': registers, 'rank': ranks})
+            .groupby(['partition', 'register'], sort=False)['rank']
+            .max()
+            .reset_index()
+        )
+        self.partitions = entries['partition'].to_numpy()
+        self.registers = entries['register'].to_numpy()
+        self.ranks = entries['rank'].to_numpy(dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def union(self, partition_mask):
+        """
+        Esquisse de l'union des partitions retenues
+
+        Args:
+            partition_mask: Tableau booléen indexé par numéro de partition
+
+        Returns:
+            HyperLogLog des partitions retenues
+        """
+        selected = np.asarray(partition_mask, dtype=bool)[self.partitions]
+        sketch = HyperLogLog(self.precision)
+        np.maximum.at(sketch.registers, self.registers[selected], self.ranks[selected])
+        return sketch
@@ -0,0 +1,135 @@
+# utils/map_metrics.py
+# Indicateurs agrégés par département pour la carte nationale,
+# calculés une seule fois par version des données et partagés entre les sessions
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.anomaly_files import anomaly_file_path, DEFAULT_CONTAMINATION
+from utils.data_loader import DataManager
+from utils.geo_loader import DepartementGeoStore
+
+# Indicateurs disponibles sur la carte nationale
+NATIONAL_MAP_METRICS = {
+    'observations': {
+        'label': "Nombre d'observations",
+        'column': 'nb_observations',
+        'format': ',.0f'
+    },
+    'dns': {
+        'label': "Temps DNS moyen pondéré (ms)",
+        'column': 'temps_dns_pondere',
+        'format': '.2f'
+    },
+    'anomalies': {
+        'label': "Anomalies Isolation Forest",
+        'column': 'nb_anomalies',
+        'format': ',.0f'
+    }
+}
+
+
+class DepartementMetricsStore:
+    """
+    Calcule en un seul regroupement les indicateurs de chaque département
+    (nombre d'observations, temps DNS pondéré, nombre d'anomalies au niveau
+    de contamination choisi)
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager les indicateurs entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = DepartementMetricsStore(DataManager.get_instance())
+        return cls._instance
+
+    def __init__(self, data_manager):
+        """
+        Args:
+            data_manager: Gestionnaire de données source
+        """
+        self.data_manager = data_manager
+        # Indicateurs par clé (version_key), un par niveau de contamination demandé
+        self._cached_metrics = {}
+        self._lock = threading.Lock()
+
+    def version_key(self, contamination=DEFAULT_CONTAMINATION):
+        """
+        Clé des indicateurs : version des données, niveau de contamination
+        et date de modification du fichier d'anomalies correspondant
+        """
+        anomaly_path = anomaly_file_path(contamination)
+        anomaly_mtime = os.path.getmtime(anomaly_path) if os.path.exists(anomaly_path) else None
+        return (self.data_manager.data_version, contamination, anomaly_mtime)
+
+    def _anomaly_counts(self, df, contamination):
+        """
+        Compte les anomalies graves par département à partir des OLT
+        (le fichier d'anomalies ne contient pas le code département)
+        """
+        anomaly_path = anomaly_file_path(contamination)
+        if not os.path.exists(anomaly_path):
+            return pd.Series(dtype='float64')
+
+        anomalies = pd.read_csv(anomaly_path, usecols=['olt_name', 'grave_anomalies'])
+        per_olt = anomalies.loc[anomalies['grave_anomalies'] > 0, 'olt_name'].value_counts()
+
+        olt_departements = (
+            df[['olt_name', 'code_departement']]
+            .dropna()
+            .drop_duplicates('olt_name')
+            .set_index('olt_name')['code_departement']
+        )
+        matched = per_olt[per_olt.index.isin(olt_departements.index)]
+        return matched.groupby(olt_departements.loc[matched.index].to_numpy()).sum()
+
+    def _compute(self, contamination):
+        """Calcule les indicateurs depuis les données d'origine"""
+        df = self.data_manager.df_original
+        tests = df['nb_test_dns'].to_numpy(dtype='float64')
+        dns_time = df['avg_dns_time'].to_numpy(dtype='float64')
+        valid = ~(np.isnan(tests) | np.isnan(dns_time))
+
+        grouped = (
+            df[['code_departement']]
+            .assign(dns_weighted_sum=np.where(valid, dns_time * tests, 0.0),
+                    dns_tests=np.where(valid, tests, 0.0))
+            .groupby('code_departement', observed=True)
+            .agg(nb_observations=('code_departement', 'size'),
+                 dns_weighted_sum=('dns_weighted_sum', 'sum'),
+                 dns_tests=('dns_tests', 'sum'))
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            grouped['temps_dns_pondere'] = np.where(
+                grouped['dns_tests'] > 0, grouped['dns_weighted_sum'] / grouped['dns_tests'], np.nan
+            )
+        grouped['nb_anomalies'] = self._anomaly_counts(df, contamination).reindex(grouped.index).fillna(0)
+
+        metrics = grouped[['nb_observations', 'temps_dns_pondere', 'nb_anomalies']].reset_index()
+        metrics['code'] = metrics['code_departement'].map(DepartementGeoStore.normalize_code)
+        return metrics
+
+    def get_metrics(self, contamination=DEFAULT_CONTAMINATION):
+        """
+        Args:
+            contamination: Niveau de contamination du fichier d'anomalies
+
+        Returns:
+            DataFrame avec 'code', 'code_departement', 'nb_observations',
+            'temps_dns_pondere' et 'nb_anomalies'
+        """
+        key = self.version_key(contamination)
+        with self._lock:
+            if key not in self._cached_metrics:
+                # Les indicateurs d'une version précédente (données ou fichier) sont abandonnés
+                self._cached_metrics = {
+                    cached_key: metrics for cached_key, metrics in self._cached_metrics.items()
+                    if cached_key[0] == key[0] and cached_key[1] != contamination
+                }
+                self._cached_metrics[key] = self._compute(contamination)
+            return self._cached_metrics[key]
@@ -0,0 +1,98 @@
+# utils/payload_benchmark.py
+# Mesure de la taille sérialisée des graphiques statistiques avec le thème Plotly
+# par défaut ('plotly') et avec le thème SFR enregistré (styles/theme.py).
+# plotly.js n'a pas de registre de thèmes nommés : le thème reste intégré à chaque
+# figure (layout.template), sa part dans la taille est donc mesurée séparément
+
+import argparse
+import json
+import time
+
+import plotly
+import plotly.io as pio
+
+from styles.theme import PLOTLY_TEMPLATE_NAME
+from utils.data_loader import DataManager
+from utils.graph_utils import (
+    create_structure_stats_graphs,
+    create_attributes_stats_graphs,
+    create_temporal_stats_graphs
+)
+
+
+def _payload_size(components):
+    """Taille en octets des composants sérialisés comme dans une réponse Dash"""
+    return len(plotly.io.json.to_json_plotly(components))
+
+
+def _embedded_template_size(components):
+    """Taille en octets des thèmes intégrés aux figures (layout.template) des composants"""
+    size = 0
+    pending = [json.loads(plotly.io.json.to_json_plotly(components))]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            layout = node.get('layout')
+            if isinstance(layout, dict) and 'template' in layout:
+                size += len(json.dumps(layout['template'], separators=(',', ':')))
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return size
+
+
+def measure_payloads(filters, templates=('plotly', PLOTLY_TEMPLATE_NAME)):
+    """
+    Construit chaque vue statistique avec chacun des thèmes et mesure sa taille
+
+    Args:
+        filters: Filtres appliqués (format DataManager.filter_dataframe)
+        templates: Noms des thèmes Plotly comparés
+
+    Returns:
+        Dictionnaire {(vue, thème): (taille en octets, durée en ms, dont thèmes intégrés en octets)}
+    """
+    data_manager = DataManager.get_instance()
+    filtered_df = data_manager.filter_dataframe(filters)
+    builders = {
+        'structure': lambda: create_structure_stats_graphs(filtered_df, filters),
+        'attributs': lambda: create_attributes_stats_graphs(filtered_df),
+        'temporel': lambda: create_temporal_stats_graphs(filtered_df)
+    }
+
+    previous_default = pio.templates.default
+    results = {}
+    try:
+        for template in templates:
+            # Le thème par défaut est appliqué à la création de chaque figure
+            pio.templates.default = template
+            for view, build in builders.items():
+                start = time.perf_counter()
+                components = build()
+                size = _payload_size(components)
+                results[(view, template)] = (size, (time.perf_counter() - start) * 1000,
+                                             _embedded_template_size(components))
+    finally:
+        pio.templates.default = previous_default
+    return results
+
+
+def print_report(results, templates=('plotly', PLOTLY_TEMPLATE_NAME)):
+    """Affiche la comparaison des tailles par vue"""
+    reference, candidate = templates
+    print(f"{'Vue':<12}{reference:>14}{candidate:>14}{'Gain':>10}{'Thème intégré':>16}")
+    for view in dict.fromkeys(view for view, _ in results):
+        reference_size = results[(view, reference)][0]
+        candidate_size, _, template_size = results[(view, candidate)]
+        gain = 1 - candidate_size / reference_size if reference_size else 0
+        print(f"{view:<12}{reference_size / 1024:>11.1f} Ko{candidate_size / 1024:>11.1f} Ko{gain:>9.0%}"
+              f"{template_size / 1024:>13.1f} Ko")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare la taille des graphiques selon le thème Plotly")
+    parser.add_argument("--departement", default=None, help="Code département filtré (toutes les données par défaut)")
+    args = parser.parse_args()
+
+    filters = {'Département': args.departement} if args.departement else {}
+    print_report(measure_payloads(filters))
@@ -0,0 +1,332 @@
+# utils/query_engine.py
+# Interprétation locale (par règles) des questions tapées dans le chat : nombre d'observations
+# et temps DNS moyen, traduits en filtres DataManager et calculés sur des index précalculés
+
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import DataManager
+from utils.geo_loader import DepartementGeoStore
+from utils.topology_index import TopologyIndex, STRUCTURE_HIERARCHY
+
+# Métriques reconnues
+METRIC_COUNT = 'count'
+METRIC_DNS_MEAN = 'dns_mean'
+
+# Filtres portant sur la journée entière : calculables sur le cube journalier
+DAY_LEVEL_FILTERS = {'Date', 'Week-end', 'Jour férié', 'Jour de la semaine'}
+
+# Colonnes des indicateurs journaliers joints au cube (filtre, colonne)
+DAY_FLAG_COLUMNS = [('Week-end', 'is_weekend'), ('Jour férié', 'is_holiday')]
+
+JOURS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+
+# Expressions reconnues pour les indicateurs oui/non (texte normalisé, sans accents)
+FLAG_PATTERNS = [
+    (r"\bweek-?ends?\b", 'Week-end', 'oui'),
+    (r"\ben semaine\b", 'Week-end', 'non'),
+    (r"\bferies?\b", 'Jour férié', 'oui'),
+    (r"\bheures? de pointe\b", 'Heure de pointe', 'oui'),
+    (r"\b(?:la|de) nuit\b", 'Heure de nuit', 'oui'),
+    (r"\bheures? ouvrees?\b", 'Heure ouvrée', 'oui')
+]
+
+# Numéro de département, toujours précédé de son mot-clé
+DEPARTEMENT_PATTERN = r"\b(?:departement|dept?|dpt)\.?\s*(?:du\s+)?(\d[\dab]{0,2})\b"
+
+DATE_PATTERN = r"(\d{1,2})/(\d{1,2})/(\d{4})"
+
+# Questions reconnues (texte normalisé) : toute autre question revient au parcours par la barre latérale
+COUNTED_UNITS = r"(?:observations?|mesures?|lignes?)"
+COUNT_PATTERN = rf"\bcombien\b.*\b{COUNTED_UNITS}\b|\bnombre\s+d(?:e\s+|'\s*){COUNTED_UNITS}\b"
+DNS_MEAN_PATTERN = r"\b(?:temps|moyen(?:ne)?|latence)\b"
+
+
+def normalize_text(text):
+    """Minuscules sans accents, apostrophes typographiques remplacées"""
+    text = unicodedata.normalize('NFKD', text.replace('’', "'")).encode('ascii', 'ignore').decode('ascii')
+    return text.lower()
+
+
+def _parse_date(day, month, year):
+    try:
+        return pd.Timestamp(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def describe_filters(filters):
+    """
+    Liste lisible des critères interprétés
+
+    Returns:
+        Liste de chaînes « Filtre : valeur »
+    """
+    descriptions = []
+    for filter_name, value in filters.items():
+        if filter_name == 'Date':
+            start, end = (pd.Timestamp(v).strftime('%d/%m/%Y') for v in value)
+            value = start if start == end else f"du {start} au {end}"
+        elif filter_name == 'Heure':
+            value = f"{value[0]}h" if value[0] == value[1] else f"de {value[0]}h à {value[1]}h"
+        elif filter_name == 'Jour de la semaine':
+            value = ", ".join(JOURS[day].capitalize() for day in value)
+        descriptions.append(f"{filter_name} : {value}")
+    return descriptions
+
+
+class QueryEngine:
+    """
+    Traduit une question en français (« combien d'observations pour l'OLT X en week-end »,
+    « temps DNS moyen du département 75 hier ») en filtres DataManager et y répond
+    à partir de l'index de topologie ou d'un cube journalier (hiérarchie × date),
+    sans reparcourir les lignes horaires tant que les filtres le permettent
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager les index entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = QueryEngine(DataManager.get_instance(), TopologyIndex.get_instance())
+        return cls._instance
+
+    def __init__(self, data_manager, topology_index):
+        """
+        Args:
+            data_manager: Gestionnaire de données source
+            topology_index: Index de la hiérarchie réseau (comptages par chemin)
+        """
+        self.data_manager = data_manager
+        self.topology_index = topology_index
+        self._index_version = None
+        self._vocabulary = None
+        self._departements = None
+        self._daily_cube = None
+        self._date_span = None
+        self._lock = threading.Lock()
+
+    def _ensure_index(self):
+        """Construit le vocabulaire et le cube journalier, une fois par version des données"""
+        version = self.data_manager.data_version
+        with self._lock:
+            if self._index_version == version:
+                return
+
+            df = self.data_manager.df_original
+            levels = self.topology_index.levels
+            leaf_counts = self.topology_index.leaf_counts()
+
+            # Identifiants connus de chaque niveau (recherchés tels quels dans la question)
+            filter_names = {col: name for name, col in STRUCTURE_HIERARCHY}
+            vocabulary = {}
+            for col in levels:
+                if col == 'code_departement':
+                    continue
+                for value in leaf_counts[col].dropna().unique():
+                    vocabulary.setdefault(normalize_text(str(value)), (filter_names[col], value))
+
+            # Codes département des données indexés par code normalisé ('1', '01' -> valeur des données)
+            departements = {}
+            if 'code_departement' in levels:
+                for value in leaf_counts['code_departement'].dropna().unique():
+                    departements.setdefault(DepartementGeoStore.normalize_code(value), value)
+
+            # Cube journalier : effectifs et moments DNS par chemin de la hiérarchie et par date
+            dates = pd.to_datetime(df['date']).dt.normalize()
+            dns_time = df['avg_dns_time'].to_numpy(dtype='float64')
+            tests = df['nb_test_dns'].to_numpy(dtype='float64')
+            valid = ~(np.isnan(dns_time) | np.isnan(tests))
+            cube = (
+                df[levels]
+                .assign(date=dates,
+                        count=1,
+                        dns_weighted_sum=np.where(valid, dns_time * tests, 0.0),
+                        total_tests_dns=np.where(valid, tests, 0.0))
+                .groupby(levels + ['date'], dropna=False, observed=True, sort=False)
+                [['count', 'dns_weighted_sum', 'total_tests_dns']]
+                .sum()
+                .reset_index()
+            )
+
+            # Indicateurs propres à chaque date (week-end, jour férié, jour de la semaine)
+            day_columns = [col for _, col in DAY_FLAG_COLUMNS + [('Jour de la semaine', 'day_of_week')]
+                           if col in df.columns]
+            day_attributes = df[day_columns].groupby(dates).first()
+            if 'day_of_week' not in day_attributes.columns:
+                day_attributes['day_of_week'] = day_attributes.index.dayofweek
+            cube = cube.join(day_attributes, on='date')
+
+            self._vocabulary = vocabulary
+            self._departements = departements
+            self._daily_cube = cube
+            self._date_span = (dates.min(), dates.max())
+            self._index_version = version
+            print(f"Index du moteur de requêtes construit : {len(cube)} cellules journalières")
+
+    def build_index(self):
+        """Construit les index du moteur (appelé au démarrage pour ne pas ralentir la première question)"""
+        self._ensure_index()
+
+    def parse(self, text):
+        """
+        Interprète une question
+
+        Args:
+            text: Message tapé par l'utilisateur
+
+        Returns:
+            Dictionnaire {'metric', 'filters'} ou None si la question n'est pas reconnue
+        """
+        self._ensure_index()
+        query = normalize_text(text)
+
+        if re.search(r"\bdns\b", query) and re.search(DNS_MEAN_PATTERN, query):
+            metric = METRIC_DNS_MEAN
+        elif re.search(COUNT_PATTERN, query):
+            metric = METRIC_COUNT
+        else:
+            return None
+
+        filters = {}
+
+        # Département (toujours introduit par un mot-clé : les nombres seuls sont ambigus)
+        # et résolu sur les codes présents dans les données ; un code inconnu n'est pas interprété
+        match = re.search(DEPARTEMENT_PATTERN, query)
+        if match:
+            departement = self._departements.get(DepartementGeoStore.normalize_code(match.group(1)))
+            if departement is None:
+                return None
+            filters['Département'] = departement
+
+        # Identifiants des autres niveaux (OLT, PEAG, boucle, PEBIB, POP DNS)
+        for token in re.findall(r"[\w\-]+", query):
+            entry = self._vocabulary.get(token)
+            if entry is None:
+                continue
+            filter_name, value = entry
+            if filters.get(filter_name, value) != value:
+                # Deux valeurs pour un même niveau : non exprimable par un filtre d'égalité
+                return None
+            filters[filter_name] = value
+
+        for pattern, filter_name, value in FLAG_PATTERNS:
+            if re.search(pattern, query):
+                filters[filter_name] = value
+
+        days = [index for index, jour in enumerate(JOURS) if re.search(rf"\b{jour}s?\b", query)]
+        if days:
+            filters['Jour de la semaine'] = days
+
+        # Période : dates explicites ou relatives à la dernière journée des données
+        last_day = self._date_span[1]
+        date_range = None
+        match = re.search(rf"\bdu {DATE_PATTERN} au {DATE_PATTERN}", query)
+        if match:
+            date_range = (_parse_date(*match.groups()[:3]), _parse_date(*match.groups()[3:]))
+        elif re.search(DATE_PATTERN, query):
+            day = _parse_date(*re.search(DATE_PATTERN, query).groups())
+            date_range = (day, day)
+        elif re.search(r"\bavant-hier\b", query):
+            date_range = (last_day - pd.Timedelta(days=2),) * 2
+        elif re.search(r"\bhier\b", query):
+            date_range = (last_day - pd.Timedelta(days=1),) * 2
+        elif re.search(r"\baujourd'?hui\b", query):
+            date_range = (last_day, last_day)
+        if date_range is not None:
+            if None in date_range:
+                return None
+            filters['Date'] = tuple(day.strftime('%Y-%m-%d') for day in date_range)
+
+        # Heures
+        match = re.search(r"\bentre (\d{1,2}) ?h\d{0,2} et (\d{1,2}) ?h", query)
+        if match:
+            filters['Heure'] = (int(match.group(1)), int(match.group(2)))
+        else:
+            match = re.search(r"\b(?:a|vers) (\d{1,2}) ?h\b", query)
+            if match:
+                filters['Heure'] = (int(match.group(1)), int(match.group(1)))
+
+        return {'metric': metric, 'filters': filters}
+
+    def _cube_totals(self, filters):
+        """Sommes des cellules du cube journalier retenues par les filtres"""
+        cube = self._daily_cube
+        hierarchy_columns = dict(STRUCTURE_HIERARCHY)
+        mask = np.ones(len(cube), dtype=bool)
+        for filter_name, value in filters.items():
+            if filter_name in hierarchy_columns:
+                mask &= (cube[hierarchy_columns[filter_name]] == value).to_numpy()
+            elif filter_name == 'Date':
+                start, end = pd.to_datetime(value[0]), pd.to_datetime(value[1])
+                mask &= ((cube['date'] >= start) & (cube['date'] <= end)).to_numpy()
+            elif filter_name == 'Jour de la semaine':
+                mask &= cube['day_of_week'].isin(value).to_numpy()
+            else:
+                flag_column = dict(DAY_FLAG_COLUMNS)[filter_name]
+                mask &= (cube[flag_column] == (1 if value == 'oui' else 0)).to_numpy()
+        return cube.loc[mask, ['count', 'dns_weighted_sum', 'total_tests_dns']].sum()
+
+    def _row_totals(self, filters):
+        """Sommes calculées sur les lignes filtrées (filtres horaires ou hors index)"""
+        filtered_df = self.data_manager.filter_dataframe(filters)
+        dns_time = filtered_df['avg_dns_time'].to_numpy(dtype='float64')
+        tests = filtered_df['nb_test_dns'].to_numpy(dtype='float64')
+        valid = ~(np.isnan(dns_time) | np.isnan(tests))
+        return pd.Series({
+            'count': len(filtered_df),
+            'dns_weighted_sum': float((dns_time[valid] * tests[valid]).sum()),
+            'total_tests_dns': float(tests[valid].sum())
+        })
+
+    def answer(self, text):
+        """
+        Interprète une question et calcule sa réponse
+
+        Args:
+            text: Message tapé par l'utilisateur
+
+        Returns:
+            Dictionnaire {'metric', 'filters', 'value', 'total_tests_dns', 'source', 'elapsed_ms'},
+            ou None si la question n'est pas reconnue (retour au parcours par la barre latérale)
+        """
+        start = time.perf_counter()
+        parsed = self.parse(text)
+        if parsed is None:
+            return None
+
+        metric, filters = parsed['metric'], parsed['filters']
+        hierarchy_filters = {name for name, _ in STRUCTURE_HIERARCHY}
+
+        if metric == METRIC_COUNT and set(filters) <= hierarchy_filters:
+            totals = pd.Series({'count': int(self.topology_index.path_counts(filters)['count'].sum())})
+            source = 'index de topologie'
+        elif set(filters) <= hierarchy_filters | DAY_LEVEL_FILTERS:
+            totals = self._cube_totals(filters)
+            source = 'cube journalier'
+        else:
+            totals = self._row_totals(filters)
+            source = 'données filtrées'
+
+        if metric == METRIC_COUNT:
+            value = int(totals['count'])
+            total_tests = None
+        else:
+            total_tests = float(totals['total_tests_dns'])
+            value = float(totals['dns_weighted_sum'] / total_tests) if total_tests > 0 else None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Question du chat interprétée ({source}) en {elapsed_ms:.1f} ms : {filters}")
+        return {
+            'metric': metric,
+            'filters': filters,
+            'value': value,
+            'total_tests_dns': total_tests,
+            'source': source,
+            'elapsed_ms': elapsed_ms
+        }
@@ -0,0 +1,117 @@
+# utils/request_coalescer.py
+# Regroupement des demandes successives d'une même session : chaque demande reçoit un numéro
+# de séquence, les calculs coûteux des demandes dépassées sont abandonnés et leurs messages
+# sont repris par la demande la plus récente
+
+from collections import OrderedDict
+import threading
+
+from dash.exceptions import PreventUpdate
+
+# Clé du numéro de séquence dans les filtres enregistrés (voir utils/session_state.py)
+SEQUENCE_KEY = '_seq'
+
+# Canaux de demandes regroupées
+FILTER_CHANNEL = 'filters'
+ANOMALY_FILTER_CHANNEL = 'anomaly-filters'
+
+# Nombre de couples (session, canal) suivis (éviction LRU)
+MAX_TRACKED_KEYS = 1000
+
+
+def strip_request_metadata(filters):
+    """Filtres sans les clés techniques (numéro de séquence, session)"""
+    return {key: value for key, value in (filters or {}).items() if not str(key).startswith('_')}
+
+
+class RequestCoalescer:
+    """
+    Numérote les demandes par session et par canal. Le navigateur ignore déjà la
+    réponse d'une demande relancée avant d'avoir abouti : une demande dépassée est
+    donc abandonnée côté serveur entre deux étapes coûteuses (sans attente). Les
+    éléments qu'elle devait transmettre (messages du chat) sont mis en attente et
+    repris par la demande suivante qui aboutit ; ceux qui arrivent après qu'une demande
+    plus récente a déjà transmis les siens (ou réinitialisé le canal) sont ignorés. Le suivi est propre à chaque processus : seules
+    les demandes traitées par le même worker sont regroupées.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager les séquences entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = RequestCoalescer()
+        return cls._instance
+
+    def __init__(self, max_keys=MAX_TRACKED_KEYS):
+        """
+        Args:
+            max_keys: Nombre de couples (session, canal) suivis
+        """
+        self.max_keys = max_keys
+        self._latest = OrderedDict()
+        self._pending = {}
+        # Numéro de la dernière demande ayant transmis les éléments en attente
+        self._drained = {}
+        self._lock = threading.Lock()
+
+    def begin(self, session_id, channel, sequence=None):
+        """
+        Enregistre une nouvelle demande
+
+        Args:
+            session_id: Identifiant de la session
+            channel: Canal de la demande (ex. FILTER_CHANNEL)
+            sequence: Numéro porté par le Store (None : numéro suivant attribué par le serveur)
+
+        Returns:
+            Numéro de séquence de la demande
+        """
+        key = (session_id, channel)
+        with self._lock:
+            latest = self._latest.get(key, 0)
+            if sequence is None:
+                sequence = latest + 1
+            self._latest[key] = max(latest, sequence)
+            self._latest.move_to_end(key)
+            while len(self._latest) > self.max_keys:
+                evicted_key, _ = self._latest.popitem(last=False)
+                self._pending.pop(evicted_key, None)
+                self._drained.pop(evicted_key, None)
+        return sequence
+
+    def is_current(self, session_id, channel, sequence):
+        """Indique si aucune demande plus récente n'est arrivée pour ce canal"""
+        with self._lock:
+            return sequence >= self._latest.get((session_id, channel), 0)
+
+    def check(self, session_id, channel, sequence):
+        """Abandonne le callback (PreventUpdate) si la demande a été dépassée"""
+        if not self.is_current(session_id, channel, sequence):
+            print(f"Demande {channel} n°{sequence} abandonnée : une demande plus récente est en cours")
+            raise PreventUpdate
+
+    def defer(self, session_id, channel, sequence, items):
+        """
+        Met en attente les éléments d'une demande dépassée, à transmettre par la prochaine
+        demande aboutie (ignorés si une demande plus récente a déjà transmis les éléments en attente)
+        """
+        key = (session_id, channel)
+        with self._lock:
+            if sequence <= self._drained.get(key, 0):
+                return
+            self._pending.setdefault(key, []).append((sequence, list(items)))
+
+    def drain(self, session_id, channel, sequence):
+        """
+        Retourne (et retire) les éléments en attente des demandes antérieures à la demande
+        qui aboutit, dans leur ordre d'arrivée
+        """
+        key = (session_id, channel)
+        with self._lock:
+            self._drained[key] = max(self._drained.get(key, 0), sequence)
+            pending = self._pending.pop(key, [])
+            kept = [(entry_sequence, items) for entry_sequence, items in pending if entry_sequence > sequence]
+            if kept:
+                self._pending[key] = kept
+            return [item for entry_sequence, items in pending if entry_sequence <= sequence for item in items]
@@ -0,0 +1,162 @@
+# utils/search_index.py
+# Index de recherche des identifiants (OLT, chaînes LOF) pour les listes déroulantes :
+# seules les meilleures correspondances sont envoyées au navigateur à chaque frappe
+
+from bisect import bisect_left
+import threading
+
+from utils.data_loader import DataManager
+
+# Nombre maximal d'options renvoyées par recherche
+SEARCH_RESULT_LIMIT = 20
+
+# Longueur maximale des n-grammes indexés (les termes plus longs intersectent leurs n-grammes)
+NGRAM_SIZE = 3
+
+
+class SearchIndex:
+    """
+    Index d'un ensemble d'identifiants : tableau trié pour la recherche par préfixe
+    et index inversé des n-grammes (1 à ngram_size caractères) pour la recherche de sous-chaîne
+    """
+
+    def __init__(self, values, ngram_size=NGRAM_SIZE):
+        """
+        Args:
+            values: Identifiants indexés
+            ngram_size: Longueur maximale des n-grammes de l'index inversé
+        """
+        self.ngram_size = ngram_size
+        self.values = sorted({str(value) for value in values if value is not None}, key=str.lower)
+        self._keys = [value.lower() for value in self.values]
+        self._ngrams = {}
+        for position, key in enumerate(self._keys):
+            for size in range(1, ngram_size + 1):
+                for start in range(len(key) - size + 1):
+                    self._ngrams.setdefault(key[start:start + size], set()).add(position)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _prefix_positions(self, term, limit):
+        """Positions des identifiants commençant par le terme (dans l'ordre alphabétique)"""
+        positions = []
+        position = bisect_left(self._keys, term)
+        while position < len(self._keys) and self._keys[position].startswith(term) and len(positions) < limit:
+            positions.append(position)
+            position += 1
+        return positions
+
+    def _substring_positions(self, term):
+        """Positions des identifiants contenant le terme (candidats tirés de l'index de n-grammes)"""
+        if len(term) <= self.ngram_size:
+            return sorted(self._ngrams.get(term, ()))
+        candidates = None
+        for start in range(len(term) - self.ngram_size + 1):
+            postings = self._ngrams.get(term[start:start + self.ngram_size])
+            if not postings:
+                return []
+            candidates = set(postings) if candidates is None else candidates & postings
+        # Les n-grammes communs ne garantissent pas la sous-chaîne complète
+        return sorted(position for position in candidates if term in self._keys[position])
+
+    def search(self, term, limit=SEARCH_RESULT_LIMIT):
+        """
+        Recherche les identifiants correspondant au terme (insensible à la casse)
+
+        Args:
+            term: Texte saisi (vide : premiers identifiants par ordre alphabétique)
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Liste d'identifiants : ceux qui commencent par le terme, puis ceux qui le contiennent
+        """
+        term = (term or '').strip().lower()
+        if not term:
+            return self.values[:limit]
+
+        positions = self._prefix_positions(term, limit)
+        if len(positions) < limit:
+            seen = set(positions)
+            positions += [position for position in self._substring_positions(term) if position not in seen]
+        return [self.values[position] for position in positions[:limit]]
+
+
+class SearchIndexRegistry:
+    """
+    Index de recherche partagés entre les callbacks. Les index construits depuis le
+    jeu de données principal sont reconstruits lorsque la version des données change.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager les index entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = SearchIndexRegistry(DataManager.get_instance())
+        return cls._instance
+
+    def __init__(self, data_manager):
+        """
+        Args:
+            data_manager: Gestionnaire de données source
+        """
+        self.data_manager = data_manager
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def column_index(self, column):
+        """
+        Index des valeurs d'une colonne du jeu de données principal (ex. 'olt_name')
+        """
+        version = self.data_manager.data_version
+        with self._lock:
+            entry = self._indexes.get(column)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+        index = SearchIndex(self.data_manager.df_original[column].dropna().unique())
+        with self._lock:
+            self._indexes[column] = (version, index)
+        print(f"Index de recherche '{column}' construit : {len(index)} identifiants")
+        return index
+
+    def register(self, name, values):
+        """
+        Construit et enregistre l'index d'une source externe (ex. chaînes du fichier LOF)
+
+        Returns:
+            L'index construit
+        """
+        index = SearchIndex(values)
+        with self._lock:
+            self._indexes[name] = (None, index)
+        return index
+
+    def get(self, name):
+        """Index enregistré sous ce nom, ou None"""
+        with self._lock:
+            entry = self._indexes.get(name)
+        return entry[1] if entry is not None else None
+
+
+def search_options(index, term, selected=None, fixed_options=(), limit=SEARCH_RESULT_LIMIT):
+    """
+    Options d'une liste déroulante pour un terme recherché
+
+    Args:
+        index: Index de recherche (None : aucune correspondance)
+        term: Texte saisi
+        selected: Valeur sélectionnée, conservée dans les options pour rester affichée
+        fixed_options: Valeurs toujours proposées en tête (ex. 'Toutes')
+        limit: Nombre maximal de correspondances
+
+    Returns:
+        Liste d'options {'label', 'value'}
+    """
+    values = list(fixed_options)
+    if index is not None:
+        values += [value for value in index.search(term, limit) if value not in values]
+    if selected and selected not in values:
+        values.append(selected)
+    return [{'label': value, 'value': value} for value in values]
@@ -0,0 +1,331 @@
+# utils/session_state.py
+# État des pages conservé côté serveur pour chaque session (filtres appliqués) : les Stores
+# du navigateur ne portent qu'un jeton {'session', 'version'} relu par les callbacks
+# (mémoire, avec copie sur disque pour les redémarrages et les autres workers)
+
+from collections import OrderedDict
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+# Espaces de noms de l'état d'une session (un par Store de filtres)
+FILTER_STATE = 'filters'
+ANOMALY_FILTER_STATE = 'anomaly-filters'
+LOF_FILTER_STATE = 'lof-filters'
+
+# Nombre de versions précédentes conservées par espace de noms (relues par les sections
+# chargées à la demande, qui affichent les filtres en vigueur lors de leur création)
+MAX_STATE_VERSIONS = 20
+
+# Nombre de sessions gardées en mémoire (éviction LRU, les sessions évincées restent sur disque)
+MAX_SESSIONS = 500
+
+# Ancienneté (en secondes) au-delà de laquelle les fichiers d'état sont supprimés au démarrage
+MAX_STATE_AGE = 7 * 24 * 3600
+
+# Nombre de verrous d'écriture sur disque (répartis par session et espace de noms)
+WRITE_LOCK_STRIPES = 64
+
+# Répertoire de copie sur disque (variable d'environnement vide pour le désactiver)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_STATE_DIR = os.environ.get('SESSION_STATE_DIR', os.path.join(BASE_DIR, '.cache', 'session_state'))
+
+
+class SessionStateStore:
+    """
+    Conserve, par session et par espace de noms, la dernière valeur écrite et son numéro
+    de version (ainsi que les MAX_STATE_VERSIONS dernières valeurs). Le jeton renvoyé au
+    navigateur identifie la session et la version : un jeton plus récent que la copie en
+    mémoire (écrit par un autre worker) entraîne la relecture du disque. Chaque espace de
+    noms a son propre fichier, écrit hors du verrou global : une écriture ne recopie que
+    l'espace de noms modifié et ne bloque pas les autres sessions.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager l'état des sessions entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = SessionStateStore()
+        return cls._instance
+
+    def __init__(self, state_dir=DEFAULT_STATE_DIR, max_sessions=MAX_SESSIONS):
+        """
+        Args:
+            state_dir: Répertoire de copie sur disque (None pour tout garder en mémoire)
+            max_sessions: Nombre de sessions gardées en mémoire
+        """
+        self.state_dir = state_dir
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        # Écritures sur disque : une seule à la fois par fichier, jamais une version plus ancienne
+        # que la dernière écrite (dernières versions écrites, bornées en LRU)
+        self._write_locks = [threading.Lock() for _ in range(WRITE_LOCK_STRIPES)]
+        self._persisted_versions = OrderedDict()
+        self._persisted_lock = threading.Lock()
+
+        if self.state_dir:
+            try:
+                os.makedirs(self.state_dir, exist_ok=True)
+                self._prune_files()
+            except OSError as e:
+                print(f"Copie sur disque de l'état des sessions désactivée: {e}")
+                self.state_dir = None
+
+    @staticmethod
+    def is_valid_session(session_id):
+        """Vérifie qu'un identifiant de session est un UUID (utilisé comme nom de répertoire)"""
+        try:
+            return str(uuid.UUID(str(session_id))) == session_id
+        except ValueError:
+            return False
+
+    @classmethod
+    def session_for(cls, token, fallback=None):
+        """
+        Identifiant de session à utiliser pour une écriture : celui du jeton courant,
+        sinon celui fourni (ex. 'chat-session-id'), sinon un nouvel identifiant
+        """
+        for session_id in ((token or {}).get('session'), fallback):
+            if cls.is_valid_session(session_id):
+                return session_id
+        return str(uuid.uuid4())
+
+    def _session_dir(self, session_id):
+        return os.path.join(self.state_dir, session_id)
+
+    def _namespace_path(self, session_id, namespace):
+        return os.path.join(self._session_dir(session_id), f"{namespace}.json")
+
+    def _prune_files(self):
+        """Supprime les fichiers d'état des sessions inactives depuis MAX_STATE_AGE"""
+        limit = time.time() - MAX_STATE_AGE
+        for name in os.listdir(self.state_dir):
+            path = os.path.join(self.state_dir, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+            except OSError:
+                pass
+
+    def _read_entry(self, session_id, namespace):
+        """Espace de noms d'une session relu du disque (None s'il n'existe pas)"""
+        try:
+            with open(self._namespace_path(session_id, namespace), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Erreur lors de la lecture de l'état de session sur disque: {e}")
+            return None
+
+    def _read_session(self, session_id):
+        """État d'une session relu du disque ({} s'il n'existe pas)"""
+        if not self.state_dir:
+            return {}
+        try:
+            names = os.listdir(self._session_dir(session_id))
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            print(f"Erreur lors de la lecture de l'état de session sur disque: {e}")
+            return {}
+        state = {}
+        for name in names:
+            if name.endswith('.json'):
+                entry = self._read_entry(session_id, name[:-len('.json')])
+                if entry is not None:
+                    state[name[:-len('.json')]] = entry
+        return state
+
+    def _write_entry(self, session_id, namespace, entry):
+        """
+        Écrit un espace de noms sur disque (remplacement atomique du fichier), hors du
+        verrou global ; une version plus ancienne que la dernière écrite est ignorée
+        """
+        if not self.state_dir:
+            return
+        key = (session_id, namespace)
+        with self._write_locks[hash(key) % WRITE_LOCK_STRIPES]:
+            with self._persisted_lock:
+                if self._persisted_versions.get(key, 0) >= entry['version']:
+                    return
+            path = self._namespace_path(session_id, namespace)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(self._session_dir(session_id), exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Erreur lors de l'écriture de l'état de session sur disque: {e}")
+                return
+            with self._persisted_lock:
+                self._persisted_versions[key] = entry['version']
+                self._persisted_versions.move_to_end(key)
+                while len(self._persisted_versions) > self.max_sessions * 4:
+                    self._persisted_versions.popitem(last=False)
+
+    def _get_session(self, session_id, min_version=0, namespace=None):
+        """
+        Retourne l'état de la session (relu du disque s'il est absent de la mémoire,
+        ou l'espace de noms seul s'il est plus ancien que min_version) et le marque comme récent
+        """
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._read_session(session_id)
+            self._sessions[session_id] = state
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        elif namespace and self.state_dir and state.get(namespace, {}).get('version', 0) < min_version:
+            entry = self._read_entry(session_id, namespace)
+            if entry is not None and entry['version'] > state.get(namespace, {}).get('version', 0):
+                state[namespace] = entry
+        self._sessions.move_to_end(session_id)
+        return state
+
+    @staticmethod
+    def _set_entry(state, namespace, data):
+        """Enregistre une nouvelle version de l'espace de noms et retourne son numéro"""
+        entry = state.get(namespace, {})
+        version = entry.get('version', 0) + 1
+        history = dict(entry.get('history', {}))
+        history[str(version)] = data
+        for old_version in sorted(history, key=int)[:-MAX_STATE_VERSIONS]:
+            del history[old_version]
+        state[namespace] = {'version': version, 'data': data, 'history': history}
+        return version
+
+    def put(self, session_id, namespace, data):
+        """
+        Enregistre la nouvelle valeur d'un espace de noms de la session
+
+        Args:
+            session_id: Identifiant de session (UUID)
+            namespace: Espace de noms (ex. FILTER_STATE)
+            data: Valeur sérialisable en JSON
+
+        Returns:
+            Jeton {'session', 'version'} à placer dans le Store du navigateur
+        """
+        # Même représentation que si la valeur avait transité par le navigateur (tuples en listes)
+        data = json.loads(json.dumps(data, default=str))
+        with self._lock:
+            state = self._get_session(session_id)
+            version = self._set_entry(state, namespace, data)
+            entry = state[namespace]
+        self._write_entry(session_id, namespace, entry)
+        return {'session': session_id, 'version': version}
+
+    def update(self, session_id, namespace, function):
+        """
+        Modifie la valeur d'un espace de noms sous verrou : les demandes simultanées
+        d'une même session ne s'écrasent pas (chacune part de la dernière valeur)
+
+        Args:
+            session_id: Identifiant de session (UUID)
+            namespace: Espace de noms (ex. FILTER_STATE)
+            function: Fonction recevant une copie de la valeur courante ({} si aucune)
+                et retournant la nouvelle valeur
+
+        Returns:
+            (jeton {'session', 'version'}, copie de la nouvelle valeur)
+        """
+        with self._lock:
+            state = self._get_session(session_id)
+            entry = state.get(namespace, {'version': 0, 'data': {}})
+            data = json.loads(json.dumps(function(json.loads(json.dumps(entry['data']))), default=str))
+            version = self._set_entry(state, namespace, data)
+            entry = state[namespace]
+        self._write_entry(session_id, namespace, entry)
+        return {'session': session_id, 'version': version}, json.loads(json.dumps(data))
+
+    def get(self, token, namespace, exact=False):
+        """
+        Relit la valeur désignée par un jeton
+
+        Args:
+            token: Jeton du Store ({} ou None : aucune valeur)
+            namespace: Espace de noms (ex. FILTER_STATE)
+            exact: True pour relire la version du jeton plutôt que la dernière
+
+        Returns:
+            Copie de la dernière valeur enregistrée ({} si aucune), ou de la version
+            du jeton si exact (None si elle n'est plus conservée)
+        """
+        session_id = (token or {}).get('session')
+        if not self.is_valid_session(session_id):
+            return None if exact else {}
+        with self._lock:
+            state = self._get_session(session_id, token.get('version', 0), namespace)
+            entry = state.get(namespace)
+            if entry is None:
+                return None if exact else {}
+            if exact:
+                data = entry.get('history', {}).get(str(token.get('version')))
+                return None if data is None else json.loads(json.dumps(data))
+            return json.loads(json.dumps(entry['data']))
+
+    def latest_token(self, token, namespace):
+        """
+        Jeton de la dernière version enregistrée pour la session du jeton, à conserver
+        pour relire plus tard exactement cette valeur (get(..., exact=True))
+        """
+        session_id = (token or {}).get('session')
+        if not self.is_valid_session(session_id):
+            return None
+        with self._lock:
+            state = self._get_session(session_id, token.get('version', 0), namespace)
+            version = state.get(namespace, {}).get('version')
+        return None if version is None else {'session': session_id, 'version': version}
+
+
+def read_state(token, namespace, exact=False):
+    """
+    Valeur désignée par le jeton d'un Store ('filter-values', 'lof-filter-values'...)
+    (version du jeton si exact, voir SessionStateStore.get)
+    """
+    return SessionStateStore.get_instance().get(token, namespace, exact)
+
+
+def latest_state_token(token, namespace):
+    """
+    Jeton de la dernière version de la session du jeton (voir SessionStateStore.latest_token)
+    """
+    return SessionStateStore.get_instance().latest_token(token, namespace)
+
+
+def write_state(token, namespace, data, session_id=None):
+    """
+    Enregistre une nouvelle valeur pour la session du jeton courant
+
+    Args:
+        token: Jeton actuel du Store (None ou {} : nouvelle session)
+        namespace: Espace de noms
+        data: Valeur à enregistrer
+        session_id: Session à utiliser si le jeton n'en porte pas (ex. 'chat-session-id')
+
+    Returns:
+        Nouveau jeton à retourner comme valeur du Store
+    """
+    store = SessionStateStore.get_instance()
+    return store.put(store.session_for(token, session_id), namespace, data)
+
+
+def update_state(token, namespace, function, session_id=None):
+    """
+    Modifie la valeur de la session du jeton courant à partir de sa dernière version
+    (voir SessionStateStore.update)
+
+    Returns:
+        (nouveau jeton à retourner comme valeur du Store, copie de la nouvelle valeur)
+    """
+    store = SessionStateStore.get_instance()
+    return store.update(store.session_for(token, session_id), namespace, function)
@@ -0,0 +1,176 @@
+# utils/topology_index.py
+# Index de la topologie réseau (Département → Boucle → PEAG → OLT → PEBIB → POP DNS)
+# avec le nombre d'observations de chaque chemin, construit une fois par version des données
+
+from collections import OrderedDict
+import threading
+
+import pandas as pd
+
+from utils.data_loader import DataManager
+
+# Niveaux de la hiérarchie, du plus haut au plus fin (nom du filtre, colonne)
+STRUCTURE_HIERARCHY = [
+    ('Département', 'code_departement'),
+    ('Boucle', 'boucle'),
+    ('Identifiant de PEAG', 'peag_nro'),
+    ('Identifiant d\'OLT', 'olt_name'),
+    ('PEBIB', 'pebib'),
+    ('POP DNS', 'pop_dns')
+]
+
+
+class TopologyIndex:
+    """
+    Table des chemins complets de la hiérarchie (une ligne par feuille) et de
+    leur nombre d'observations. Le nombre d'observations de n'importe quel
+    nœud ou croisement de niveaux s'obtient en sommant les feuilles de son
+    sous-arbre, sans reparcourir les lignes de données.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """Pattern Singleton pour partager l'index entre les callbacks"""
+        if cls._instance is None:
+            cls._instance = TopologyIndex(DataManager.get_instance())
+        return cls._instance
+
+    def __init__(self, data_manager, max_entries=32):
+        """
+        Args:
+            data_manager: Gestionnaire de données source
+            max_entries: Nombre maximal de jeux de filtres conservés (éviction LRU)
+        """
+        self.data_manager = data_manager
+        self.max_entries = max_entries
+        self._index_version = None
+        self._leaf_counts = None
+        self._filtered = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def levels(self):
+        """Colonnes de la hiérarchie présentes dans les données"""
+        columns = self.data_manager.df_original.columns
+        return [col for _, col in STRUCTURE_HIERARCHY if col in columns]
+
+    @staticmethod
+    def _path_table(df, levels):
+        """Compte les observations de chaque chemin complet de la hiérarchie"""
+        return (
+            df.groupby(levels, dropna=False, observed=True, sort=False)
+            .size()
+            .rename('count')
+            .reset_index()
+        )
+
+    def leaf_counts(self):
+        """
+        Retourne la table des chemins de l'ensemble des données,
+        reconstruite uniquement si la version des données a changé
+        """
+        version = self.data_manager.data_version
+        with self._lock:
+            if self._index_version != version:
+                self._leaf_counts = self._path_table(self.data_manager.df_original, self.levels)
+                self._index_version = version
+                self._filtered.clear()
+            return self._leaf_counts
+
+    def _structure_conditions(self, filters):
+        """
+        Traduit les filtres en conditions sur les niveaux de la hiérarchie.
+        Retourne None si un filtre actif porte sur une autre colonne
+        (la table des chemins ne suffit alors pas).
+        """
+        hierarchy_filters = dict(STRUCTURE_HIERARCHY)
+        conditions = {}
+        for filter_name, filter_value in (filters or {}).items():
+            if filter_name in hierarchy_filters:
+                # Même règle que DataManager.filter_dataframe pour l'égalité simple
+                if isinstance(filter_value, (str, int, float)) and filter_value:
+                    conditions[hierarchy_filters[filter_name]] = filter_value
+            elif filter_name not in self.data_manager.column_mapping:
+                continue
+            elif filter_value in (None, '', 'all') or filter_value == []:
+                continue
+            else:
+                return None
+        return conditions
+
+    def path_counts(self, filters, filtered_df=None):
+        """
+        Table des chemins sous les filtres courants
+
+        Args:
+            filters: Filtres courants (format DataManager.filter_dataframe)
+            filtered_df: Données déjà filtrées, utilisées si un filtre porte
+                sur une colonne hors hiérarchie (évite de refiltrer)
+
+        Returns:
+            DataFrame avec une colonne par niveau et 'count'
+        """
+        leaf_counts = self.leaf_counts()
+        key = DataManager.filters_key(filters)
+
+        with self._lock:
+            cached = self._filtered.get(key)
+            if cached is not None:
+                self._filtered.move_to_end(key)
+                return cached
+
+        conditions = self._structure_conditions(filters)
+        if conditions is not None:
+            # Filtres de structure uniquement : sélection des sous-arbres dans l'index
+            table = leaf_counts
+            for col, value in conditions.items():
+                if col in table.columns:
+                    table = table[table[col] == value]
+        else:
+            # Filtres temporels ou techniques : un seul regroupement des lignes filtrées
+            if filtered_df is None:
+                filtered_df = self.data_manager.filter_dataframe(filters)
+            table = self._path_table(filtered_df, self.levels)
+
+        with self._lock:
+            self._filtered[key] = table
+            self._filtered.move_to_end(key)
+            while len(self._filtered) > self.max_entries:
+                self._filtered.popitem(last=False)
+        return table
+
+    @staticmethod
+    def rollup(path_counts, columns, sort=False):
+        """
+        Nombre d'observations par combinaison des niveaux demandés
+        (les chemins dont un de ces niveaux est manquant sont ignorés)
+
+        Args:
+            path_counts: Table des chemins (résultat de path_counts)
+            columns: Niveaux conservés
+            sort: Trier par valeur des niveaux ; sinon ordre de première apparition
+                dans les données, comme value_counts en cas d'égalité
+
+        Returns:
+            Série des effectifs indexée par les niveaux demandés
+        """
+        return path_counts.groupby(list(columns), dropna=True, observed=True, sort=sort)['count'].sum()
+
+    def subtree_counts(self, filters, parent_path, child_level):
+        """
+        Nombre d'observations de chaque enfant d'un nœud de la hiérarchie
+        (utile pour descendre d'un niveau lors d'une recherche de cause)
+
+        Args:
+            filters: Filtres courants
+            parent_path: Dictionnaire {colonne: valeur} identifiant le nœud parent
+            child_level: Colonne du niveau enfant
+
+        Returns:
+            Série des effectifs indexée par les valeurs du niveau enfant, triée décroissante
+        """
+        table = self.path_counts(filters)
+        for col, value in parent_path.items():
+            table = table[table[col] == value]
+        return self.rollup(table, [child_level]).sort_values(ascending=False)